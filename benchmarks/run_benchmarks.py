@@ -0,0 +1,566 @@
+"""
+Бенчмарки функций чтения, фильтрации, сортировки, маскирования и форматирования транзакций.
+
+Данные генерируются модулем benchmarks/synthetic.py (по образцу файлов из папки data) и кэшируются
+в папке benchmarks/.data. Результаты (время и пиковый объём памяти) записываются в JSON-файл
+benchmarks/results/<commit>.json, который можно сравнить с результатами другого коммита.
+
+Запуск:
+    python -m benchmarks.run_benchmarks --sizes 1000 100000
+    python -m benchmarks.run_benchmarks --only "sort_*" --compare benchmarks/results/abc1234.json
+"""
+
+import argparse
+import fnmatch
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from functools import cached_property
+from typing import Any, Callable, NamedTuple, Sequence
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import write_operations_json, write_transactions_csv, write_transactions_excel
+from src import processing, read_from_file
+from src.aggregate import aggregate
+from src.dates import parse_date
+from src.generators import filter_by_currency
+from src.main import text_line
+from src.masks import get_mask_account, get_mask_card_number, masking_engine
+from src.parallel import available_workers, run_pipeline
+from src.processing import CategoryClassifier, filter_by_state, page_by_date, search_by_str, sort_by_date, top_by_date
+from src.query import TransactionQuery
+from src.read_from_file import read_table_from_csv, read_transactions_from_csv, read_transactions_from_excel
+from src.table import TransactionTable
+from src.utils import iter_transactions_from_json, read_table_from_json, read_transactions_from_json
+from src.widget import format_str_date, mask_account_card, mask_account_card_batch, mask_cache_clear
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_PATH, "benchmarks", ".data")
+RESULTS_DIR = os.path.join(ROOT_PATH, "benchmarks", "results")
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# Генерация XLSX-файла и его разбор слишком медленны для больших размеров.
+EXCEL_MAX_ROWS = 100_000
+
+# Во сколько раз замедление относительно базовых результатов считается регрессией.
+REGRESSION_THRESHOLD = 1.2
+
+SEARCH_STR = "Перевод с карты"
+
+# Размер страницы в бенчмарках top_by_date и page_by_date.
+TOP_K = 100
+
+# Правила классификации по ключевым словам описаний (CategoryClassifier).
+CATEGORY_RULES = {
+    "Вклады": ["Открытие вклада", "вклад"],
+    "Карта на карту": ["с карты на карту"],
+    "На счёт": ["на счет"],
+    "Организации": ["организации"],
+}
+
+# Модули, время импорта которых замеряется (python -X importtime), и зависимости,
+# которые не должны загружаться при запуске src.main: они нужны только выбранным читателям файлов.
+STARTUP_MODULES = ("src.main", "src.utils", "src.read_from_file")
+LAZY_DEPENDENCIES = ("numpy", "pandas", "requests", "dotenv")
+
+# Бюджет времени импорта src.main в секундах (проверяется параметром --startup-budget).
+STARTUP_BUDGET_SECONDS = 0.05
+
+
+class BenchmarkData:
+    """
+    Lazily generated inputs of the benchmarks for one size: the data files and the transactions read from them.
+
+    Files are written once into `data_dir` and reused by later runs with the same size and seed.
+    """
+
+    def __init__(self, rows: int, seed: int = 0, data_dir: str = DATA_DIR) -> None:
+        self.rows = rows
+        self.seed = seed
+        self.data_dir = data_dir
+
+    def _path(self, prefix: str, extension: str, writer: Callable[[str, int, int], str]) -> str:
+        """Returns the path of a generated data file, writing the file if it does not exist yet."""
+        file_name = f"{prefix}_{self.rows}_{self.seed}.{extension}"
+        file_path = os.path.join(self.data_dir, file_name)
+        if not os.path.exists(file_path):
+            # Файл пишется под временным именем, чтобы прерванная генерация не оставила неполный файл.
+            tmp_path = os.path.join(self.data_dir, "tmp_" + file_name)
+            writer(tmp_path, self.rows, self.seed)
+            os.replace(tmp_path, file_path)
+        return file_path
+
+    @cached_property
+    def json_path(self) -> str:
+        return self._path("operations", "json", write_operations_json)
+
+    @cached_property
+    def csv_path(self) -> str:
+        return self._path("transactions", "csv", write_transactions_csv)
+
+    @cached_property
+    def excel_path(self) -> str:
+        return self._path("transactions", "xlsx", write_transactions_excel)
+
+    @cached_property
+    def operations(self) -> list[dict[str, Any]]:
+        """Transactions read from the JSON file, dated ones only (sort_by_date rejects records without a date)."""
+        return [operation for operation in read_transactions_from_json(self.json_path) if "date" in operation]
+
+    @cached_property
+    def table(self) -> TransactionTable:
+        return TransactionTable.from_records(self.operations)
+
+    @cached_property
+    def requisites(self) -> list[str]:
+        """The 'from' and 'to' fields of the transactions: cards and accounts with their names."""
+        return [operation[key] for operation in self.operations for key in ("from", "to") if key in operation]
+
+    @cached_property
+    def card_numbers(self) -> list[str]:
+        return [requisite[-16:] for requisite in self.requisites if not requisite.startswith("Счет")]
+
+    @cached_property
+    def account_numbers(self) -> list[str]:
+        return [requisite[-20:] for requisite in self.requisites if requisite.startswith("Счет")]
+
+    @cached_property
+    def dates(self) -> list[str]:
+        return [operation["date"] for operation in self.operations]
+
+
+class Benchmark(NamedTuple):
+    """
+    One benchmark: `setup` prepares the argument (not timed), `run` is the timed call.
+
+    `setup` is called before every repetition, so a benchmark can start from a cold cache.
+    """
+
+    name: str
+    group: str
+    setup: Callable[[BenchmarkData], Any]
+    run: Callable[[Any], Any]
+    max_rows: int | None = None
+
+
+def _cold(getter: Callable[[BenchmarkData], Any]) -> Callable[[BenchmarkData], Any]:
+    """
+    Wraps a setup function so that no parsed dates or masks are reused when the benchmark starts:
+    the parse_date and mask_account_card caches are cleared and a table is given without its computed
+    'date_epoch' column.
+    """
+
+    def setup(data: BenchmarkData) -> Any:
+        value = getter(data)
+        parse_date.cache_clear()
+        mask_cache_clear()
+        if isinstance(value, TransactionTable) and "date_epoch" in value.columns:
+            columns = {name: column for name, column in value.columns.items() if name != "date_epoch"}
+            value = TransactionTable(columns, value.present, value.categories, value.extras)
+        return value
+
+    return setup
+
+
+def _uncached(getter: Callable[[BenchmarkData], str]) -> Callable[[BenchmarkData], str]:
+    """Wraps the setup of a reader benchmark so that the file is parsed: the parse cache is disabled."""
+
+    def setup(data: BenchmarkData) -> str:
+        os.environ["TRANSACTIONS_CACHE_DIR"] = ""
+        return getter(data)
+
+    return setup
+
+
+def _cached(getter: Callable[[BenchmarkData], str], read: Callable[[str], Any]) -> Callable[[BenchmarkData], str]:
+    """
+    Wraps the setup of a reader benchmark so that the file is read from the parse cache:
+    the cache is kept in the data folder and filled by an untimed read.
+    """
+
+    def setup(data: BenchmarkData) -> str:
+        os.environ["TRANSACTIONS_CACHE_DIR"] = os.path.join(data.data_dir, "parse_cache")
+        file_path = getter(data)
+        read(file_path)
+        return file_path
+
+    return setup
+
+
+def _query() -> TransactionQuery:
+    return TransactionQuery().state("EXECUTED").currency("RUB").text(SEARCH_STR).order_by_date(desc=True)
+
+
+def _report() -> TransactionQuery:
+    return TransactionQuery().state("EXECUTED").order_by_date(desc=True)
+
+
+BENCHMARKS: tuple[Benchmark, ...] = (
+    # Чтение файлов.
+    Benchmark("read_transactions_from_json", "reader", _uncached(lambda d: d.json_path), read_transactions_from_json),
+    Benchmark(
+        "read_transactions_from_json[cached]",
+        "reader",
+        _cached(lambda d: d.json_path, read_transactions_from_json),
+        read_transactions_from_json,
+    ),
+    Benchmark(
+        "iter_transactions_from_json", "reader", lambda d: d.json_path, lambda p: list(iter_transactions_from_json(p))
+    ),
+    Benchmark("read_table_from_json", "reader", lambda d: d.json_path, read_table_from_json),
+    Benchmark("read_transactions_from_csv", "reader", _uncached(lambda d: d.csv_path), read_transactions_from_csv),
+    Benchmark(
+        "read_transactions_from_csv[cached]",
+        "reader",
+        _cached(lambda d: d.csv_path, read_transactions_from_csv),
+        read_transactions_from_csv,
+    ),
+    Benchmark(
+        "iter_transactions_from_csv",
+        "reader",
+        lambda d: d.csv_path,
+        lambda p: sum(len(chunk) for chunk in read_from_file.iter_transactions_from_csv(p)),
+    ),
+    Benchmark("read_table_from_csv", "reader", lambda d: d.csv_path, read_table_from_csv),
+    Benchmark(
+        "read_transactions_from_excel",
+        "reader",
+        _uncached(lambda d: d.excel_path),
+        read_transactions_from_excel,
+        EXCEL_MAX_ROWS,
+    ),
+    Benchmark(
+        "iter_transactions_from_excel",
+        "reader",
+        lambda d: d.excel_path,
+        lambda p: sum(len(chunk) for chunk in read_from_file.iter_transactions_from_excel(p)),
+        EXCEL_MAX_ROWS,
+    ),
+    # Эталон: разбор того же файла через pandas (прежний способ чтения XLSX).
+    Benchmark("pandas.read_excel", "reader", lambda d: d.excel_path, pd.read_excel, EXCEL_MAX_ROWS),
+    Benchmark(
+        "read_transactions_from_excel[cached]",
+        "reader",
+        _cached(lambda d: d.excel_path, read_transactions_from_excel),
+        read_transactions_from_excel,
+        EXCEL_MAX_ROWS,
+    ),
+    # Фильтрация и поиск.
+    Benchmark("filter_by_state", "filter", lambda d: d.operations, filter_by_state),
+    Benchmark("filter_by_state[table]", "filter", lambda d: d.table, filter_by_state),
+    Benchmark("filter_by_currency", "filter", lambda d: d.operations, lambda t: list(filter_by_currency(t, "RUB"))),
+    Benchmark("filter_by_currency[table]", "filter", lambda d: d.table, lambda t: list(filter_by_currency(t, "RUB"))),
+    Benchmark("search_by_str", "filter", lambda d: d.operations, lambda t: search_by_str(t, SEARCH_STR)),
+    Benchmark("search_by_str[table]", "filter", lambda d: d.table, lambda t: search_by_str(t, SEARCH_STR)),
+    Benchmark(
+        "DescriptionIndex",
+        "filter",
+        lambda d: d.operations,
+        lambda t: processing.DescriptionIndex(t).search(SEARCH_STR),
+    ),
+    Benchmark(
+        "CategoryClassifier", "filter", lambda d: d.operations, lambda t: CategoryClassifier(CATEGORY_RULES).apply(t)
+    ),
+    Benchmark(
+        "CategoryClassifier[table]",
+        "filter",
+        lambda d: d.table,
+        lambda t: CategoryClassifier(CATEGORY_RULES).apply(t),
+    ),
+    Benchmark("TransactionQuery", "filter", _cold(lambda d: d.operations), lambda t: _query().run(t)),
+    Benchmark("TransactionQuery[table]", "filter", _cold(lambda d: d.table), lambda t: _query().run(t)),
+    # Сортировка.
+    Benchmark("sort_by_date", "sort", _cold(lambda d: d.operations), sort_by_date),
+    Benchmark("sort_by_date[table]", "sort", _cold(lambda d: d.table), sort_by_date),
+    Benchmark("top_by_date", "sort", _cold(lambda d: d.operations), lambda t: top_by_date(t, TOP_K)),
+    Benchmark("top_by_date[table]", "sort", _cold(lambda d: d.table), lambda t: top_by_date(t, TOP_K)),
+    Benchmark("page_by_date", "sort", _cold(lambda d: d.operations), lambda t: page_by_date(t, TOP_K)),
+    # Агрегация: сумма, минимум, максимум и среднее сумм по месяцам и валютам за один проход.
+    Benchmark(
+        "aggregate", "aggregate", lambda d: d.operations, lambda t: aggregate(t, by=("month", "currency")).result()
+    ),
+    # Маскирование.
+    Benchmark(
+        "mask_account_card", "mask", _cold(lambda d: d.requisites), lambda items: [mask_account_card(i) for i in items]
+    ),
+    Benchmark(
+        "get_mask_card_number",
+        "mask",
+        lambda d: d.card_numbers,
+        lambda items: [get_mask_card_number(i) for i in items],
+    ),
+    Benchmark(
+        "get_mask_account", "mask", lambda d: d.account_numbers, lambda items: [get_mask_account(i) for i in items]
+    ),
+    Benchmark("mask_account_card_batch", "mask", lambda d: d.requisites, mask_account_card_batch),
+    Benchmark("MaskingEngine.mask_many", "mask", lambda d: d.card_numbers, masking_engine.mask_many),
+    # Форматирование.
+    Benchmark(
+        "format_str_date", "format", _cold(lambda d: d.dates), lambda items: [format_str_date(i) for i in items]
+    ),
+    # Фильтрация и форматирование отчёта пакетного режима: в текущем процессе и в нескольких процессах.
+    Benchmark(
+        "run_pipeline", "pipeline", _cold(lambda d: d.table), lambda t: run_pipeline(t, _report(), text_line, 1)
+    ),
+    Benchmark(
+        "run_pipeline[parallel]",
+        "pipeline",
+        _cold(lambda d: d.table),
+        lambda t: run_pipeline(t, _report(), text_line, max(available_workers(), 2)),
+    ),
+)
+
+
+def measure(benchmark: Benchmark, data: BenchmarkData, repeat: int = 3) -> dict[str, Any]:
+    """
+    Times a benchmark with time.perf_counter and measures its peak memory with tracemalloc.
+
+    The memory is measured in a separate run, because tracemalloc slows the measured code down.
+
+    Returns:
+        dict[str, Any]: The best and the mean time in seconds, the peak of allocated memory in bytes
+            and the throughput in rows per second.
+    """
+    timings = []
+    for _ in range(repeat):
+        argument = benchmark.setup(data)
+        gc.collect()
+        start = time.perf_counter()
+        benchmark.run(argument)
+        timings.append(time.perf_counter() - start)
+
+    argument = benchmark.setup(data)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        benchmark.run(argument)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        "name": benchmark.name,
+        "group": benchmark.group,
+        "rows": data.rows,
+        "seconds": best,
+        "mean_seconds": sum(timings) / len(timings),
+        "peak_bytes": peak_bytes,
+        "rows_per_second": data.rows / best if best else None,
+    }
+
+
+def measure_import_time(module: str, repeat: int = 3) -> dict[str, Any]:
+    """
+    Measures the import time of `module` in a fresh interpreter with `python -X importtime`.
+
+    The peak memory of the import and the LAZY_DEPENDENCIES it loads are measured in a separate run
+    under tracemalloc.
+
+    Returns:
+        dict[str, Any]: A result like the ones of `measure` (group 'startup', 0 rows) with the list
+            of the loaded LAZY_DEPENDENCIES in 'loaded'.
+    """
+    timings = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT_PATH,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        # Строки вида 'import time:   self [us] | cumulative | name'; нужна строка самого модуля.
+        for line in completed.stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].strip() == module:
+                timings.append(int(fields[1]) / 1e6)
+
+    code = (
+        "import json, sys, tracemalloc\n"
+        "tracemalloc.start()\n"
+        f"import {module}\n"
+        "print(json.dumps([tracemalloc.get_traced_memory()[1], sorted(sys.modules)]))\n"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], cwd=ROOT_PATH, capture_output=True, text=True, check=True)
+    peak_bytes, modules = json.loads(completed.stdout.splitlines()[-1])
+
+    best = min(timings)
+    return {
+        "name": f"import {module}",
+        "group": "startup",
+        "rows": 0,
+        "seconds": best,
+        "mean_seconds": sum(timings) / len(timings),
+        "peak_bytes": peak_bytes,
+        "rows_per_second": None,
+        "loaded": [dependency for dependency in LAZY_DEPENDENCIES if dependency in modules],
+    }
+
+
+def _git(*args: str) -> str:
+    """Runs a git command in the repository and returns its output ('' if git is not available)."""
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=ROOT_PATH, capture_output=True, text=True, check=True, timeout=30
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def run_benchmarks(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    repeat: int = 3,
+    seed: int = 0,
+    data_dir: str = DATA_DIR,
+    only: Sequence[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Runs the import time benchmarks of STARTUP_MODULES and the benchmarks for every size.
+
+    Args:
+        sizes (Sequence[int]): Numbers of generated transactions (10**3 - 10**7).
+        repeat (int): Timed repetitions of every benchmark; the best time is reported.
+        seed (int): The seed of the generated data.
+        data_dir (str): The folder for the generated data files.
+        only (Sequence[str] | None): fnmatch patterns of the benchmark names to run (all by default).
+
+    Returns:
+        dict[str, Any]: The report: the commit, the environment and the list of results.
+    """
+    benchmarks = [
+        benchmark
+        for benchmark in BENCHMARKS
+        if not only or any(fnmatch.fnmatchcase(benchmark.name, pattern) for pattern in only)
+    ]
+
+    results = [
+        measure_import_time(module, repeat)
+        for module in STARTUP_MODULES
+        if not only or any(fnmatch.fnmatchcase(f"import {module}", pattern) for pattern in only)
+    ]
+    for rows in sizes:
+        data = BenchmarkData(rows, seed, data_dir)
+        for benchmark in benchmarks:
+            if benchmark.max_rows is not None and rows > benchmark.max_rows:
+                continue
+            results.append(measure(benchmark, data, repeat))
+
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD") or "unknown",
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "seed": seed,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare_results(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float = REGRESSION_THRESHOLD
+) -> list[dict[str, Any]]:
+    """
+    Compares two reports and returns the benchmarks that became slower than `threshold` times the baseline.
+
+    Benchmarks are matched by name and size; those missing from either report are skipped.
+    """
+    baseline_seconds = {(result["name"], result["rows"]): result["seconds"] for result in baseline["results"]}
+
+    regressions = []
+    for result in current["results"]:
+        before = baseline_seconds.get((result["name"], result["rows"]))
+        if before and result["seconds"] > before * threshold:
+            regressions.append(
+                {
+                    "name": result["name"],
+                    "rows": result["rows"],
+                    "baseline_seconds": before,
+                    "seconds": result["seconds"],
+                    "ratio": result["seconds"] / before,
+                }
+            )
+    return regressions
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Runs the benchmarks from the command line; returns 1 if a regression against --compare was found
+    or the import of src.main exceeds --startup-budget (or loads one of LAZY_DEPENDENCIES).
+    """
+    parser = argparse.ArgumentParser(description="Бенчмарки обработки банковских транзакций.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="число транзакций")
+    parser.add_argument("--repeat", type=int, default=3, help="число замеров каждой функции")
+    parser.add_argument("--seed", type=int, default=0, help="зерно генератора данных")
+    parser.add_argument("--only", nargs="+", help="шаблоны имён бенчмарков (fnmatch)")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="папка сгенерированных данных")
+    parser.add_argument("--out", help="файл результатов (по умолчанию benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="файл результатов для сравнения")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="порог регрессии")
+    parser.add_argument(
+        "--startup-budget",
+        type=float,
+        nargs="?",
+        const=STARTUP_BUDGET_SECONDS,
+        help=f"бюджет времени импорта src.main в секундах (по умолчанию {STARTUP_BUDGET_SECONDS})",
+    )
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.repeat, args.seed, args.data_dir, args.only)
+    # Бюджет запуска проверяется, даже если импорт src.main не выбран шаблонами --only.
+    measured = {result["name"] for result in report["results"]}
+    if args.startup_budget is not None and "import src.main" not in measured:
+        report["results"].insert(0, measure_import_time("src.main", args.repeat))
+
+    for result in report["results"]:
+        print(
+            f"{result['name']:<32} {result['rows']:>10} {result['seconds']:>10.4f} s "
+            f"{result['peak_bytes'] / 2**20:>10.1f} MiB"
+        )
+
+    exit_code = 0
+    if args.startup_budget is not None:
+        for result in report["results"]:
+            if result["name"] != "import src.main":
+                continue
+            if result["seconds"] > args.startup_budget or result["loaded"]:
+                print(
+                    f"Превышен бюджет запуска: импорт src.main занимает {result['seconds']:.4f} s "
+                    f"(бюджет {args.startup_budget:.4f} s), загружены модули: {', '.join(result['loaded']) or '-'}."
+                )
+                exit_code = 1
+
+    out_path = args.out or os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as out_file:
+        json.dump(report, out_file, ensure_ascii=False, indent=2)
+    print(f"Результаты записаны в файл {out_path}.")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            regressions = compare_results(json.load(baseline_file), report, args.threshold)
+        for regression in regressions:
+            print(
+                f"Регрессия: {regression['name']} ({regression['rows']} строк) - "
+                f"{regression['baseline_seconds']:.4f} s -> {regression['seconds']:.4f} s "
+                f"(x{regression['ratio']:.2f})."
+            )
+        if regressions:
+            exit_code = 1
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
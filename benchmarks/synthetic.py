@@ -0,0 +1,182 @@
+import csv
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Any, Iterator
+
+import pandas as pd
+
+__all__ = (
+    "CSV_FIELDS",
+    "generate_operations",
+    "generate_csv_rows",
+    "write_operations_json",
+    "write_transactions_csv",
+    "write_transactions_excel",
+)
+
+# Столбцы data/transactions.csv (и data/transactions_excel.xlsx) в порядке следования.
+CSV_FIELDS = ("id", "state", "date", "amount", "currency_name", "currency_code", "from", "to", "description")
+
+# Распределения значений подобраны по файлам из папки data.
+STATES = ("EXECUTED", "CANCELED", "PENDING")
+STATE_WEIGHTS = (70, 15, 15)
+
+DESCRIPTIONS = (
+    "Перевод организации",
+    "Перевод с карты на карту",
+    "Перевод с карты на счет",
+    "Перевод со счета на счет",
+    "Открытие вклада",
+)
+OPENING_DEPOSIT = "Открытие вклада"
+
+JSON_CARDS = ("Maestro", "MasterCard", "Visa Classic", "Visa Gold", "Visa Platinum", "МИР")
+JSON_CURRENCIES = (("руб.", "RUB"), ("USD", "USD"))
+
+CSV_CARDS = ("Discover", "Mastercard", "American Express", "Visa")
+CSV_CURRENCIES = (
+    ("Ruble", "RUB"),
+    ("Dollar", "USD"),
+    ("Euro", "EUR"),
+    ("Yuan Renminbi", "CNY"),
+    ("Rupiah", "IDR"),
+    ("Peso", "PHP"),
+    ("Sol", "PEN"),
+    ("Peso", "COP"),
+    ("Hryvnia", "UAH"),
+    ("Yen", "JPY"),
+)
+
+# Доля пустых записей '{}' (такая запись есть в data/operations.json).
+EMPTY_RECORD_RATE = 0.001
+
+_FIRST_DATE = datetime(2018, 1, 1)
+_DATE_RANGE_SECONDS = 6 * 365 * 24 * 3600
+
+
+def _digits(rng: random.Random, count: int) -> str:
+    """Returns a random string of `count` decimal digits."""
+    return str(rng.randrange(10**count)).zfill(count)
+
+
+def _requisite(rng: random.Random, cards: tuple[str, ...]) -> str:
+    """Returns a random card ('Visa Gold 7000792289606361') or account ('Счет 73654108430135874305')."""
+    if rng.random() < 0.35:
+        return "Счет " + _digits(rng, 20)
+    return rng.choice(cards) + " " + _digits(rng, 16)
+
+
+def _random_date(rng: random.Random) -> datetime:
+    """Returns a random date between 2018 and 2023 with microseconds."""
+    return _FIRST_DATE + timedelta(seconds=rng.randrange(_DATE_RANGE_SECONDS), microseconds=rng.randrange(10**6))
+
+
+def generate_operations(rows: int, seed: int = 0) -> Iterator[dict[str, Any]]:
+    """
+    Generates transactions shaped like data/operations.json.
+
+    Args:
+        rows (int): The number of transactions.
+        seed (int): The seed of the random generator; the same seed gives the same transactions.
+
+    Yields:
+        dict[str, Any]: A nested transaction with 'operationAmount', a date like "2019-08-26T10:50:58.294041"
+            and an amount as a string; opening deposits have no 'from', a small share of records is empty.
+    """
+    rng = random.Random(seed)
+    for _ in range(rows):
+        if rng.random() < EMPTY_RECORD_RATE:
+            yield {}
+            continue
+
+        description = rng.choice(DESCRIPTIONS)
+        currency_name, currency_code = rng.choice(JSON_CURRENCIES)
+        operation: dict[str, Any] = {
+            "id": rng.randrange(10**9),
+            "state": rng.choices(STATES, STATE_WEIGHTS)[0],
+            "date": _random_date(rng).strftime("%Y-%m-%dT%H:%M:%S.%f"),
+            "operationAmount": {
+                "amount": f"{rng.randrange(100, 10**7) / 100:.2f}",
+                "currency": {"name": currency_name, "code": currency_code},
+            },
+            "description": description,
+        }
+        if description != OPENING_DEPOSIT:
+            operation["from"] = _requisite(rng, JSON_CARDS)
+        operation["to"] = _requisite(rng, JSON_CARDS)
+        yield operation
+
+
+def generate_csv_rows(rows: int, seed: int = 0) -> Iterator[list[Any]]:
+    """
+    Generates flat transactions shaped like data/transactions.csv, one list of CSV_FIELDS values per row.
+
+    Args:
+        rows (int): The number of transactions.
+        seed (int): The seed of the random generator; the same seed gives the same transactions.
+
+    Yields:
+        list[Any]: The values of CSV_FIELDS: a date like "2023-09-05T11:30:32Z", an integer amount,
+            an empty 'from' for opening deposits.
+    """
+    rng = random.Random(seed)
+    for _ in range(rows):
+        description = rng.choice(DESCRIPTIONS)
+        currency_name, currency_code = rng.choice(CSV_CURRENCIES)
+        yield [
+            rng.randrange(10**7),
+            rng.choices(STATES, STATE_WEIGHTS)[0],
+            _random_date(rng).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            rng.randrange(1, 40000),
+            currency_name,
+            currency_code,
+            "" if description == OPENING_DEPOSIT else _requisite(rng, CSV_CARDS),
+            _requisite(rng, CSV_CARDS),
+            description,
+        ]
+
+
+def write_operations_json(file_path: str, rows: int, seed: int = 0) -> str:
+    """
+    Writes `rows` transactions from generate_operations into a JSON file without holding them in memory.
+
+    Returns:
+        str: The path of the written file.
+    """
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    with open(file_path, "w", encoding="utf-8") as json_file:
+        json_file.write("[")
+        for number, operation in enumerate(generate_operations(rows, seed)):
+            json_file.write(",\n  " if number else "\n  ")
+            json_file.write(json.dumps(operation, ensure_ascii=False))
+        json_file.write("\n]\n")
+    return file_path
+
+
+def write_transactions_csv(file_path: str, rows: int, seed: int = 0) -> str:
+    """
+    Writes `rows` transactions from generate_csv_rows into a ';'-separated CSV file.
+
+    Returns:
+        str: The path of the written file.
+    """
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    with open(file_path, "w", encoding="utf-8", newline="") as csv_file:
+        writer = csv.writer(csv_file, delimiter=";")
+        writer.writerow(CSV_FIELDS)
+        writer.writerows(generate_csv_rows(rows, seed))
+    return file_path
+
+
+def write_transactions_excel(file_path: str, rows: int, seed: int = 0) -> str:
+    """
+    Writes `rows` transactions from generate_csv_rows into an XLSX file (the layout of transactions_excel.xlsx).
+
+    Returns:
+        str: The path of the written file.
+    """
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    pd.DataFrame(generate_csv_rows(rows, seed), columns=list(CSV_FIELDS)).to_excel(file_path, index=False)
+    return file_path
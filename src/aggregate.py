@@ -0,0 +1,312 @@
+import math
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Hashable, Iterable, Iterator, Sequence
+
+from src.dates import parse_date
+from src.logging_config import silence_worker
+
+__all__ = ("GROUP_KEYS", "AmountStats", "Aggregation", "aggregate", "aggregate_files")
+
+# Первая цифра номера в реквизитах: перед ней - наименование платёжной системы или 'Счет'.
+REQUISITE_NUMBER_PATTERN = re.compile(r"\d")
+
+KeyFunction = Callable[[dict[str, Any]], Hashable]
+
+
+def _description(transaction: dict[str, Any]) -> Any:
+    return transaction.get("description")
+
+
+def _state(transaction: dict[str, Any]) -> Any:
+    # Отсутствующий статус считается 'UNKNOWN', как в filter_by_state.
+    return transaction.get("state", "UNKNOWN")
+
+
+def _currency(transaction: dict[str, Any]) -> Any:
+    currency = (transaction.get("operationAmount") or {}).get("currency")
+    return currency.get("code") if isinstance(currency, dict) else None
+
+
+def _month(transaction: dict[str, Any]) -> Any:
+    date = transaction.get("date")
+    date_obj = parse_date(date) if isinstance(date, str) else None
+    return f"{date_obj.year:04d}-{date_obj.month:02d}" if date_obj else None
+
+
+def _requisite_prefix(value: Any) -> str | None:
+    if not isinstance(value, str):
+        return None
+    return REQUISITE_NUMBER_PATTERN.split(value, 1)[0].strip() or None
+
+
+def _from_account(transaction: dict[str, Any]) -> Any:
+    return _requisite_prefix(transaction.get("from"))
+
+
+def _to_account(transaction: dict[str, Any]) -> Any:
+    return _requisite_prefix(transaction.get("to"))
+
+
+# Ключи группировки по имени: описание, статус, код валюты, месяц даты ('2019-08')
+# и наименование карты или счёта отправителя/получателя ('Visa Classic', 'Счет'). Отсутствующее значение - None.
+GROUP_KEYS: dict[str, KeyFunction] = {
+    "description": _description,
+    "state": _state,
+    "currency": _currency,
+    "month": _month,
+    "from_account": _from_account,
+    "to_account": _to_account,
+}
+
+
+class AmountStats:
+    """
+    Running statistics of the amounts of one group: the number of transactions, and the sum, minimum,
+    maximum and mean of their amounts. Transactions without a usable amount (missing, not a number,
+    no exchange rate) are counted, but do not contribute to the amount statistics (see `amount_count`).
+    """
+
+    __slots__ = ("count", "amount_count", "total", "minimum", "maximum")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.amount_count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def __repr__(self) -> str:
+        return (
+            f"AmountStats(count={self.count}, total={self.total}, minimum={self.minimum}, "
+            f"maximum={self.maximum}, mean={self.mean})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, AmountStats):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    @property
+    def mean(self) -> float:
+        """The mean amount (NaN if no transaction of the group has an amount)."""
+        return self.total / self.amount_count if self.amount_count else math.nan
+
+    def add(self, amount: float | None) -> None:
+        """Accounts for one transaction with the amount `amount` (None - without an amount)."""
+        self.count += 1
+        if amount is None:
+            return
+        self.amount_count += 1
+        self.total += amount
+        if amount < self.minimum:
+            self.minimum = amount
+        if amount > self.maximum:
+            self.maximum = amount
+
+    def merge(self, other: "AmountStats") -> None:
+        """Adds the statistics of another part of the same group."""
+        self.count += other.count
+        self.amount_count += other.amount_count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    def as_dict(self) -> dict[str, float]:
+        """The statistics as a dictionary: count, sum, min, max and mean (min and max are NaN without amounts)."""
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.minimum if self.amount_count else math.nan,
+            "max": self.maximum if self.amount_count else math.nan,
+            "mean": self.mean,
+        }
+
+
+class Aggregation:
+    """
+    A streaming aggregation of transactions: groups them by one or more keys and keeps AmountStats
+    of the 'operationAmount.amount' per group.
+
+    Transactions are consumed one at a time (`add`, `update`), so any iterable, e.g. a streaming reader,
+    is aggregated in one pass with memory proportional to the number of groups, not rows. Aggregations
+    of parts of the data (files, shards processed by other processes) are combined with `merge`; they are
+    picklable if the key functions are module-level functions.
+
+    Example:
+        >>> by_month = Aggregation(("month", "currency")).update(iter_transactions_from_json("data/operations.json"))
+        >>> by_month[("2019-08", "RUB")].as_dict()
+    """
+
+    def __init__(
+        self,
+        by: str | KeyFunction | Sequence[str | KeyFunction] = "description",
+        rub: bool = False,
+        rates: dict[str, float] | None = None,
+    ) -> None:
+        """
+        Args:
+            by (str | Callable | Sequence[str | Callable]): The group key: a name of GROUP_KEYS or a function
+                of a transaction; several keys make tuple group keys.
+            rub (bool): Aggregate the RUB equivalents of the amounts (like get_transaction_amounts:
+                amount / rate, rounded to 2 decimal places) instead of the amounts in their own currencies.
+            rates (dict[str, float] | None): The exchange rates {code: units per rouble}; by default they are
+                requested once from src.external_api.get_rates_table when a non-RUB amount is met.
+
+        Raises:
+            ValueError: If a key name is not in GROUP_KEYS.
+        """
+        keys = [by] if isinstance(by, str) or callable(by) else list(by)
+        unknown = [key for key in keys if isinstance(key, str) and key not in GROUP_KEYS]
+        if unknown:
+            raise ValueError(
+                f"Неизвестные ключи группировки: {', '.join(unknown)}. Допустимые: {', '.join(GROUP_KEYS)}."
+            )
+
+        self.by = tuple(keys)
+        self.rub = rub
+        self.rates = rates
+        self.groups: dict[Hashable, AmountStats] = {}
+        self._key_functions = [GROUP_KEYS[key] if isinstance(key, str) else key for key in keys]
+
+    def __repr__(self) -> str:
+        return f"Aggregation(by={self.by!r}, rub={self.rub!r}, groups={len(self.groups)})"
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.groups)
+
+    def __getitem__(self, key: Hashable) -> AmountStats:
+        return self.groups[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.groups
+
+    def key(self, transaction: dict[str, Any]) -> Hashable:
+        """The group key of a transaction (a tuple if the aggregation has several keys)."""
+        if len(self._key_functions) == 1:
+            return self._key_functions[0](transaction)
+        return tuple(key_function(transaction) for key_function in self._key_functions)
+
+    def amount(self, transaction: dict[str, Any]) -> float | None:
+        """The amount of a transaction (in RUB if `rub`); None if it is missing, not a number or not convertible."""
+        operation_amount = transaction.get("operationAmount")
+        if not isinstance(operation_amount, dict):
+            return None
+        try:
+            amount = float(operation_amount.get("amount", "nan"))
+        except (TypeError, ValueError):
+            return None
+        if math.isnan(amount):
+            return None
+
+        code = _currency(transaction)
+        if not self.rub or code == "RUB":
+            return amount
+        if self.rates is None:
+            self.rates = _rub_rates()
+        rate = self.rates.get(code) if isinstance(code, str) else None
+        return round(amount / rate, 2) if rate else None
+
+    def add(self, transaction: dict[str, Any]) -> None:
+        """Accounts for one transaction."""
+        key = self.key(transaction)
+        stats = self.groups.get(key)
+        if stats is None:
+            stats = self.groups[key] = AmountStats()
+        stats.add(self.amount(transaction))
+
+    def update(self, transactions: Iterable[dict[str, Any]]) -> "Aggregation":
+        """Accounts for all transactions of an iterable (a list, a streaming reader, a TransactionTable)."""
+        for transaction in transactions:
+            self.add(transaction)
+        return self
+
+    def merge(self, other: "Aggregation") -> "Aggregation":
+        """
+        Adds the groups of an aggregation of other transactions with the same keys.
+
+        Raises:
+            ValueError: If the aggregations have different keys or amount currencies.
+        """
+        if (other.by, other.rub) != (self.by, self.rub):
+            raise ValueError(f"Агрегаты с разными параметрами не объединяются: {self!r} и {other!r}.")
+        for key, other_stats in other.groups.items():
+            stats = self.groups.get(key)
+            if stats is None:
+                stats = self.groups[key] = AmountStats()
+            stats.merge(other_stats)
+        return self
+
+    def result(self) -> dict[Hashable, dict[str, float]]:
+        """The statistics of all groups as dictionaries (see AmountStats.as_dict)."""
+        return {key: stats.as_dict() for key, stats in self.groups.items()}
+
+
+def _rub_rates() -> dict[str, float]:
+    """The exchange rates against RUB (see get_rates_table); an empty table if they are unavailable."""
+    from src.external_api import get_rates_table
+
+    status, rates = get_rates_table("RUB")
+    return rates if status and isinstance(rates, dict) else {}
+
+
+def aggregate(
+    transactions: Iterable[dict[str, Any]],
+    by: str | KeyFunction | Sequence[str | KeyFunction] = "description",
+    rub: bool = False,
+) -> Aggregation:
+    """
+    Aggregates transactions in one pass: see Aggregation.
+
+    Example:
+        >>> aggregate(transactions, by="state").result()
+        {'EXECUTED': {'count': 74, 'sum': ..., 'min': ..., 'max': ..., 'mean': ...}, ...}
+    """
+    return Aggregation(by, rub).update(transactions)
+
+
+def _aggregate_file(file_path: str, empty: Aggregation) -> Aggregation:
+    """Aggregates one file in a worker process, streaming its transactions."""
+    from src.readers import open_transactions
+
+    return empty.update(open_transactions(file_path))
+
+
+def aggregate_files(
+    file_paths: Sequence[str],
+    by: str | KeyFunction | Sequence[str | KeyFunction] = "description",
+    rub: bool = False,
+    workers: int | None = None,
+) -> Aggregation:
+    """
+    Aggregates several transaction files (of any format of src.readers): each file is aggregated
+    by a separate process and the aggregations are merged. The exchange rates are requested once.
+
+    Args:
+        file_paths (Sequence[str]): The files.
+        by: The group key (see Aggregation).
+        rub (bool): Aggregate the RUB equivalents of the amounts.
+        workers (int | None): The number of worker processes (None - one per file, at most the number of CPUs;
+            1 - the files are aggregated in this process).
+
+    Returns:
+        Aggregation: The aggregation of all transactions of the files.
+    """
+    empty = Aggregation(by, rub, _rub_rates() if rub else None)
+    result = Aggregation(by, rub, empty.rates)
+    if workers is None:
+        from src.parallel import available_workers
+
+        workers = min(available_workers(), len(file_paths))
+    if workers <= 1 or len(file_paths) < 2:
+        for file_path in file_paths:
+            result.merge(_aggregate_file(file_path, Aggregation(by, rub, empty.rates)))
+        return result
+
+    with ProcessPoolExecutor(workers, initializer=silence_worker) as pool:
+        for part in pool.map(_aggregate_file, file_paths, [empty] * len(file_paths)):
+            result.merge(part)
+    return result
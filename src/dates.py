@@ -0,0 +1,102 @@
+import math
+from datetime import datetime
+from functools import lru_cache
+
+__all__ = ("DATE_FORMATS", "parse_date", "date_epoch", "format_date")
+
+# Допустимые форматы даты-времени транзакций.
+DATE_FORMATS = (
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%SZ",
+)
+
+# Размер кэша разобранных дат: в выгрузках одни и те же отметки времени встречаются многократно.
+DATE_CACHE_SIZE = 1 << 16
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _parse_fixed_width(raw_date_str: str) -> datetime | None:
+    """
+    Fast path for the two known fixed-width formats: 'YYYY-MM-DDTHH:MM:SS.ffffff' and 'YYYY-MM-DDTHH:MM:SSZ'.
+
+    The fields are sliced out by position instead of going through strptime.
+    Returns None if the string does not have one of these shapes.
+    """
+    length = len(raw_date_str)
+    if length == 26 and raw_date_str[19] == ".":
+        digits = raw_date_str[:4] + raw_date_str[5:7] + raw_date_str[8:10]
+        digits += raw_date_str[11:13] + raw_date_str[14:16] + raw_date_str[17:19] + raw_date_str[20:]
+    elif length == 20 and raw_date_str[19] == "Z":
+        digits = raw_date_str[:4] + raw_date_str[5:7] + raw_date_str[8:10]
+        digits += raw_date_str[11:13] + raw_date_str[14:16] + raw_date_str[17:19]
+    else:
+        return None
+
+    if (
+        raw_date_str[4] != "-"
+        or raw_date_str[7] != "-"
+        or raw_date_str[10] != "T"
+        or raw_date_str[13] != ":"
+        or raw_date_str[16] != ":"
+        or not (digits.isascii() and digits.isdigit())
+    ):
+        return None
+
+    try:
+        return datetime(
+            int(digits[:4]),
+            int(digits[4:6]),
+            int(digits[6:8]),
+            int(digits[8:10]),
+            int(digits[10:12]),
+            int(digits[12:14]),
+            int(digits[14:]) if length == 26 else 0,
+        )
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(raw_date_str: str) -> datetime | None:
+    """
+    Parses a transaction date string in one of DATE_FORMATS.
+
+    The two known fixed-width shapes are parsed by slicing; other strings (e.g. fewer fractional digits)
+    fall back to `datetime.strptime`. Results are memoised, so repeated timestamps are parsed once.
+
+    Args:
+        raw_date_str (str): A date string, e.g. "2019-08-26T10:50:58.294041" or "2023-09-05T11:30:32Z".
+
+    Returns:
+        datetime | None: The parsed date (naive, 'Z' dates are taken as is),
+            or None if the string matches none of DATE_FORMATS.
+    """
+    date_obj = _parse_fixed_width(raw_date_str)
+    if date_obj is not None:
+        return date_obj
+
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(raw_date_str, date_format)
+        except ValueError:
+            continue
+
+    return None
+
+
+def date_epoch(raw_date_str: str) -> float:
+    """
+    Converts a transaction date string into seconds since 1970-01-01 (NaN if the string cannot be parsed).
+
+    Unlike the raw strings, epochs order dates of both formats correctly.
+    """
+    date_obj = parse_date(raw_date_str)
+    if date_obj is None:
+        return math.nan
+    return (date_obj - _EPOCH).total_seconds()
+
+
+def format_date(date_obj: datetime) -> str:
+    """Formats a parsed transaction date for display as 'dd.mm.yyyy'."""
+    return f"{date_obj.day:02d}.{date_obj.month:02d}.{date_obj.year:04d}"
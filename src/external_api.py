@@ -1,13 +1,234 @@
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Sequence
 
-import requests
-from dotenv import load_dotenv
+# requests, urllib3 и dotenv импортируются при первом обращении к API: импорт модуля их не загружает.
+if TYPE_CHECKING:
+    import requests
+
+__all__ = (
+    "get_exchange_rate",
+    "get_exchange_rates_many",
+    "get_rates_table",
+    "convert_amount",
+    "clear_rates_cache",
+)
+
+DEFAULT_API_URL = "https://api.apilayer.com/exchangerates_data"
+DEFAULT_RATES_TTL = 3600.0
+DEFAULT_FAILURE_TTL = 60.0
+
+# Параметры HTTP-клиента: таймаут запроса (с), предел одновременных запросов и политика повторов.
+REQUEST_TIMEOUT = 10.0
+MAX_IN_FLIGHT_REQUESTS = 8
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Кэш таблиц курсов в памяти процесса: базовая валюта -> (момент загрузки, {код валюты: курс к базовой валюте}).
+_rates_cache: dict[str, tuple[float, dict[str, float]]] = {}
+
+# Кэш неудачных запросов таблиц курсов: базовая валюта -> (момент запроса, сообщение об ошибке).
+_failures_cache: dict[str, tuple[float, str]] = {}
+
+_session: "requests.Session | None" = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> "requests.Session":
+    """
+    Returns the shared HTTP session of the module, creating it on first use.
+
+    The session keeps persistent (keep-alive) connections to the external API in a pool
+    of MAX_IN_FLIGHT_REQUESTS connections and retries GET requests with exponential backoff
+    on connection errors and on 429/5xx responses.
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=RETRY_TOTAL,
+                backoff_factor=RETRY_BACKOFF_FACTOR,
+                status_forcelist=RETRY_STATUS_CODES,
+                allowed_methods=("GET",),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_IN_FLIGHT_REQUESTS, max_retries=retry)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+
+    return _session
+
+
+def _request_timeout() -> float:
+    """Таймаут запроса к внешнему API в секундах (переменная окружения API_TIMEOUT)."""
+    return float(os.getenv("API_TIMEOUT", str(REQUEST_TIMEOUT)))
+
+
+def _rates_ttl() -> float:
+    """Время жизни таблицы курсов в секундах (переменная окружения EXCHANGE_RATES_TTL)."""
+    return float(os.getenv("EXCHANGE_RATES_TTL", str(DEFAULT_RATES_TTL)))
+
+
+def _failure_ttl() -> float:
+    """Время в секундах, в течение которого не повторяется неудачный запрос курсов (EXCHANGE_RATES_FAILURE_TTL)."""
+    return float(os.getenv("EXCHANGE_RATES_FAILURE_TTL", str(DEFAULT_FAILURE_TTL)))
+
+
+def _read_snapshot(base_currency: str) -> tuple[float, dict[str, float]] | None:
+    """
+    Reads a previously saved rate table from the on-disk snapshot (EXCHANGE_RATES_SNAPSHOT).
+
+    Returns:
+        tuple[float, dict[str, float]] | None: The fetch timestamp and the rate table,
+            or None if the snapshot is disabled, missing, unreadable or has no table for `base_currency`.
+    """
+    snapshot_path = os.getenv("EXCHANGE_RATES_SNAPSHOT")
+    if not snapshot_path:
+        return None
+
+    try:
+        with open(snapshot_path, "r", encoding="utf-8") as snapshot_file:
+            entry = json.load(snapshot_file).get(base_currency)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+    if not isinstance(entry, dict) or not isinstance(entry.get("rates"), dict):
+        return None
+    return float(entry.get("timestamp", 0)), {code: float(rate) for code, rate in entry["rates"].items()}
+
+
+def _write_snapshot(base_currency: str, fetched_at: float, rates: dict[str, float]) -> None:
+    """Saves the rate table to the on-disk snapshot, keeping the tables of other base currencies."""
+    snapshot_path = os.getenv("EXCHANGE_RATES_SNAPSHOT")
+    if not snapshot_path:
+        return
+
+    try:
+        with open(snapshot_path, "r", encoding="utf-8") as snapshot_file:
+            snapshot = json.load(snapshot_file)
+        if not isinstance(snapshot, dict):
+            snapshot = {}
+    except (OSError, ValueError):
+        snapshot = {}
+
+    snapshot[base_currency] = {"timestamp": fetched_at, "rates": rates}
+    try:
+        with open(snapshot_path, "w", encoding="utf-8") as snapshot_file:
+            json.dump(snapshot, snapshot_file)
+    except OSError:
+        pass
+
+
+def clear_rates_cache() -> None:
+    """Drops the rate tables and the failed requests kept in the in-process cache (the snapshot is left untouched)."""
+    _rates_cache.clear()
+    _failures_cache.clear()
+
+
+def get_rates_table(base_currency: str = "RUB") -> tuple[bool, dict[str, float] | str]:
+    """
+    Returns the table of exchange rates relative to `base_currency`.
+
+    The table is requested from the external API (`/latest` endpoint) at most once per TTL
+    (EXCHANGE_RATES_TTL, one hour by default) and kept in an in-process cache. If EXCHANGE_RATES_SNAPSHOT
+    points to a file, a fresh table is also read from / written to that on-disk snapshot,
+    so that subsequent runs of the application do not hit the network at all. A failed request is not repeated
+    for EXCHANGE_RATES_FAILURE_TTL seconds (one minute by default): the same error is returned instead,
+    so converting many amounts while the API is down does not wait for the retries of every amount.
+
+    Args:
+        base_currency (str, optional): The currency code the rates are expressed against. Defaults to 'RUB'.
+
+    Returns:
+        tuple[bool, dict[str, float] | str]: A tuple where the first element is a boolean indicating
+            whether the table is available, and the second element is either the table
+            ({currency code: units of the currency per one unit of `base_currency`}) or an error message.
+    """
+    now = time.time()
+
+    cached = _rates_cache.get(base_currency)
+    if cached is not None and now - cached[0] < _rates_ttl():
+        return True, cached[1]
+
+    failure = _failures_cache.get(base_currency)
+    if failure is not None and now - failure[0] < _failure_ttl():
+        return False, failure[1]
+
+    import requests
+    from dotenv import load_dotenv
+
+    # Файл .env перечитывается только при промахе кэша, а не при каждой конвертации.
+    load_dotenv()
+    ttl = _rates_ttl()
+    snapshot = _read_snapshot(base_currency)
+    if snapshot is not None and now - snapshot[0] < ttl:
+        _rates_cache[base_currency] = snapshot
+        return True, snapshot[1]
+
+    url = f"{os.getenv('API_URL', DEFAULT_API_URL)}/latest?base={base_currency}"
+    # Без API_KEY заголовок не передаётся (requests так же пропускает заголовки со значением None).
+    api_key = os.getenv("API_KEY")
+    headers = {"apikey": api_key} if api_key is not None else {}
+
+    try:
+        response = _get_session().get(url, headers=headers, timeout=_request_timeout())
+
+        if response.status_code != 200:
+            _failures_cache[base_currency] = (now, str(response.reason))
+            return False, str(response.reason)
+
+        rates = {code: float(rate) for code, rate in response.json().get("rates", {}).items()}
+
+    except requests.exceptions.RequestException as ex:
+        _failures_cache[base_currency] = (now, str(ex))
+        return False, str(ex)
+
+    _failures_cache.pop(base_currency, None)
+    rates[base_currency] = 1.0
+    _rates_cache[base_currency] = (now, rates)
+    _write_snapshot(base_currency, now, rates)
+    return True, rates
+
+
+def convert_amount(amount: float, from_currency: str, rates: dict[str, float]) -> tuple[bool, str]:
+    """
+    Converts an amount into the base currency of the rate table locally, without any network calls.
+
+    Args:
+        amount (float): The amount of money to convert.
+        from_currency (str): The currency code of the money to convert.
+        rates (dict[str, float]): The rate table returned by `get_rates_table`.
+
+    Returns:
+        tuple[bool, str]: A tuple where the first element is a boolean indicating
+            whether the conversion was successful, and the second element is either the
+            converted amount or an error message.
+    """
+    rate = rates.get(from_currency)
+    if not rate:
+        return False, f"Курс валюты {from_currency} не найден."
+
+    return True, str(round(float(amount) / rate, 2))
 
 
 def get_exchange_rate(amount: float, from_currency: str, to_currency: str = "RUB") -> tuple[bool, str]:
     """
     Perform a currency exchange rate conversion.
 
+    The conversion is made locally against the cached rate table of `to_currency`
+    (see `get_rates_table`), so converting many amounts costs a single request to the external API.
+
     Args:
         amount (float): The amount of money to convert.
         from_currency (str): The currency code of the money to convert.
@@ -18,23 +239,44 @@ def get_exchange_rate(amount: float, from_currency: str, to_currency: str = "RUB
             whether the conversion was successful, and the second element is either the
             converted amount or an error message.
     """
-    load_dotenv()
+    status, rates = get_rates_table(to_currency)
+    if not status or isinstance(rates, str):
+        return False, str(rates)
 
-    url = (
-        f"{os.getenv("API_URL", "https://api.apilayer.com/exchangerates_data")}"
-        "/convert?to={to_currency}&from={from_currency}&amount={amount}"
-    )
-    headers = {"apikey": os.getenv("API_KEY")}
+    return convert_amount(amount, from_currency, rates)
 
-    try:
-        response = requests.get(url, headers=headers)
-        status_code = response.status_code
 
-        if status_code == 200:
-            response_result = response.json().get("result")
-            return True, str(round(float(response_result), 2))
+def get_exchange_rates_many(
+    conversions: Sequence[tuple[float, str, str]], max_workers: int = MAX_IN_FLIGHT_REQUESTS
+) -> list[tuple[bool, str]]:
+    """
+    Perform many currency conversions at once.
 
-        return False, str(response.reason)
+    Rate tables of all distinct target currencies that are not in the cache yet are requested
+    concurrently over the pooled session (at most `max_workers` requests in flight),
+    then every amount is converted locally.
 
-    except requests.exceptions.RequestException as ex:
-        return False, str(ex)
+    Args:
+        conversions (Sequence[tuple[float, str, str]]): A sequence of (amount, from_currency, to_currency) tuples.
+        max_workers (int, optional): The maximum number of concurrent requests. Defaults to MAX_IN_FLIGHT_REQUESTS.
+
+    Returns:
+        list[tuple[bool, str]]: The results of `get_exchange_rate` for every conversion, in the input order.
+    """
+    base_currencies = list(dict.fromkeys(to_currency for _, _, to_currency in conversions))
+
+    if len(base_currencies) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(base_currencies))) as executor:
+            tables = dict(zip(base_currencies, executor.map(get_rates_table, base_currencies)))
+    else:
+        tables = {base_currency: get_rates_table(base_currency) for base_currency in base_currencies}
+
+    results = []
+    for amount, from_currency, to_currency in conversions:
+        status, rates = tables[to_currency]
+        if not status or isinstance(rates, str):
+            results.append((False, str(rates)))
+        else:
+            results.append(convert_amount(amount, from_currency, rates))
+
+    return results
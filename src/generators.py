@@ -1,13 +1,19 @@
-from typing import Any, Iterator
+from typing import Any, Iterable, Iterator
+
+from src.table import TransactionTable
 
 __all__ = ("filter_by_currency", "transaction_descriptions", "card_number_generator")
 
 
-def filter_by_currency(transactions: list[dict[str, Any]], currency: str = "USD") -> Iterator[dict[str, Any]]:
+def filter_by_currency(
+    transactions: Iterable[dict[str, Any]] | TransactionTable, currency: str = "USD"
+) -> Iterator[dict[str, Any]]:
     """
-    :Назначение функции: фильтрация списка словарей банковских операций по значению ключа 'currency'.
+    :Назначение функции: фильтрация списка словарей банковских операций по значению ключа 'currency'
+                         (operationAmount.currency.code; для словарей без 'operationAmount' - currency.code).
 
-    :param transactions: список словарей банковских операций для фильтрации.
+    :param transactions: список (или любой итерируемый источник) словарей банковских операций для фильтрации,
+                         либо таблица TransactionTable (фильтруется векторно по столбцу кода валюты).
     :param currency: значение ключа 'currency' для фильтрации. По умолчанию, 'USD'.
     :return: итератор словарей.
     """
@@ -15,12 +21,17 @@ def filter_by_currency(transactions: list[dict[str, Any]], currency: str = "USD"
     if currency not in ["USD", "RUB"]:
         raise ValueError("Валюта должна быть одним из: USD, RUB")
 
+    if isinstance(transactions, TransactionTable):
+        yield from transactions.where(transactions.currency_mask(currency))
+        return
+
     for transaction in transactions:
         if not isinstance(transaction, dict):
             raise TypeError("Значение должно быть словарем.")
         try:
-            if "currency" in transaction and "code" in transaction["currency"]:
-                if transaction.get("currency", {}).get("code") == currency:
+            operation_amount = transaction.get("operationAmount", transaction)
+            if "currency" in operation_amount and "code" in operation_amount["currency"]:
+                if operation_amount["currency"]["code"] == currency:
                     yield transaction
         except KeyError:
             raise KeyError("В словаре транзакции отсутствует ключ 'currency' или подключ 'code'.")
@@ -29,11 +40,11 @@ def filter_by_currency(transactions: list[dict[str, Any]], currency: str = "USD"
             raise TypeError(f"Тип значения ключа 'currency' в словаре транзакции должен быть словарем: {e}")
 
 
-def transaction_descriptions(transactions: list[dict[str, Any]]) -> Iterator[str]:
+def transaction_descriptions(transactions: Iterable[dict[str, Any]]) -> Iterator[str]:
     """
     Generate an iterator of transaction descriptions from a list of transaction dictionaries.
     Args:
-        transactions (list[dict[str, Any]]): A list of dictionaries representing transactions. Each dictionary
+        transactions (Iterable[dict[str, Any]]): A list (or a TransactionTable) of transactions. Each dictionary
             should have a "description" key.
     Yields:
         str: The description of each transaction.
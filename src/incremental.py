@@ -0,0 +1,309 @@
+import hashlib
+import io
+import json
+import os
+from typing import Any, Callable, Iterator
+
+import numpy as np
+
+from src.logging_config import get_logger
+from src.parallel import run_pipeline
+from src.query import TransactionQuery
+from src.readers import detect_format, open_transactions
+from src.table import TransactionTable, _date_order
+
+__all__ = ("checkpoint_path", "read_appended", "run_incremental")
+
+logger = get_logger(__name__, "incremental.log")
+
+# Версия формата контрольной точки: точки другой версии не используются, отчёт строится заново.
+CHECKPOINT_VERSION = 2
+
+# Число байтов перед контрольной точкой, по хешу которых проверяется, что файл с тех пор только дописывался.
+TAIL_DIGEST_SIZE = 1 << 16
+
+# Размер блока (в байтах) при поиске конца последней полной строки файла.
+LINE_SCAN_BLOCK_SIZE = 1 << 16
+
+# Форматы, новые строки которых читаются с байтового смещения (без сжатия); остальные - по числу прочитанных строк.
+OFFSET_FORMATS = ("ndjson", "csv")
+
+
+def checkpoint_path(out: str) -> str:
+    """The default checkpoint of the report `out`: '<out>.checkpoint.json'."""
+    return f"{out}.checkpoint.json"
+
+
+def _tail_digest(file_path: str, offset: int) -> str:
+    """The BLAKE2b hex digest of the TAIL_DIGEST_SIZE bytes of the file preceding `offset`."""
+    with open(file_path, "rb") as source_file:
+        start = max(offset - TAIL_DIGEST_SIZE, 0)
+        source_file.seek(start)
+        return hashlib.blake2b(source_file.read(offset - start), digest_size=20).hexdigest()
+
+
+def _complete_lines_end(file_path: str) -> int:
+    """The offset after the last newline of the file: a line that is still being appended is not read."""
+    with open(file_path, "rb") as source_file:
+        end = source_file.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(end - LINE_SCAN_BLOCK_SIZE, 0)
+            source_file.seek(start)
+            newline = source_file.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+
+def _appended_start(file_path: str, offset: int) -> int | None:
+    """
+    The offset of the first line appended after `offset`, or None if the last line read (it ended at `offset`
+    without a newline) was continued since then rather than followed by a newline and new lines.
+    """
+    with open(file_path, "rb") as source_file:
+        source_file.seek(offset - 1)
+        previous, following = source_file.read(1), source_file.read(2)
+    if previous == b"\n" or not following:
+        return offset
+    for newline in (b"\n", b"\r\n"):
+        if following.startswith(newline):
+            return offset + len(newline)
+    return None
+
+
+def _read_from_offset(file_path: str, format_name: str, start: int, end: int) -> list[dict[str, Any]]:
+    """Reads the transactions of the complete lines in [start, end) of an NDJSON or CSV file."""
+    if start >= end:
+        return []
+    if format_name == "ndjson":
+        from src.utils import iter_transactions_from_ndjson
+
+        return list(iter_transactions_from_ndjson(file_path, start, end))
+
+    from src.read_from_file import iter_transactions_from_csv
+
+    with open(file_path, "rb") as csv_file:
+        # Новые строки CSV-файла разбираются вместе с его заголовком.
+        header = csv_file.readline() if start else b""
+        csv_file.seek(start)
+        data = io.BytesIO(header + csv_file.read(end - start))
+    return [transaction for chunk in iter_transactions_from_csv(data) for transaction in chunk]
+
+
+def read_appended(
+    file_path: str, position: dict[str, Any] | None
+) -> tuple[list[dict[str, Any]], bool, dict[str, Any]]:
+    """
+    Reads the transactions appended to a file since `position` (see the returned position).
+
+    Uncompressed NDJSON and CSV files are read from the byte offset where the previous read stopped. A last line
+    without a newline is read only when the file is read from the beginning or has not grown since the previous
+    read; otherwise it may still be being appended and is read next time. Such a file counts as appended to while
+    the bytes before the offset are unchanged (a hash of TAIL_DIGEST_SIZE bytes) and a last line read without
+    a newline has not been continued since. Other files (JSON arrays, XLSX, compressed
+    files) are parsed again, and the transactions after the previously read number of rows are returned if the last
+    previously read row still has the same id and date. Otherwise all transactions of the file are returned as new.
+
+    Args:
+        file_path (str): The path to the file.
+        position (dict[str, Any] | None): The position returned by the previous call, or None.
+
+    Returns:
+        tuple[list[dict[str, Any]], bool, dict[str, Any]]: The new transactions; True if the file was read
+            from the beginning; the position after them: the format, the byte offset, the size of the file,
+            the number of rows, the id and the date of the last row and the hash of the bytes before the offset.
+    """
+    transaction_format, compression = detect_format(file_path)
+    by_offset = compression is None and transaction_format.name in OFFSET_FORMATS
+    start, rows, last, digest, size = 0, 0, None, None, None
+    if (
+        position is not None
+        and position.get("format") == transaction_format.name
+        and position.get("by_offset") == by_offset
+    ):
+        start, rows, digest, size = position["offset"], position["rows"], position["digest"], position["size"]
+        last = (position["last_id"], position["last_date"])
+
+    end = file_size = os.path.getsize(file_path)
+    if by_offset:
+        appended = _appended_start(file_path, start) if 0 < start <= end else None
+        if appended is None or _tail_digest(file_path, start) != digest:
+            start, rows, last, appended = 0, 0, None, 0
+        # Последняя строка без перевода строки читается, только если файл читается целиком или не вырос
+        # с прошлого раза: иначе она, возможно, ещё дописывается.
+        if start and end != size:
+            end = max(min(_complete_lines_end(file_path), file_size), start)
+        transactions = _read_from_offset(file_path, transaction_format.name, appended, end)
+    else:
+        transactions = list(open_transactions(file_path))
+        previous = transactions[rows - 1] if 0 < rows <= len(transactions) else None
+        if previous is None or (previous.get("id"), previous.get("date")) != last:
+            start, rows, last = 0, 0, None
+        transactions = transactions[rows:]
+
+    full = rows == 0
+    if transactions:
+        last = (transactions[-1].get("id"), transactions[-1].get("date"))
+    new_position = {
+        "format": transaction_format.name,
+        "by_offset": by_offset,
+        "offset": end,
+        "size": file_size,
+        "rows": rows + len(transactions),
+        "last_id": last[0] if last else None,
+        "last_date": last[1] if last else None,
+        "digest": _tail_digest(file_path, end) if by_offset else None,
+    }
+    return transactions, full, new_position
+
+
+def _load_state(checkpoint_file: str, source: str, criteria: dict[str, Any], out: str) -> dict[str, Any] | None:
+    """
+    Loads the checkpoint of the report if it belongs to the same source and criteria and the report file
+    is the one written with it (the same size and modification time), i.e. no run was interrupted.
+    """
+    try:
+        with open(checkpoint_file, "r", encoding="utf-8") as state_file:
+            state = json.load(state_file)
+        entries = np.load(f"{checkpoint_file}.entries.npy")
+        report = os.stat(out)
+    except (OSError, ValueError):
+        return None
+
+    if (
+        not isinstance(state, dict)
+        or state.get("version") != CHECKPOINT_VERSION
+        or state.get("source") != os.path.abspath(source)
+        or state.get("criteria") != criteria
+        or state.get("report") != [report.st_size, report.st_mtime_ns]
+        or len(entries) != state.get("count")
+        or int(entries["length"].sum()) != report.st_size
+    ):
+        return None
+    state["entries"] = entries
+    return state
+
+
+def _entries(lines: list[str], epochs: np.ndarray | None) -> tuple[list[bytes], np.ndarray]:
+    """Encodes report entries and builds their index: the date epoch and the byte length of every entry."""
+    encoded = [line.encode("utf-8") for line in lines]
+    entries = np.zeros(len(encoded), dtype=[("epoch", np.float64), ("length", np.int64)])
+    entries["length"] = [len(entry) for entry in encoded]
+    if epochs is not None:
+        entries["epoch"] = epochs
+    return encoded, entries
+
+
+def _merged(
+    out: str, old: np.ndarray, new: list[bytes], new_entries: np.ndarray, descending: bool
+) -> tuple[Iterator[bytes], np.ndarray]:
+    """
+    Merges the entries of the report file `out` (index `old`) with the `new` ones (index `new_entries`) by date.
+
+    The entries of both parts are ordered stably, the old ones first, so the report is the one
+    a full run over the whole file would produce.
+    """
+    with open(out, "rb") as report_file:
+        report = report_file.read()
+    offsets = np.concatenate(([0], np.cumsum(old["length"])))
+    parts = [report[offsets[index] : offsets[index + 1]] for index in range(len(old))] + new
+    order = _date_order(np.concatenate((old["epoch"], new_entries["epoch"])), descending)
+    return (parts[index] for index in order.tolist()), order
+
+
+def _write_atomic(file_path: str, chunks: Iterator[bytes]) -> None:
+    """Writes the file through a temporary one, so the previous version stays intact if writing fails."""
+    tmp_path = f"{file_path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as tmp_file:
+        tmp_file.writelines(chunks)
+    os.replace(tmp_path, file_path)
+
+
+def run_incremental(
+    source: str,
+    query: TransactionQuery,
+    render: Callable[[dict[str, Any]], str],
+    out: str,
+    criteria: dict[str, Any],
+    checkpoint_file: str | None = None,
+    workers: int | None = None,
+) -> int:
+    """
+    Updates the report `out` with the transactions appended to `source` since the previous run.
+
+    The checkpoint (by default '<out>.checkpoint.json', see checkpoint_path) keeps the position in the source
+    (see read_appended) and the index of the report entries ('<checkpoint>.entries.npy': the date and the length
+    of every entry). Only the new transactions are filtered by `query` and rendered; they are appended
+    to the report or, if the query orders by date, merged into it by date. The report equals the report
+    of a full run. The report is built from scratch if there is no valid checkpoint for this source
+    and these criteria, or if the source was rewritten rather than appended to.
+
+    Args:
+        source (str): The transaction file.
+        query (TransactionQuery): The filters and the order of the report.
+        render (Callable[[dict[str, Any]], str]): Renders one transaction (a module-level function).
+        out (str): The report file.
+        criteria (dict[str, Any]): The options the report depends on (filters, order, format); a checkpoint
+            saved with other criteria is not used.
+        checkpoint_file (str | None): The checkpoint file.
+        workers (int | None): The number of processes (see run_pipeline).
+
+    Returns:
+        int: The number of transactions in the report.
+
+    Raises:
+        KeyError: If the report is ordered by date and a matching transaction has no 'date'.
+    """
+    checkpoint_file = checkpoint_file or checkpoint_path(out)
+    entries_file = f"{checkpoint_file}.entries.npy"
+    state = _load_state(checkpoint_file, source, criteria, out)
+
+    transactions, full, position = read_appended(source, state["position"] if state else None)
+    if full:
+        state = None
+
+    table = TransactionTable.from_records(transactions)
+    epochs = query.run(table).date_epochs() if query.descending is not None else None
+    new, new_entries = _entries(run_pipeline(table, query, render, workers), epochs)
+
+    if state is None:
+        _write_atomic(out, iter(new))
+        entries = new_entries
+    elif not new:
+        entries = state["entries"]
+    elif query.descending is None:
+        with open(out, "ab") as report_file:
+            report_file.writelines(new)
+        entries = np.concatenate((state["entries"], new_entries))
+    else:
+        chunks, order = _merged(out, state["entries"], new, new_entries, query.descending)
+        _write_atomic(out, chunks)
+        entries = np.concatenate((state["entries"], new_entries))[order]
+
+    np.save(entries_file, entries, allow_pickle=False)
+    report = os.stat(out)
+    with open(f"{checkpoint_file}.tmp{os.getpid()}", "w", encoding="utf-8") as state_file:
+        json.dump(
+            {
+                "version": CHECKPOINT_VERSION,
+                "source": os.path.abspath(source),
+                "criteria": criteria,
+                "position": position,
+                "count": len(entries),
+                "report": [report.st_size, report.st_mtime_ns],
+            },
+            state_file,
+            ensure_ascii=False,
+        )
+    os.replace(f"{checkpoint_file}.tmp{os.getpid()}", checkpoint_file)
+
+    logger.info(
+        "Отчёт %s обновлён: %s, новых транзакций в файле %s: %d, в отчёте: %d.",
+        out,
+        "построен заново" if state is None else "дополнен",
+        source,
+        len(transactions),
+        len(entries),
+    )
+    return len(entries)
@@ -0,0 +1,188 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+__all__ = ("get_logger", "configure_logging", "flush_logs", "shutdown_logging", "silence_worker")
+
+# Папка файлов журналов приложения.
+LOGS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+
+LOG_FORMAT = "%(asctime)s %(filename)s %(levelname)s: %(message)s"
+
+# Уровень журналов по умолчанию и уровни отдельных модулей: LOG_LEVELS="utils=DEBUG,src.masks=WARNING".
+DEFAULT_LOG_LEVEL = "INFO"
+
+# Число записей, накапливаемых перед записью в файл (записи уровня ERROR и выше записываются сразу).
+LOG_BUFFER_CAPACITY = 1024
+
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+_lock = threading.Lock()
+_listener: QueueListener | None = None
+_files: dict[str, str] = {}
+
+
+class _BufferedFileHandler(logging.FileHandler):
+    """
+    A file handler that collects formatted records and writes them with one write and one flush per batch:
+    when LOG_BUFFER_CAPACITY records are collected, on a record of level ERROR or above, or on flush().
+    The file is opened (mode 'w') on the first write.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        super().__init__(file_path, mode="w", encoding="utf-8", delay=True)
+        self.setFormatter(logging.Formatter(LOG_FORMAT))
+        self._buffer: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._buffer.append(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self._buffer) >= LOG_BUFFER_CAPACITY or record.levelno >= logging.ERROR:
+            self.flush()
+
+    def flush(self) -> None:
+        with self.lock:  # type: ignore[union-attr]
+            if self._buffer:
+                if self.stream is None:
+                    os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+                    self.stream = self._open()
+                self.stream.write("".join(self._buffer))
+                self._buffer.clear()
+            if self.stream is not None:
+                self.stream.flush()
+
+    def close(self) -> None:
+        self.flush()
+        super().close()
+
+
+class _FileRouter(logging.Handler):
+    """Runs in the listener thread and passes every record to the buffered file of its logger."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._targets: dict[str, _BufferedFileHandler] = {}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        file_name = _files.get(record.name, record.name + ".log")
+        target = self._targets.get(file_name)
+        if target is None:
+            target = self._targets[file_name] = _BufferedFileHandler(os.path.join(LOGS_PATH, file_name))
+        target.handle(record)
+
+    def flush(self) -> None:
+        for target in self._targets.values():
+            target.flush()
+
+    def close(self) -> None:
+        for target in self._targets.values():
+            target.close()
+        self._targets.clear()
+        super().close()
+
+
+_router = _FileRouter()
+
+
+class _LazyQueueHandler(QueueHandler):
+    """A QueueHandler that starts the shared listener thread on the first record instead of at import."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if _listener is None:
+            _start_listener()
+        super().emit(record)
+
+
+_queue_handler = _LazyQueueHandler(_queue)
+
+
+def _start_listener() -> None:
+    """Starts the background writer thread (once)."""
+    global _listener
+    with _lock:
+        if _listener is None:
+            listener = QueueListener(_queue, _router)
+            listener.start()
+            _listener = listener
+
+
+def _parse_levels(levels: str) -> dict[str, str]:
+    """Parses LOG_LEVELS ('utils=DEBUG,src.masks=WARNING') into {logger name: level}."""
+    result = {}
+    for item in levels.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            result[name.strip()] = level.strip().upper()
+    return result
+
+
+def get_logger(name: str, file_name: str | None = None) -> logging.Logger:
+    """
+    Returns the logger `name` connected to the shared non-blocking backend.
+
+    Records are put into a queue and written by one background thread into logs/<file_name>
+    (by default '<name>.log'), in batches of LOG_BUFFER_CAPACITY records. Neither the file nor the thread
+    is created until the first record is logged, so the call has no side effects.
+    The level is taken from LOG_LEVELS (see configure_logging), INFO by default.
+
+    Args:
+        name (str): The logger name, e.g. __name__.
+        file_name (str | None): The name of the log file in the logs folder.
+
+    Returns:
+        logging.Logger: The configured logger.
+    """
+    logger = logging.getLogger(name)
+    _files[name] = file_name or name + ".log"
+    if _queue_handler not in logger.handlers:
+        logger.addHandler(_queue_handler)
+    level = _parse_levels(os.getenv("LOG_LEVELS", "")).get(name, DEFAULT_LOG_LEVEL)
+    logger.setLevel(level)
+    return logger
+
+
+def configure_logging(levels: dict[str, int | str] | None = None) -> None:
+    """
+    Sets the levels of the application loggers, e.g. {"utils": "DEBUG", "src.masks": logging.WARNING}.
+
+    Without arguments, the levels are re-read from the LOG_LEVELS environment variable.
+    """
+    if levels is None:
+        levels = dict(_parse_levels(os.getenv("LOG_LEVELS", "")))
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level.upper() if isinstance(level, str) else level)
+
+
+def flush_logs() -> None:
+    """Waits until the queued records are processed and writes all buffered records to the files."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        _router.flush()
+
+
+def silence_worker() -> None:
+    """
+    Disables logging in a worker process (the `initializer` of a ProcessPoolExecutor).
+
+    A forked worker inherits the queue and the listener state of the parent: its records would be lost in its copy
+    of the queue or, if the listener has not been started yet, would start a second writer that truncates
+    the log files of the parent. The parent logs the results of the workers instead.
+    """
+    logging.disable(logging.CRITICAL)
+
+
+def shutdown_logging() -> None:
+    """Flushes the queued and buffered records and closes the log files (called at exit)."""
+    flush_logs()
+    _router.close()
+
+
+atexit.register(shutdown_logging)
@@ -1,19 +1,222 @@
-import importlib
+import argparse
+import itertools
+import json
 import os
+import sys
+from typing import Any, Iterable, Sequence
 
-from src.generators import filter_by_currency, transaction_descriptions
-from src.processing import filter_by_state, search_by_str, sort_by_date
-from src.widget import format_str_date, mask_account_card
+from src.readers import FORMATS, open_transactions
 
+# Статусы транзакций, доступные для фильтрации.
+STATUSES = ("EXECUTED", "CANCELED", "PENDING")
 
-def main() -> None:
+# Размер буфера вывода пакетного режима (в байтах) и число строк отчёта, передаваемых в него за раз.
+OUTPUT_BUFFER_SIZE = 1 << 20
+OUTPUT_BATCH_ROWS = 1024
+
+
+def _mask_requisites(requisites: str) -> str:
+    """Masks a card or an account like mask_account_card; a value it rejects has all its digits hidden."""
+    from src.widget import mask_account_card
+
+    try:
+        return mask_account_card(requisites)
+    except ValueError:
+        return "".join("*" if char.isdigit() else char for char in requisites)
+
+
+def format_transaction(transaction: dict[str, Any], description: str | None = None) -> str:
+    """
+    Renders a transaction for the report: the date, the description, the masked cards/accounts and the amount.
+    A card or an account that cannot be masked has all its digits hidden (see _mask_requisites).
+
+    Args:
+        transaction (dict[str, Any]): The transaction.
+        description (str | None): The description to show (by default the 'description' of the transaction).
+
+    Returns:
+        str: The lines of the transaction, each ending with a newline.
+    """
+    # Локальный импорт: модуль widget загружает NumPy (см. main).
+    from src.widget import format_str_date
+
+    if description is None:
+        description = transaction.get("description", "")
+    date = format_str_date(transaction.get("date", "1900-01-01T00:00:00.000000"))
+    to_card = _mask_requisites(transaction.get("to", "0" * 16))
+    amount = " ".join(
+        [
+            str(transaction.get("operationAmount", {}).get("amount")),
+            transaction.get("operationAmount", {}).get("currency", {}).get("name"),
+        ]
+    )
+
+    if transaction.get("from"):
+        from_card = _mask_requisites(transaction.get("from", "0" * 16))
+        return f"{date} {description}\n{from_card} -> {to_card}\nСумма: {amount}\n"
+    return f"{date} {description}\n{to_card}\nСумма: {amount}\n"
+
+
+def text_line(transaction: dict[str, Any]) -> str:
+    """A report line of the text format (as in the interactive mode)."""
+    return format_transaction(transaction) + "\n"
+
+
+def jsonl_line(transaction: dict[str, Any]) -> str:
+    """A report line of the jsonl format: the transaction with the cards and accounts of 'from' and 'to' masked."""
+    masked = dict(transaction)
+    for key in ("from", "to"):
+        if isinstance(masked.get(key), str):
+            masked[key] = _mask_requisites(masked[key])
+    return json.dumps(masked, ensure_ascii=False) + "\n"
+
+
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    """Parses the command line of the batch mode."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.main",
+        description="Пакетная обработка банковских транзакций (без аргументов запускается интерактивный режим).",
+    )
+    parser.add_argument(
+        "--source",
+        required=True,
+        help=f"файл с транзакциями (форматы: {', '.join(FORMATS)}; возможно сжатие gzip или zstd)",
+    )
+    parser.add_argument("--state", type=str.upper, choices=STATUSES, help="статус транзакций")
+    parser.add_argument("--currency", type=str.upper, help="код валюты, например RUB")
+    parser.add_argument("--search", help="слово для поиска в описании транзакции")
+    parser.add_argument("--sort", choices=("asc", "desc"), help="сортировка по дате")
+    parser.add_argument(
+        "--limit", type=int, help="число транзакций в отчёте (с --sort - самые новые или самые старые)"
+    )
+    parser.add_argument("--out", default="-", help="файл отчёта ('-' - стандартный вывод)")
+    parser.add_argument(
+        "--format",
+        choices=("jsonl", "text"),
+        help="формат отчёта: jsonl - транзакция в строке JSON, text - как в интерактивном режиме "
+        "(по умолчанию jsonl для файлов .jsonl, иначе text)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="число процессов обработки (по умолчанию - все ядра для больших файлов; 1 - без параллелизма)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="дополнить отчёт --out транзакциями, добавленными в файл после предыдущего запуска",
+    )
+    parser.add_argument(
+        "--checkpoint", help="файл контрольной точки инкрементального режима (по умолчанию <out>.checkpoint.json)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.incremental and args.out == "-":
+        parser.error("для --incremental нужен файл отчёта --out")
+    if args.incremental and args.limit is not None:
+        parser.error("--limit нельзя использовать вместе с --incremental")
+    if args.limit is not None and args.limit < 0:
+        parser.error("--limit не может быть отрицательным")
+    if args.format is None:
+        args.format = "jsonl" if args.out.endswith(".jsonl") else "text"
+    return args
+
+
+def _write_report(lines: Iterable[str], out: str) -> int:
+    """
+    Writes the report lines as they are produced through a buffered writer, OUTPUT_BATCH_ROWS lines per write call,
+    and returns their number.
+    """
+    out_file = sys.stdout if out == "-" else open(out, "w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE)
+    count = 0
+    try:
+        lines = iter(lines)
+        while batch := list(itertools.islice(lines, OUTPUT_BATCH_ROWS)):
+            out_file.writelines(batch)
+            count += len(batch)
+        return count
+    finally:
+        if out_file is sys.stdout:
+            out_file.flush()
+        else:
+            out_file.close()
+
+
+def run_batch(argv: Sequence[str]) -> int:
+    """
+    Non-interactive mode: filters the transactions of a file by the command line options and writes the report.
+
+    Example:
+        python -m src.main --source data/transactions.csv --state EXECUTED --currency RUB --search перевод \\
+            --sort desc --out report.jsonl --workers 8
+
+    Args:
+        argv (Sequence[str]): The command line arguments (without the program name).
+
+    Returns:
+        int: The exit code: 0 on success, 1 if the file cannot be processed.
+    """
+    args = _parse_args(argv)
+    if not os.path.isfile(args.source):
+        print(f"Файл {args.source} не найден.", file=sys.stderr)
+        return 1
+
+    from src.query import TransactionQuery
+
+    query = TransactionQuery()
+    if args.state:
+        query.state(args.state)
+    if args.currency:
+        query.currency(args.currency)
+    if args.search:
+        query.text(args.search)
+    if args.sort:
+        query.order_by_date(desc=args.sort == "desc")
+    if args.limit is not None:
+        query.limit(args.limit)
+
+    render = jsonl_line if args.format == "jsonl" else text_line
+    try:
+        if args.incremental:
+            from src.incremental import run_incremental
+
+            # Обрабатываются только транзакции, добавленные в файл после предыдущего запуска.
+            criteria = {name: getattr(args, name) for name in ("state", "currency", "search", "sort", "format")}
+            count = run_incremental(args.source, query, render, args.out, criteria, args.checkpoint, args.workers)
+        else:
+            from src.parallel import iter_pipeline
+
+            # Таблица берётся из кэша разбора, если файл уже читался; запрос к ней выполняется по столбцам,
+            # фильтрация и форматирование больших таблиц распределяются по процессам, а готовые части отчёта
+            # записываются сразу (отчёт с сортировкой по дате - после обработки всех строк).
+            lines = iter_pipeline(open_transactions(args.source, stream=False), query, render, args.workers)
+            count = _write_report(lines, args.out)
+    except (KeyError, ValueError, ImportError) as ex:
+        print(f"Ошибка обработки файла {args.source}: {ex}", file=sys.stderr)
+        return 1
+
+    print(f"Всего транзакций в выборке: {count}", file=sys.stderr)
+    return 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Entry point: with command line arguments runs the batch mode (see run_batch), otherwise the interactive menu.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        return run_batch(argv)
+
+    # Модули обработки (NumPy) и читатели файлов (pandas - только для CSV) импортируются
+    # после выбора пункта меню, поэтому меню появляется без ожидания загрузки тяжёлых зависимостей.
     # Путь к папке с данными
     data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 
+    # Формат файла определяется по его содержимому (см. src.readers), поэтому пункт меню задаёт только файл.
     commands = {
-        "1": {"format": "JSON", "file_name": "operations.json", "module_name": "src.utils"},
-        "2": {"format": "CSV", "file_name": "transactions.csv", "module_name": "src.read_from_file"},
-        "3": {"format": "Excel", "file_name": "transactions_excel.xlsx", "module_name": "src.read_from_file"},
+        "1": {"format": "JSON", "file_name": "operations.json"},
+        "2": {"format": "CSV", "file_name": "transactions.csv"},
+        "3": {"format": "Excel", "file_name": "transactions_excel.xlsx"},
     }
     while True:
         print(
@@ -28,21 +231,22 @@ def main() -> None:
         user_input = input("\nВаш выбор: ")
         if user_input == "4":
             print("До свидания.")
-            break
+            return 0
 
         user_choice = commands.get(user_input)
 
         if not user_choice:
             print("Запрошена недопустимая операция.")
-            return
+            return 0
+
+        from src.generators import transaction_descriptions
+        from src.query import TransactionQuery
 
-        file_format = user_choice["format"]
         file_path = os.path.join(data_path, user_choice["file_name"])
-        module = importlib.import_module(user_choice["module_name"])
-        func_name = getattr(module, f"read_transactions_from_{file_format.lower()}")
-        print(f"Для обработки выбран файл {os.path.join(data_path, user_choice["file_name"])}.\n")
+        print(f"Для обработки выбран файл {file_path}.\n")
 
-        transactions = func_name(file_path)
+        # Таблица транзакций: при повторных запусках она берётся из кэша разбора, а не читается из файла заново.
+        transactions = open_transactions(file_path, stream=False)
 
         statuses_list = ["EXECUTED", "CANCELED", "PENDING"]
         print(
@@ -63,7 +267,8 @@ def main() -> None:
             user_input = raw_user_input.upper()
 
         print(f"\nТранзакции отфильтрованы по статусу {raw_user_input}")
-        filtered_transactions = filter_by_state(transactions, user_input)
+        # Условия отбора собираются в один запрос и применяются за один проход по транзакциям.
+        query = TransactionQuery().state(user_input)
 
         is_sort_by_date = input("\nОтсортировать транзакции по дате? (Да/Нет): ")
         if is_sort_by_date.lower() == "да":
@@ -72,43 +277,32 @@ def main() -> None:
                 if input("\nОтсортировать по возрастанию или по убыванию? ").lower() == "по возрастанию"
                 else True
             )
-            filtered_transactions = sort_by_date(filtered_transactions, is_sort_order)
+            query.order_by_date(desc=is_sort_order)
 
         is_sort_by_currency = input("\nВыводить только рублевые транзакции? (Да/Нет): ")
         if is_sort_by_currency.lower() == "да":
-            filtered_transactions = list(filter_by_currency(filtered_transactions, "RUB"))
+            query.currency("RUB")
 
         is_filter_by_word = input("\nФильтровать транзакции по определенному слову в описании? (Да/Нет): ")
         if is_filter_by_word.lower() == "да":
             search_word = input("\nВведите слово для поиска: ").split()[0]
-            filtered_transactions = search_by_str(filtered_transactions, search_word)
+            query.text(search_word)
 
+        filtered_transactions = query.run(transactions)
         print("\nИтоговый список транзакций ...")
 
-        if len(filtered_transactions) == 0 or filtered_transactions == "State is invalid":
+        if len(filtered_transactions) == 0:
             print("\nНе найдено ни одной транзакции, подходящей под ваши условия отбора.")
         else:
             print(f"\nВсего транзакций в выборке: {len(filtered_transactions)}\n")
             # Создаём итератор по описаниям транзакций
             descriptions = transaction_descriptions(filtered_transactions)
 
-            for transaction in filtered_transactions:
-                date = format_str_date(transaction.get("date", "1900-01-01T00:00:00.000000"))
-                description = next(descriptions)
-                to_card = mask_account_card(transaction.get("to", "0" * 16))
-                amount = " ".join(
-                    [
-                        str(transaction.get("operationAmount", {}).get("amount")),
-                        transaction.get("operationAmount", {}).get("currency", {}).get("name"),
-                    ]
-                )
-
-                if transaction.get("from"):
-                    from_card = mask_account_card(transaction.get("from", "0" * 16))
-                    print(f"{date} {description}\n{from_card} -> {to_card}\nСумма: {amount}\n")
-                else:
-                    print(f"{date} {description}\n{to_card}\nСумма: {amount}\n")
+            # Отчёт выводится одним буферизованным вызовом вместо print для каждой транзакции.
+            sys.stdout.writelines(
+                format_transaction(transaction, next(descriptions)) + "\n" for transaction in filtered_transactions
+            )
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
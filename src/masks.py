@@ -1,42 +1,161 @@
-import logging
 import os
 import re
+from typing import Iterable
 
-from dotenv import load_dotenv
+from src.logging_config import get_logger
 
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
+logger = get_logger(__name__)
 
-log_file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs", __name__ + ".log")
-file_handler = logging.FileHandler(log_file_path, mode="w")
-file_formatter = logging.Formatter("%(asctime)s %(filename)s %(levelname)s: %(message)s")
-file_handler.setFormatter(file_formatter)
-logger.addHandler(file_handler)
+
+# Нецифровой символ в номере карты или счёта; шаблон компилируется один раз на модуль.
+NON_DIGIT_PATTERN = re.compile(r"\D")
+
+CARD_NUMBER_LENGTH = 16
+ACCOUNT_NUMBER_LENGTH = 20
+
+# Корректные номера карты и счёта целиком: проверка одним шаблоном при пакетном маскировании.
+CARD_NUMBER_PATTERN = re.compile(rf"\d{{{CARD_NUMBER_LENGTH}}}")
+ACCOUNT_NUMBER_PATTERN = re.compile(rf"\d{{{ACCOUNT_NUMBER_LENGTH}}}")
+
+
+class MaskingEngine:
+    """
+    Masks bank card and account numbers.
+
+    The number of visible last digits is read from BANK_CARD_LAST_VISIBLE_DIGITS (.env or the environment)
+    once, on first use (not at import), and again only on an explicit `reload()`. Per-number messages are
+    logged at DEBUG level with lazy %-formatting, so they cost nothing while DEBUG is disabled.
+    """
+
+    def __init__(self, visible_digits: int | None = None) -> None:
+        """
+        :param visible_digits: число видимых последних цифр; если не задано, читается из BANK_CARD_LAST_VISIBLE_DIGITS.
+        """
+        self._visible_digits = visible_digits
+
+    @property
+    def visible_digits(self) -> int:
+        """The number of visible last digits; the settings are loaded on the first access."""
+        if self._visible_digits is None:
+            self.reload()
+        return self._visible_digits  # type: ignore[return-value]
+
+    @visible_digits.setter
+    def visible_digits(self, visible_digits: int) -> None:
+        self._visible_digits = visible_digits
+
+    def __repr__(self) -> str:
+        return f"MaskingEngine(visible_digits={self.visible_digits})"
+
+    def reload(self) -> None:
+        """Re-reads BANK_CARD_LAST_VISIBLE_DIGITS from .env and the environment (default 4)."""
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        self._visible_digits = int(os.getenv("BANK_CARD_LAST_VISIBLE_DIGITS", "4"))
+        logger.debug("Число видимых цифр маски: %d.", self.visible_digits)
+
+    def mask_card(self, card_number: str) -> str:
+        """
+        Returns the mask of a 16-digit card number, e.g. '7000 79** **** 6361' ('' for an empty number).
+
+        :raises ValueError: if the number contains non-digit characters or is not 16 digits long.
+        """
+        if not card_number:
+            return ""
+
+        logger.debug("Начало маскирования банковской карты %s.", card_number)
+        if NON_DIGIT_PATTERN.search(card_number):
+            logger.critical("Обнаружены нецифровые символы в банковской карте %s.", card_number)
+            raise ValueError("Номер карты должен состоять только из цифр.")
+
+        if len(card_number) != CARD_NUMBER_LENGTH:
+            logger.critical("Недопустимый размер (%d) банковской карты %s.", len(card_number), card_number)
+            raise ValueError("Номер карты должен состоять из 16 цифр.")
+
+        masked_card_number = self.format_card(card_number)
+        logger.debug("Создана маска %s для номера банковской карты.", masked_card_number)
+        return masked_card_number
+
+    def mask_account(self, account_number: str) -> str:
+        """
+        Returns the mask of a 20-digit account number, e.g. '**4305' ('' for an empty number).
+
+        :raises ValueError: if the number contains non-digit characters or is not 20 digits long.
+        """
+        if not account_number:
+            return ""
+
+        logger.debug("Начало маскирования счёта %s.", account_number)
+        if NON_DIGIT_PATTERN.search(account_number):
+            logger.critical("Обнаружены нецифровые символы в счёте %s.", account_number)
+            raise ValueError("Номер счета должен состоять только из цифр.")
+
+        if len(account_number) != ACCOUNT_NUMBER_LENGTH:
+            logger.critical(
+                "Номера счёта %s имеет размер (%d), что отличается от требуемого 20.",
+                account_number,
+                len(account_number),
+            )
+            raise ValueError("Номер счета должен состоять из 20 цифр.")
+
+        masked_account_number = self.format_account(account_number)
+        logger.debug("Создана маска %s для номера счёта.", masked_account_number)
+        return masked_account_number
+
+    def mask_many(self, numbers: Iterable[str], account: bool = False) -> list[str]:
+        """
+        Masks many card numbers (or account numbers if `account` is True) in one call.
+
+        Numbers are validated with a single precompiled pattern, and nothing is logged per number;
+        an invalid number is passed to `mask_card`/`mask_account`, which raise the usual ValueError.
+
+        :param numbers: номера карт (или счетов).
+        :param account: True - маскировать номера счетов, False (по умолчанию) - номера карт.
+        :return: список масок в порядке номеров.
+        """
+        valid_number = (ACCOUNT_NUMBER_PATTERN if account else CARD_NUMBER_PATTERN).fullmatch
+        mask_one = self.mask_account if account else self.mask_card
+        format_number = self.format_account if account else self.format_card
+
+        masks = []
+        for number in numbers:
+            if not number:
+                masks.append("")
+            elif valid_number(number):
+                masks.append(format_number(number))
+            else:
+                masks.append(mask_one(number))
+
+        logger.info("Замаскировано номеров: %d.", len(masks))
+        return masks
+
+    def format_card(self, card_number: str) -> str:
+        """
+        Masks an already validated card number (no checks, no logging):
+        the first 6 and the last visible digits, grouped by the visible digits count.
+        """
+        visible_digits = self.visible_digits
+        masked_card_number = card_number[:6] + "******" + card_number[-visible_digits:]
+        return " ".join(
+            masked_card_number[i : i + visible_digits] for i in range(0, len(masked_card_number), visible_digits)
+        )
+
+    def format_account(self, account_number: str) -> str:
+        """Masks an already validated account number (no checks, no logging): '**' and the last visible digits."""
+        return "**" + account_number[-self.visible_digits :]
+
+
+# Общий экземпляр, используемый функциями модуля; после изменения .env вызовите masking_engine.reload().
+masking_engine = MaskingEngine()
 
 
 def get_mask_card_number(card_number: str) -> str:
-    if not card_number:
-        return ""
-
-    logger.info(f"Начало маскирования банковской карты {card_number}.")
-    pattern = r"[\D]"
-    if re.findall(pattern, card_number):
-        logger.critical(f"Обнаружены нецифровые символы в банковской карте {card_number}.")
-        raise ValueError("Номер карты должен состоять только из цифр.")
-
-    if len(card_number) != 16:
-        logger.critical(f"Недопустимый размер ({len(card_number)}) банковской карты {card_number}.")
-        raise ValueError("Номер карты должен состоять из 16 цифр.")
-
-    load_dotenv()
-    bank_card_last_visible_digits = int(os.getenv("BANK_CARD_LAST_VISIBLE_DIGITS", "4"))
-    masked_card_number = card_number[:6] + "******" + card_number[-bank_card_last_visible_digits:]
-    formatted_mask_card_number = " ".join(
-        masked_card_number[i : i + bank_card_last_visible_digits]
-        for i in range(0, len(masked_card_number), bank_card_last_visible_digits)
-    )
-    logger.info(f"Создана маска {formatted_mask_card_number} для номера банковской карты.")
-    return formatted_mask_card_number
+    """
+    Функция принимает на вход номер банковской карты и возвращает его маску вида XXXX XX** **** XXXX
+    (см. MaskingEngine.mask_card).
+    """
+    return masking_engine.mask_card(card_number)
 
 
 def get_mask_account(account_number: str) -> str:
@@ -45,23 +164,4 @@ def get_mask_account(account_number: str) -> str:
     Номер счета замаскирован и отображается в формате **XXXX,
     где X — это цифра номера.
     """
-    if not account_number:
-        return ""
-
-    logger.info(f"Начало маскирования счёта {account_number}.")
-    pattern = r"[\D]"  # регулярное выражение для поиска нецифровых символов
-    if re.findall(pattern, account_number):
-        logger.critical(f"Обнаружены нецифровые символы в счёте {account_number}.")
-        raise ValueError("Номер счета должен состоять только из цифр.")
-
-    if len(account_number) != 20:
-        logger.critical(
-            f"Номера счёта {account_number} имеет размер ({len(account_number)}), " "что отличается от требуемого 20."
-        )
-        raise ValueError("Номер счета должен состоять из 20 цифр.")
-
-    load_dotenv()
-    bank_card_last_visible_digits = int(os.getenv("BANK_CARD_LAST_VISIBLE_DIGITS", "4"))
-    masked_account_number = "**" + account_number[-bank_card_last_visible_digits:]
-    logger.info(f"Создана маска {masked_account_number} для номера счёта.")
-    return masked_account_number
+    return masking_engine.mask_account(account_number)
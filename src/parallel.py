@@ -0,0 +1,128 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterator
+
+import numpy as np
+
+from src.logging_config import silence_worker
+from src.processing import _require_dates
+from src.query import TransactionQuery
+from src.table import TransactionTable, _date_order
+
+__all__ = ("PARALLEL_MIN_ROWS", "available_workers", "table_shards", "iter_pipeline", "run_pipeline")
+
+# Таблицы с меньшим числом строк по умолчанию обрабатываются в текущем процессе: запуск процессов дороже.
+PARALLEL_MIN_ROWS = 50_000
+
+# Число частей таблицы на один процесс: части поменьше выравнивают нагрузку, если выборка распределена неравномерно.
+SHARDS_PER_WORKER = 4
+
+# Число строк, форматируемых за раз при выполнении в текущем процессе: отчёт выдаётся частями, а не целиком.
+PIPELINE_CHUNK_ROWS = 10_000
+
+RenderType = Callable[[dict[str, Any]], str]
+
+
+def available_workers() -> int:
+    """The number of CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def table_shards(rows: int, count: int) -> list[tuple[int, int]]:
+    """Splits the rows [0, rows) into at most `count` adjacent non-empty ranges [start, end) of (almost) equal size."""
+    count = max(min(count, rows), 1)
+    bounds = [rows * shard // count for shard in range(count + 1)]
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def _run_shard(
+    shard: TransactionTable, query: TransactionQuery, render: RenderType
+) -> tuple[list[str], np.ndarray | None]:
+    """
+    Runs the predicates of `query` over one shard in a worker process and renders the matching rows.
+
+    Returns the rendered rows in the shard order and, if the query is ordered by date, their date epochs,
+    so that the parent process can order the rows of all shards.
+    """
+    result = shard.where(query.mask(shard))
+    epochs = None
+    if query.descending is not None:
+        _require_dates(result)
+        epochs = result.date_epochs()
+    return [render(transaction) for transaction in result.to_records()], epochs
+
+
+def iter_pipeline(
+    table: TransactionTable, query: TransactionQuery, render: RenderType, workers: int | None = None
+) -> Iterator[str]:
+    """
+    Runs the filter -> render pipeline (e.g. masking the cards and formatting the dates of the report)
+    over the table, in several processes for large tables, and yields the rendered lines.
+
+    The table is split into adjacent row ranges (table_shards), SHARDS_PER_WORKER per process; every range
+    is sent to a worker of a ProcessPoolExecutor as a TransactionTable, i.e. as pickled NumPy columns rather
+    than row dictionaries. The worker filters its rows by `query` and renders them. The lines are yielded
+    in the order of the ranges as soon as a range is done, so the caller can write the report while the rest
+    is still being processed. If the query is ordered by date, the lines of all ranges are buffered and ordered
+    by their dates at once before the first one is yielded. In this process (one worker, a small table or a query
+    with a limit) the matching rows are rendered PIPELINE_CHUNK_ROWS at a time. The lines are identical
+    to rendering `query.run(table)` in this process.
+
+    Args:
+        table (TransactionTable): The transactions.
+        query (TransactionQuery): The filters and the order of the result.
+        render (Callable[[dict[str, Any]], str]): Renders one transaction; it must be a module-level function,
+            since it is sent to the workers.
+        workers (int | None): The number of worker processes (1 - no parallelism). By default all available
+            CPUs are used for tables of at least PARALLEL_MIN_ROWS rows, smaller tables are processed here.
+
+    Yields:
+        str: The rendered matching transactions.
+
+    Raises:
+        KeyError: If the result has to be ordered by date and a matching transaction has no 'date'.
+    """
+    if workers is None:
+        workers = available_workers() if len(table) >= PARALLEL_MIN_ROWS else 1
+    if workers <= 1 or len(table) < 2 or query.max_count is not None:
+        result = query.run(table)
+        for start in range(0, len(result), PIPELINE_CHUNK_ROWS):
+            chunk = result.take(np.arange(start, min(start + PIPELINE_CHUNK_ROWS, len(result))))
+            yield from (render(transaction) for transaction in chunk.to_records())
+        return
+
+    shards = table_shards(len(table), workers * SHARDS_PER_WORKER)
+    lines: list[str] = []
+    epochs: list[np.ndarray] = []
+    with ProcessPoolExecutor(min(workers, len(shards)), initializer=silence_worker) as pool:
+        results = pool.map(
+            _run_shard,
+            (table.take(np.arange(start, end)) for start, end in shards),
+            itertools.repeat(query),
+            itertools.repeat(render),
+        )
+        for shard_lines, shard_epochs in results:
+            if shard_epochs is None:
+                yield from shard_lines
+            else:
+                lines.extend(shard_lines)
+                epochs.append(shard_epochs)
+
+    if query.descending is not None:
+        order = _date_order(np.concatenate(epochs), query.descending)
+        yield from (lines[index] for index in order.tolist())
+
+
+def run_pipeline(
+    table: TransactionTable, query: TransactionQuery, render: RenderType, workers: int | None = None
+) -> list[str]:
+    """
+    Runs the filter -> render pipeline over the table (see iter_pipeline) and returns all rendered lines.
+
+    Raises:
+        KeyError: If the result has to be ordered by date and a matching transaction has no 'date'.
+    """
+    return list(iter_pipeline(table, query, render, workers))
@@ -0,0 +1,255 @@
+import functools
+import hashlib
+import json
+import os
+import shutil
+from typing import Any, Callable, Iterable
+
+import numpy as np
+
+from src.logging_config import get_logger
+from src.table import TransactionTable
+
+__all__ = (
+    "cached_reader",
+    "cached_table",
+    "cache_dir",
+    "file_digest",
+    "load_cached_table",
+    "store_table",
+    "clear_parse_cache",
+)
+
+logger = get_logger(__name__, "parse_cache.log")
+
+# Папка кэша разобранных файлов транзакций. Переменная окружения TRANSACTIONS_CACHE_DIR задаёт другую папку,
+# пустое значение отключает кэш.
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "transactions")
+
+# Версия формата записей кэша: записи другой версии не читаются.
+CACHE_FORMAT_VERSION = 1
+
+# Размер блока (в байтах) при вычислении хеша исходного файла.
+HASH_BLOCK_SIZE = 1 << 20
+
+ReaderType = Callable[..., list[dict[str, Any]]]
+
+
+def cache_dir() -> str | None:
+    """Returns the cache folder (TRANSACTIONS_CACHE_DIR, CACHE_DIR by default), or None if the cache is disabled."""
+    return os.getenv("TRANSACTIONS_CACHE_DIR", CACHE_DIR) or None
+
+
+def file_digest(file_path: str) -> str:
+    """Returns the BLAKE2b hex digest of the contents of `file_path`."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as source_file:
+        while block := source_file.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _entry_key(file_path: str, reader: str) -> str:
+    """The name of the cache index of `file_path` parsed by `reader`: '<file name>-<hash of the path and reader>'."""
+    path_hash = hashlib.blake2b(f"{os.path.abspath(file_path)}\0{reader}".encode(), digest_size=8).hexdigest()
+    return f"{os.path.basename(file_path)}-{path_hash}"
+
+
+def _read_index(index_path: str) -> dict[str, Any] | None:
+    """Reads the index of a cache entry; None if it is missing, unreadable or of another format version."""
+    try:
+        with open(index_path, "r", encoding="utf-8") as index_file:
+            index = json.load(index_file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(index, dict) or index.get("version") != CACHE_FORMAT_VERSION:
+        return None
+    return index
+
+
+def _write_json(file_path: str, data: Any) -> None:
+    """Writes `data` as JSON through a temporary file, so readers never see a partially written file."""
+    tmp_path = f"{file_path}.tmp{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as tmp_file:
+        json.dump(data, tmp_file, ensure_ascii=False)
+    os.replace(tmp_path, file_path)
+
+
+def load_cached_table(file_path: str, reader: str) -> TransactionTable | None:
+    """
+    Returns the table cached for `file_path` parsed by `reader`, or None if there is no valid cache entry.
+
+    The entry is valid while the file has the size and contents it had when the entry was stored.
+    The size and modification time are checked first; the file is hashed only if the modification time
+    has changed (e.g. after a copy or `touch`), and on a hash match the new time is remembered.
+    The column arrays are memory-mapped (np.load with mmap_mode='r'), not read.
+
+    Args:
+        file_path (str): The path of the source file.
+        reader (str): The name of the reader function the entry was stored for.
+
+    Returns:
+        TransactionTable | None: The cached table.
+    """
+    directory = cache_dir()
+    if directory is None:
+        return None
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+
+    index_path = os.path.join(directory, _entry_key(file_path, reader) + ".json")
+    index = _read_index(index_path)
+    if index is None or index["size"] != stat.st_size:
+        return None
+    if index["mtime_ns"] != stat.st_mtime_ns:
+        try:
+            if file_digest(file_path) != index["digest"]:
+                return None
+            index["mtime_ns"] = stat.st_mtime_ns
+            _write_json(index_path, index)
+        except OSError:
+            return None
+
+    entry_path = os.path.join(directory, index["entry"])
+    try:
+        columns = {
+            name: np.load(os.path.join(entry_path, f"column.{name}.npy"), mmap_mode="r") for name in index["columns"]
+        }
+        present = {
+            name: np.load(os.path.join(entry_path, f"present.{name}.npy"), mmap_mode="r") for name in index["present"]
+        }
+        categories = {
+            name: np.load(os.path.join(entry_path, f"categories.{name}.npy"), mmap_mode="r")
+            for name in index["categories"]
+        }
+        with open(os.path.join(entry_path, "extras.json"), "r", encoding="utf-8") as extras_file:
+            extras = {int(row): record for row, record in json.load(extras_file).items()}
+    except (OSError, ValueError) as ex:
+        logger.warning("Запись кэша %s для файла %s не читается: %s", entry_path, file_path, ex)
+        return None
+
+    logger.debug("Файл %s прочитан из кэша %s.", file_path, entry_path)
+    return TransactionTable(columns, present, categories, extras)
+
+
+def store_table(file_path: str, reader: str, table: TransactionTable) -> bool:
+    """
+    Stores `table` parsed from `file_path` by `reader` in the cache folder.
+
+    Every column, presence mask and category array is saved with np.save (columns of fixed-width types,
+    readable through a memory map); the rows that do not fit the columns (`table.extras`) are saved
+    in the JSON sidecar extras.json. The entry is written into a temporary folder and then renamed,
+    and the index '<key>.json' (size, modification time and hash of the source) is replaced last,
+    so a concurrent reader sees either the old or the new entry. Older entries of the file are removed.
+
+    Returns:
+        bool: True if the entry was stored; False if the cache is disabled or the table cannot be stored
+            (e.g. extras that are not JSON-serialisable). Errors are logged, not raised.
+    """
+    directory = cache_dir()
+    if directory is None:
+        return False
+
+    key = _entry_key(file_path, reader)
+    tmp_path = os.path.join(directory, f"{key}.tmp{os.getpid()}")
+    try:
+        stat = os.stat(file_path)
+        digest = file_digest(file_path)
+        entry = f"{key}.{digest[:16]}"
+        entry_path = os.path.join(directory, entry)
+
+        os.makedirs(tmp_path, exist_ok=True)
+        for prefix, arrays in (
+            ("column", table.columns),
+            ("present", table.present),
+            ("categories", table.categories),
+        ):
+            for name, array in arrays.items():
+                np.save(
+                    os.path.join(tmp_path, f"{prefix}.{name}.npy"), np.ascontiguousarray(array), allow_pickle=False
+                )
+        with open(os.path.join(tmp_path, "extras.json"), "w", encoding="utf-8") as extras_file:
+            json.dump({str(row): record for row, record in table.extras.items()}, extras_file, ensure_ascii=False)
+
+        shutil.rmtree(entry_path, ignore_errors=True)
+        os.replace(tmp_path, entry_path)
+        _write_json(
+            os.path.join(directory, key + ".json"),
+            {
+                "version": CACHE_FORMAT_VERSION,
+                "source": os.path.abspath(file_path),
+                "reader": reader,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "digest": digest,
+                "entry": entry,
+                "rows": len(table),
+                "columns": list(table.columns),
+                "present": list(table.present),
+                "categories": list(table.categories),
+            },
+        )
+    except (OSError, TypeError, ValueError) as ex:
+        logger.warning("Файл %s не сохранён в кэш: %s", file_path, ex)
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        return False
+
+    for name in os.listdir(directory):
+        if name.startswith(key + ".") and name != entry and not name.endswith(".json") and ".tmp" not in name:
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+    logger.debug("Файл %s сохранён в кэш %s.", file_path, entry_path)
+    return True
+
+
+def cached_reader(reader: ReaderType) -> ReaderType:
+    """
+    Decorates a reader `reader(file_path) -> list[dict]` with the parse cache.
+
+    While the file is unchanged, the transactions are restored from the cached columns instead of parsing
+    the file again. On a miss the file is parsed by `reader`, and a non-empty result is stored
+    as a TransactionTable (see store_table). Calls with arguments other than `file_path`
+    (e.g. an explicit dtype) and files that cannot be stat'ed bypass the cache.
+    """
+
+    @functools.wraps(reader)
+    def wrapper(file_path: str, *args: Any, **kwargs: Any) -> list[dict[str, Any]]:
+        if args or kwargs or cache_dir() is None or not os.path.isfile(file_path):
+            return reader(file_path, *args, **kwargs)
+
+        table = load_cached_table(file_path, reader.__name__)
+        if table is not None:
+            return table.to_records()
+
+        transactions = reader(file_path)
+        if transactions:
+            try:
+                table = TransactionTable.from_records(transactions)
+            except TypeError as ex:
+                logger.warning("Файл %s не сохранён в кэш: %s", file_path, ex)
+            else:
+                store_table(file_path, reader.__name__, table)
+        return transactions
+
+    return wrapper
+
+
+def cached_table(file_path: str, reader: str, read: Callable[[str], Iterable[dict[str, Any]]]) -> TransactionTable:
+    """
+    Returns the transactions of `file_path` as a TransactionTable: the cached one (memory-mapped, no parsing)
+    if the file is unchanged, otherwise the table of `read(file_path)`, which is then stored under `reader`.
+    """
+    table = load_cached_table(file_path, reader)
+    if table is None:
+        table = TransactionTable.from_records(read(file_path))
+        if len(table):
+            store_table(file_path, reader, table)
+    return table
+
+
+def clear_parse_cache() -> None:
+    """Removes the cache folder with all its entries."""
+    directory = cache_dir()
+    if directory is not None:
+        shutil.rmtree(directory, ignore_errors=True)
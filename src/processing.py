@@ -1,49 +1,289 @@
+import heapq
+import math
 import re
-from collections import Counter
-from datetime import datetime
-from typing import Any
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Any, Generic, Iterable, Iterator, NamedTuple, Sequence, TypeVar, overload
 
+import numpy as np
 
-def filter_by_state(data: list[dict[str, Any]], state: str = "EXECUTED") -> list[dict[str, Any]]:
+from src.aggregate import aggregate
+from src.dates import _EPOCH, parse_date
+from src.table import TransactionTable, _date_order
+
+# Окончания, отбрасываемые из строки поиска (правило search_by_str).
+SEARCH_ENDINGS_PATTERN = re.compile(r"ть|сти|вать")
+
+# Длина n-грамм, на которые разбиваются описания в DescriptionIndex.
+NGRAM_SIZE = 3
+
+
+def _search_needle(search_str: str) -> str:
+    """
+    Returns the casefolded substring searched for by search_by_str: the search string without
+    the endings 'ть', 'сти', 'вать' and without its last character (it is optional, like in the former
+    `<stem>?.*` regular expression).
+    """
+    return SEARCH_ENDINGS_PATTERN.sub("", search_str)[:-1].casefold()
+
+
+@overload
+def filter_by_state(  # type: ignore[overload-overlap]
+    data: TransactionTable, state: str = "EXECUTED"
+) -> TransactionTable: ...
+
+
+@overload
+def filter_by_state(data: Iterable[dict[str, Any]], state: str = "EXECUTED") -> list[dict[str, Any]]: ...
+
+
+def filter_by_state(
+    data: Iterable[dict[str, Any]] | TransactionTable, state: str = "EXECUTED"
+) -> list[dict[str, Any]] | TransactionTable:
     """
     :Назначение функции: фильтрация списка словарей банковских операций по значению ключа 'state'.
 
-    :param data: список словарей банковских операций для фильтрации.
+    :param data: список (или любой итерируемый источник, например, iter_transactions_from_json)
+                 словарей банковских операций для фильтрации, либо таблица TransactionTable.
     :param state: значение ключа 'state' для фильтрации. По умолчанию, 'EXECUTED'.
-    :return: список словарей.
+    :return: список словарей (для TransactionTable - отфильтрованная таблица).
     """
+    if isinstance(data, TransactionTable):
+        return data.where(data.state_mask(state))
+
     return [item for item in data if item.get("state", "UNKNOWN") == state]
 
 
-def sort_by_date(data: list[dict[str, Any]], is_sort_order: bool = True) -> list[dict[str, Any]]:
+def _require_dates(table: TransactionTable) -> None:
+    """Raises KeyError (like sort_by_date for dictionaries) if a row of the table has no 'date'."""
+    missing = np.flatnonzero(~table.present["date"])
+    if missing.size:
+        raise KeyError(f"Ключ 'date' отсутствует в транзакции {table.record(int(missing[0]))}.")
+
+
+@overload
+def sort_by_date(data: TransactionTable, is_sort_order: bool = True) -> TransactionTable: ...
+
+
+@overload
+def sort_by_date(data: list[dict[str, Any]], is_sort_order: bool = True) -> list[dict[str, Any]]: ...
+
+
+def sort_by_date(
+    data: list[dict[str, Any]] | TransactionTable, is_sort_order: bool = True
+) -> list[dict[str, Any]] | TransactionTable:
     """
     :Назначение функции: сортировка списка словарей банковских транзакций по дате операции
-    :param data: список словарей банковских операций для фильтрации.
+    :param data: список словарей банковских операций для фильтрации либо таблица TransactionTable.
     :param: is_sort_order: булевый флаг направления сортировки по датам транзакций.
                           (True (по умолчанию) - по убыванию дат; False - по возрастанию дат).
-    :return: отсортированный список словарей транзакций.
+    :return: отсортированный список словарей транзакций (для TransactionTable - отсортированная таблица).
     """
-    date_formats = [
-        "%Y-%m-%dT%H:%M:%S.%f",
-        "%Y-%m-%dT%H:%M:%SZ",
-    ]
+    if isinstance(data, TransactionTable):
+        _require_dates(data)
+        return data.take(data.date_order(is_sort_order))
 
     for d in data:
-        if "date" in d:
-            for date_format in date_formats:
-                try:
-                    datetime.strptime(d["date"], date_format)
-                except ValueError:
-                    continue
-            # raise ValueError(f"Формат даты не распознан {d["date"]}.")
+        if "date" not in d:
+            raise KeyError(f"Ключ 'date' отсутствует в транзакции {d}.")
+
+    # Сортировка по реальным отметкам времени, а не по строкам; нераспознанные даты считаются самыми ранними.
+    return sorted(data, key=lambda item: parse_date(item["date"]) or datetime.min, reverse=is_sort_order)
+
+
+class DateCursor(NamedTuple):
+    """
+    The position of a transaction in the date order of sort_by_date: its date as seconds since 1970-01-01
+    (-inf for an unparsable date) and its index (row) in the data. A page continues after the cursor.
+    """
+
+    epoch: float
+    row: int
+
+
+# Транзакции страницы: список словарей или таблица, в зависимости от данных, по которым она выбрана.
+PageItems = TypeVar("PageItems", list[dict[str, Any]], TransactionTable)
+
 
+class DatePage(NamedTuple, Generic[PageItems]):
+    """A page of transactions in the date order and the cursor of the next page (None after the last page)."""
+
+    items: PageItems
+    cursor: DateCursor | None
+
+
+def _dated(data: Iterable[dict[str, Any]], descending: bool) -> Iterator[tuple[tuple[datetime, int], dict[str, Any]]]:
+    """
+    Pairs the transactions with the keys of their date order: (the sort key of sort_by_date, ±index).
+    The index makes the keys unique and keeps equal dates in the order of the data in both directions.
+    """
+    sign = -1 if descending else 1
+    for index, item in enumerate(data):
+        if "date" not in item:
+            raise KeyError(f"Ключ 'date' отсутствует в транзакции {item}.")
+        yield (parse_date(item["date"]) or datetime.min, sign * index), item
+
+
+def _top_rows(epochs: np.ndarray, count: int, descending: bool) -> np.ndarray:
+    """
+    The first `count` rows of the stable date order of `epochs`, i.e. `_date_order(epochs, descending)[:count]`:
+    the boundary date is found by np.partition, so only the selected rows are sorted.
+    """
+    rows = len(epochs)
+    if count >= rows:
+        return _date_order(epochs, descending)
+    if count <= 0:
+        return np.zeros(0, dtype=np.intp)
+
+    position = rows - count if descending else count - 1
+    boundary = np.partition(epochs, position)[position]
+    better = np.flatnonzero(epochs > boundary if descending else epochs < boundary)
+    # Из строк с граничной датой берутся первые по порядку, как при устойчивой сортировке.
+    ties = np.flatnonzero(epochs == boundary)[: count - len(better)]
+    selected = np.sort(np.concatenate((better, ties)))
+    top: np.ndarray = selected[_date_order(epochs[selected], descending)]
+    return top
+
+
+def _first_by_date(
+    data: Iterable[dict[str, Any]] | TransactionTable, count: int, cursor: DateCursor | None, descending: bool
+) -> tuple[list[dict[str, Any]] | TransactionTable, DateCursor | None]:
+    """The first `count` transactions after `cursor` in the date order and the cursor of the next ones, if any."""
+    if isinstance(data, TransactionTable):
+        _require_dates(data)
+        epochs = data.date_epochs()
+        rows = np.arange(len(data))
+        if cursor is not None:
+            later = epochs < cursor.epoch if descending else epochs > cursor.epoch
+            rows = np.flatnonzero(later | ((epochs == cursor.epoch) & (rows > cursor.row)))
+        top = rows[_top_rows(epochs[rows], count, descending)]
+        if len(rows) <= count or not len(top):
+            return data.take(top), None
+        return data.take(top), DateCursor(float(epochs[top[-1]]), int(top[-1]))
+
+    entries = _dated(data, descending)
+    if cursor is not None:
+        cursor_date = _EPOCH + timedelta(seconds=cursor.epoch) if cursor.epoch > -math.inf else datetime.min
+        if descending:
+            entries = (entry for entry in entries if entry[0] < (cursor_date, -cursor.row))
         else:
-            raise KeyError(f"Ключ 'date' отсутствует в транзакции {d}.")
+            entries = (entry for entry in entries if entry[0] > (cursor_date, cursor.row))
+    best = heapq.nlargest(count + 1, entries) if descending else heapq.nsmallest(count + 1, entries)
+
+    items = [item for _, item in best[:count]]
+    if len(best) <= count or not items:
+        return items, None
+    (date_obj, index), _ = best[count - 1]
+    epoch = (date_obj - _EPOCH).total_seconds() if date_obj != datetime.min else -math.inf
+    return items, DateCursor(epoch, abs(index))
+
+
+@overload
+def top_by_date(  # type: ignore[overload-overlap]
+    data: TransactionTable, k: int, desc: bool = True
+) -> TransactionTable: ...
+
+
+@overload
+def top_by_date(data: Iterable[dict[str, Any]], k: int, desc: bool = True) -> list[dict[str, Any]]: ...
+
+
+def top_by_date(
+    data: Iterable[dict[str, Any]] | TransactionTable, k: int, desc: bool = True
+) -> list[dict[str, Any]] | TransactionTable:
+    """
+    :Назначение функции: первые k транзакций в порядке sort_by_date без сортировки всех транзакций
+    (куча из k элементов, O(n log k); для TransactionTable - np.partition и сортировка k строк).
+    Результат совпадает с sort_by_date(data, desc)[:k], включая порядок транзакций с одинаковой датой.
+    :param data: список (или другой итерируемый объект) словарей банковских операций либо таблица TransactionTable.
+    :param k: число транзакций.
+    :param desc: True (по умолчанию) - самые новые транзакции; False - самые старые.
+    :return: список из k (или меньше) словарей транзакций (для TransactionTable - таблица).
+    :raises KeyError: если в транзакции нет ключа 'date'.
+    """
+    if k <= 0:
+        return data.take(np.zeros(0, dtype=np.intp)) if isinstance(data, TransactionTable) else []
+    return _first_by_date(data, k, None, desc)[0]
+
+
+@overload
+def page_by_date(  # type: ignore[overload-overlap]
+    data: TransactionTable, page_size: int, cursor: DateCursor | None = None, desc: bool = True
+) -> DatePage[TransactionTable]: ...
+
+
+@overload
+def page_by_date(
+    data: Sequence[dict[str, Any]], page_size: int, cursor: DateCursor | None = None, desc: bool = True
+) -> DatePage[list[dict[str, Any]]]: ...
+
 
-    return sorted(data, key=lambda item: item["date"], reverse=is_sort_order)
+def page_by_date(
+    data: Sequence[dict[str, Any]] | TransactionTable,
+    page_size: int,
+    cursor: DateCursor | None = None,
+    desc: bool = True,
+) -> DatePage[list[dict[str, Any]]] | DatePage[TransactionTable]:
+    """
+    :Назначение функции: страница транзакций в порядке sort_by_date, следующая за курсором `cursor`.
+    Курсор - позиция последней транзакции предыдущей страницы (дата и индекс), поэтому страница
+    выбирается за O(n log page_size) без сортировки всех транзакций, а курсор можно передать клиенту
+    и вернуть в следующем запросе. Все страницы подряд совпадают с sort_by_date(data, desc).
+    :param data: список словарей банковских операций либо таблица TransactionTable
+                 (между запросами страниц данные не должны меняться).
+    :param page_size: размер страницы (не меньше 1).
+    :param cursor: курсор из предыдущей страницы (None - первая страница).
+    :param desc: True (по умолчанию) - по убыванию дат; False - по возрастанию дат.
+    :return: DatePage - транзакции страницы и курсор следующей страницы (None, если страница последняя).
+    :raises KeyError: если в транзакции нет ключа 'date'.
+    :raises ValueError: если размер страницы меньше 1.
+    """
+    if page_size < 1:
+        raise ValueError(f"Размер страницы должен быть не меньше 1: {page_size}.")
+    # Тип страницы (список или таблица) совпадает с типом данных, см. _first_by_date.
+    return DatePage(*_first_by_date(data, page_size, cursor, desc))  # type: ignore[type-var, return-value]
+
+
+@overload
+def iter_pages_by_date(  # type: ignore[overload-overlap]
+    data: TransactionTable, page_size: int, desc: bool = True
+) -> Iterator[TransactionTable]: ...
 
 
-def search_by_str(transactions: list[dict], search_str: str) -> list[dict]:
+@overload
+def iter_pages_by_date(
+    data: Sequence[dict[str, Any]], page_size: int, desc: bool = True
+) -> Iterator[list[dict[str, Any]]]: ...
+
+
+def iter_pages_by_date(
+    data: Sequence[dict[str, Any]] | TransactionTable, page_size: int, desc: bool = True
+) -> Iterator[list[dict[str, Any]] | TransactionTable]:
+    """
+    :Назначение функции: ленивый обход транзакций в порядке sort_by_date страницами по page_size
+    (см. page_by_date): каждая страница выбирается только тогда, когда она запрошена.
+    :param data: список словарей банковских операций либо таблица TransactionTable.
+    :param page_size: размер страницы (не меньше 1).
+    :param desc: True (по умолчанию) - по убыванию дат; False - по возрастанию дат.
+    :return: итератор страниц (списков словарей транзакций либо таблиц).
+    """
+    page = page_by_date(data, page_size, None, desc)
+    while len(page.items):
+        yield page.items
+        if page.cursor is None:
+            return
+        page = page_by_date(data, page_size, page.cursor, desc)
+
+
+@overload
+def search_by_str(transactions: TransactionTable, search_str: str) -> TransactionTable: ...
+
+
+@overload
+def search_by_str(transactions: list[dict], search_str: str) -> list[dict]: ...
+
+
+def search_by_str(transactions: list[dict] | TransactionTable, search_str: str) -> list[dict] | TransactionTable:
     """
     This function searches for banking operations that contain a specific string in their descriptions.
     The search is case-insensitive and ignores the endings 'ть', 'сти', and 'вать' in the search string.
@@ -51,21 +291,236 @@ def search_by_str(transactions: list[dict], search_str: str) -> list[dict]:
     Parameters:
     transactions (list[dict]): A list of dictionaries representing banking operations.
                                 Each dictionary should have a 'description' key.
+                                A TransactionTable is searched with a vectorised substring match.
     search_str (str): The string to search for in the operation descriptions.
 
     Returns:
     list[dict]: A list of dictionaries representing banking operations
-                that contain the search string in their descriptions.
+                that contain the search string in their descriptions
+                (a TransactionTable if a table was given).
     """
-    pattern = rf"{re.escape(re.sub(r'ть|сти|вать', '', search_str))}?.*"
-    return [
-        operation
-        for operation in transactions
-        if re.search(pattern, operation.get("description", ""), flags=re.IGNORECASE)
-    ]
+    if isinstance(transactions, TransactionTable):
+        return transactions.where(transactions.description_mask(_search_needle(search_str)))
+
+    needle = _search_needle(search_str)
+    return [operation for operation in transactions if needle in operation.get("description", "").casefold()]
 
 
-def analyze_categories(transactions: list[dict], categories_list: list[str]) -> dict[str, int]:
+class DescriptionIndex:
+    """
+    A reusable search index over the descriptions of a loaded dataset, built once and queried many times.
+
+    Descriptions are casefolded and deduplicated; every distinct description is split into
+    NGRAM_SIZE-character n-grams, and an inverted index maps each n-gram to the distinct descriptions
+    containing it. A query is normalised by the search_by_str rule (endings 'ть', 'сти', 'вать' stripped),
+    so `index.search(s)` returns exactly the transactions of `search_by_str(transactions, s)`,
+    but costs dictionary lookups plus a set intersection instead of a scan over all rows.
+    Query results are memoised.
+    """
+
+    def __init__(self, transactions: list[dict] | TransactionTable) -> None:
+        self.transactions = transactions
+        self._descriptions: list[str] = []
+        self._rows: list[list[int]] = []
+        self._ngrams: dict[str, set[int]] = {}
+        self._results: dict[str, list[int]] = {}
+
+        if isinstance(transactions, TransactionTable):
+            present = transactions.present["description"]
+            descriptions: Iterable[str] = (
+                str(value) if is_present else ""
+                for value, is_present in zip(transactions.column("description"), present)
+            )
+        else:
+            descriptions = (operation.get("description", "") for operation in transactions)
+
+        distinct_ids: dict[str, int] = {}
+        for row, description in enumerate(descriptions):
+            folded = description.casefold()
+            distinct_id = distinct_ids.get(folded)
+            if distinct_id is None:
+                distinct_id = distinct_ids[folded] = len(self._descriptions)
+                self._descriptions.append(folded)
+                self._rows.append([])
+                for start in range(len(folded) - NGRAM_SIZE + 1):
+                    self._ngrams.setdefault(folded[start : start + NGRAM_SIZE], set()).add(distinct_id)
+            self._rows[distinct_id].append(row)
+
+    def __len__(self) -> int:
+        """The number of distinct (casefolded) descriptions in the index."""
+        return len(self._descriptions)
+
+    def rows(self, search_str: str) -> list[int]:
+        """
+        Returns the positions (in ascending order) of the transactions whose description matches `search_str`.
+
+        Parameters:
+        search_str (str): The string to search for, normalised like in search_by_str.
+
+        Returns:
+        list[int]: Row positions in the indexed dataset.
+        """
+        needle = _search_needle(search_str)
+        if needle in self._results:
+            return self._results[needle]
+
+        if len(needle) < NGRAM_SIZE:
+            candidates: Iterable[int] = range(len(self._descriptions))
+        else:
+            postings = [
+                self._ngrams.get(needle[start : start + NGRAM_SIZE], set())
+                for start in range(len(needle) - NGRAM_SIZE + 1)
+            ]
+            postings.sort(key=len)
+            candidates = set.intersection(*postings)
+
+        matched = [distinct_id for distinct_id in candidates if needle in self._descriptions[distinct_id]]
+        rows = sorted(row for distinct_id in matched for row in self._rows[distinct_id])
+        self._results[needle] = rows
+        return rows
+
+    def search(self, search_str: str) -> list[dict] | TransactionTable:
+        """
+        Returns the transactions whose description matches `search_str`, in their original order.
+
+        Parameters:
+        search_str (str): The string to search for, normalised like in search_by_str.
+
+        Returns:
+        list[dict] | TransactionTable: The matching transactions (a TransactionTable if a table was indexed).
+        """
+        rows = self.rows(search_str)
+        if isinstance(self.transactions, TransactionTable):
+            return self.transactions.take(np.array(rows, dtype=np.intp))
+        return [self.transactions[row] for row in rows]
+
+
+class Classification(NamedTuple):
+    """The result of CategoryClassifier.apply: the category of every transaction and the counts per category."""
+
+    labels: list[str | None]
+    counts: dict[str, int]
+
+
+class CategoryClassifier:
+    """
+    A rule-based classifier of transactions into categories by keywords of their descriptions.
+
+    Every category has one or more keywords; a description belongs to a category if it contains one of its
+    keywords by the search_by_str rule (case-insensitive, endings 'ть', 'сти', 'вать' and the last character
+    of the keyword optional). If several categories match, the first one in the order of the rules wins.
+
+    All keywords are compiled once into one Aho-Corasick automaton (a trie of the normalised keywords with
+    failure links), so a description is classified in one pass over its characters whatever the number
+    of categories, instead of one search_by_str scan per category. Repeated descriptions are classified once.
+    The classifier plugs into src.aggregate as a group key: `aggregate(transactions, by=classifier.label)`.
+    """
+
+    def __init__(self, rules: dict[str, str | Iterable[str]] | Iterable[str]) -> None:
+        """
+        :param rules: Словарь {категория: ключевое слово или список ключевых слов} или список категорий,
+                      ключевое слово которых - само название категории. Порядок правил задаёт приоритет.
+        """
+        if not isinstance(rules, dict):
+            rules = {category: category for category in rules}
+        self.categories = list(rules)
+        self._labels: dict[str, str | None] = {}
+        # Автомат: переходы, суффиксные ссылки и наименьший номер категории, ключевое слово которой
+        # оканчивается в узле (с учётом суффиксных ссылок); len(categories) - нет совпадения.
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail = [0]
+        self._output = [len(self.categories)]
+
+        for priority, keywords in enumerate(rules.values()):
+            for keyword in [keywords] if isinstance(keywords, str) else keywords:
+                node = 0
+                for char in _search_needle(keyword):
+                    child = self._goto[node].get(char)
+                    if child is None:
+                        child = self._goto[node][char] = len(self._goto)
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._output.append(len(self.categories))
+                    node = child
+                self._output[node] = min(self._output[node], priority)
+
+        queue = deque(self._goto[0].values())
+        for node in queue:
+            self._output[node] = min(self._output[node], self._output[0])
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = min(self._output[child], self._output[self._fail[child]])
+                queue.append(child)
+
+    def __len__(self) -> int:
+        """The number of categories."""
+        return len(self.categories)
+
+    def _match(self, folded: str) -> int:
+        """The number of the first category matching a casefolded description (len(categories) if none)."""
+        goto, fail, output = self._goto, self._fail, self._output
+        node, best = 0, output[0]
+        for char in folded:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node] < best:
+                best = output[node]
+                if best == 0:
+                    break
+        return best
+
+    def classify(self, description: str) -> str | None:
+        """
+        Returns the category of a description.
+
+        :param description: Описание транзакции.
+        :return: Первая по порядку правил категория, ключевое слово которой содержится в описании, или None.
+        """
+        if description not in self._labels:
+            priority = self._match(description.casefold())
+            self._labels[description] = self.categories[priority] if priority < len(self.categories) else None
+        return self._labels[description]
+
+    def label(self, transaction: dict[str, Any]) -> str | None:
+        """The category of a transaction (a missing description counts as '')."""
+        description = transaction.get("description")
+        return self.classify(description if isinstance(description, str) else "")
+
+    def apply(self, transactions: Iterable[dict[str, Any]] | TransactionTable) -> Classification:
+        """
+        Classifies transactions in one pass.
+
+        :param transactions: Список (или поток) транзакций либо TransactionTable; у таблицы классифицируются
+                             только различные описания.
+        :return: Classification: категории транзакций в исходном порядке (None - ни одна категория не подошла)
+                 и число транзакций каждой категории.
+        """
+        if isinstance(transactions, TransactionTable):
+            distinct = [self.classify(str(description)) for description in transactions.categories["description"]]
+            missing = self.classify("")
+            labels = [
+                distinct[code] if is_present else missing
+                for code, is_present in zip(
+                    transactions.columns["description"].tolist(), transactions.present["description"].tolist()
+                )
+            ]
+        else:
+            labels = [self.label(transaction) for transaction in transactions]
+
+        counts = dict.fromkeys(self.categories, 0)
+        for category, count in Counter(labels).items():
+            if category is not None:
+                counts[category] = count
+        return Classification(labels, counts)
+
+
+def analyze_categories(transactions: Iterable[dict], categories_list: list[str]) -> dict[str, int]:
     """
     This function analyzes the descriptions of banking transactions
     and categorizes them based on a given list of categories.
@@ -73,19 +528,15 @@ def analyze_categories(transactions: list[dict], categories_list: list[str]) ->
     and returns a dictionary with the category counts.
 
     Parameters:
-    transactions (list[dict]): A list of dictionaries representing banking transactions.
-    Each dictionary should have a 'description' key.
+    transactions (Iterable[dict]): Banking transactions (a list or a streaming reader; they are counted
+    in one pass by src.aggregate.aggregate). Each dictionary should have a 'description' key.
     categories_list (list[str]): A list of strings representing the categories to analyze.
 
     Returns:
     dict: A dictionary where the keys are the categories and the values are the counts of occurrences
             of each category in the descriptions.
     """
-    descriptions_list = [operation.get("description") for operation in transactions]
-    descriptions_count = Counter(descriptions_list)
-    result = {}
-
-    for category in categories_list:
-        result[category] = descriptions_count.get(category, 0)
-
-    return result
+    by_description = aggregate(transactions, by="description")
+    return {
+        category: by_description[category].count if category in by_description else 0 for category in categories_list
+    }
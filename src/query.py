@@ -0,0 +1,147 @@
+import itertools
+from typing import Any, Iterable, overload
+
+import numpy as np
+
+from src.processing import _search_needle, sort_by_date, top_by_date
+from src.table import TransactionTable
+
+__all__ = ("TransactionQuery",)
+
+
+class TransactionQuery:
+    """
+    A composable query over transactions that replaces the chain
+    filter_by_state -> sort_by_date -> filter_by_currency -> search_by_str.
+
+    All predicates are fused and checked in a single pass over the source, and only the surviving
+    transactions are sorted. The predicates have the same semantics as the corresponding functions.
+
+    Example:
+        >>> query = TransactionQuery().state("EXECUTED").currency("RUB").text("перевод").order_by_date(desc=True)
+        >>> transactions = query.run(iter_transactions_from_json("data/operations.json"))
+    """
+
+    def __init__(self) -> None:
+        self._state: str | None = None
+        self._currency: str | None = None
+        self._search_str: str | None = None
+        self._needle: str | None = None
+        self._descending: bool | None = None
+        self._limit: int | None = None
+
+    def __repr__(self) -> str:
+        return (
+            f"TransactionQuery(state={self._state!r}, currency={self._currency!r}, "
+            f"text={self._search_str!r}, desc={self._descending!r}, limit={self._limit!r})"
+        )
+
+    def state(self, state: str) -> "TransactionQuery":
+        """Keeps transactions whose 'state' equals `state` (like filter_by_state)."""
+        self._state = state
+        return self
+
+    def currency(self, currency: str) -> "TransactionQuery":
+        """Keeps transactions whose operationAmount.currency.code equals `currency` (like filter_by_currency)."""
+        self._currency = currency
+        return self
+
+    def text(self, search_str: str) -> "TransactionQuery":
+        """Keeps transactions whose description matches `search_str` (like search_by_str)."""
+        self._search_str = search_str
+        self._needle = _search_needle(search_str)
+        return self
+
+    def order_by_date(self, desc: bool = True) -> "TransactionQuery":
+        """Orders the result by date (like sort_by_date): descending by default, ascending if `desc` is False."""
+        self._descending = desc
+        return self
+
+    def limit(self, count: int) -> "TransactionQuery":
+        """
+        Keeps only the first `count` transactions of the result. With order_by_date they are selected
+        by top_by_date, without sorting all matching transactions.
+        """
+        if count < 0:
+            raise ValueError(f"Число транзакций не может быть отрицательным: {count}.")
+        self._limit = count
+        return self
+
+    @property
+    def max_count(self) -> int | None:
+        """The requested number of transactions (see limit), None if it is not limited."""
+        return self._limit
+
+    @property
+    def descending(self) -> bool | None:
+        """The requested date order: True - descending, False - ascending, None - the source order."""
+        return self._descending
+
+    def matches(self, transaction: dict[str, Any]) -> bool:
+        """Checks all predicates of the query against one transaction."""
+        if self._state is not None and transaction.get("state", "UNKNOWN") != self._state:
+            return False
+
+        if self._currency is not None:
+            currency = transaction.get("operationAmount", transaction).get("currency")
+            if not isinstance(currency, dict) or currency.get("code") != self._currency:
+                return False
+
+        if self._needle is not None and self._needle not in transaction.get("description", "").casefold():
+            return False
+
+        return True
+
+    @overload
+    def run(self, source: TransactionTable) -> TransactionTable: ...  # type: ignore[overload-overlap]
+
+    @overload
+    def run(self, source: Iterable[dict[str, Any]]) -> list[dict[str, Any]]: ...
+
+    def run(self, source: Iterable[dict[str, Any]] | TransactionTable) -> list[dict[str, Any]] | TransactionTable:
+        """
+        Executes the query.
+
+        Args:
+            source (Iterable[dict[str, Any]] | TransactionTable): Any iterable of transactions
+                (a list, a streaming reader) or a TransactionTable.
+
+        Returns:
+            list[dict[str, Any]] | TransactionTable: The matching transactions, in the source order or ordered
+                by date if `order_by_date` was requested, at most `limit` of them
+                (a TransactionTable for a table source).
+
+        Raises:
+            KeyError: If the result has to be ordered by date and a matching transaction has no 'date'.
+        """
+        if isinstance(source, TransactionTable):
+            return self._run_table(source)
+
+        matching = (transaction for transaction in source if self.matches(transaction))
+        if self._descending is None:
+            return list(itertools.islice(matching, self._limit))
+        if self._limit is not None:
+            return top_by_date(matching, self._limit, self._descending)
+        return sort_by_date(list(matching), self._descending)
+
+    __call__ = run
+
+    def mask(self, table: TransactionTable) -> np.ndarray:
+        """Checks all predicates of the query against a table at once: the boolean mask of the matching rows."""
+        mask = np.ones(len(table), dtype=bool)
+        if self._state is not None:
+            mask &= table.state_mask(self._state)
+        if self._currency is not None:
+            mask &= table.currency_mask(self._currency)
+        if self._needle is not None:
+            mask &= table.description_mask(self._needle)
+        return mask
+
+    def _run_table(self, table: TransactionTable) -> TransactionTable:
+        """Executes the query over a table: predicates become one combined column mask."""
+        result = table.where(self.mask(table))
+        if self._descending is None:
+            return result if self._limit is None else result.take(np.arange(min(self._limit, len(result))))
+        if self._limit is not None:
+            return top_by_date(result, self._limit, self._descending)
+        return sort_by_date(result, self._descending)
@@ -1,14 +1,72 @@
-from typing import Any
+import posixpath
+import zipfile
+from typing import IO, Any, Iterable, Iterator
+from xml.etree.ElementTree import iterparse
 
-import pandas as pd
+from src.parse_cache import cached_reader
+from src.table import TransactionTable
 
+# Явные типы столбцов CSV-файла с транзакциями: pandas не приходится выводить их при каждой загрузке.
+# id и amount читаются как float64, так как в пустых строках файла значения отсутствуют (NaN).
+CSV_DTYPES: dict[str, str] = {
+    "id": "float64",
+    "state": "str",
+    "date": "str",
+    "amount": "float64",
+    "currency_name": "str",
+    "currency_code": "str",
+    "from": "str",
+    "to": "str",
+    "description": "str",
+}
 
-def read_transactions_from_csv(file_path: str) -> list[dict[str, Any]]:
+# Число строк CSV-файла, обрабатываемых за один шаг при потоковом чтении.
+CSV_CHUNK_SIZE = 10_000
+
+
+# Столбцы листа XLSX-файла, из которых собираются транзакции (остальные столбцы не читаются).
+EXCEL_COLUMNS = ("id", "state", "date", "amount", "currency_name", "currency_code", "from", "to", "description")
+
+# Пространства имён XML внутри XLSX-файла (формат Office Open XML).
+_XLSX_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_XLSX_RELATIONSHIPS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_XLSX_PACKAGE_RELATIONSHIPS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def _format_csv_transactions(records: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Converts flat CSV records (with NaN already replaced by 0) into nested transaction dictionaries.
+
+    Keys with a value of 0 are dropped while the dictionary is built, in the same pass.
+    """
+    dict_formatted = []
+    for i in records:
+        operation = {
+            "id": int(i.get("id", "0")),
+            "state": i.get("state", "UNKNOWN"),
+            "date": i.get("date", "1900-01-01T00:00:00"),
+            "operationAmount": {
+                "amount": int(i.get("amount", "0")),
+                "currency": {"name": i.get("currency_name", "UNKNOWN"), "code": i.get("currency_code", "XXX")},
+            },
+            "description": i.get("description"),
+            "from": i.get("from", "0" * 16),
+            "to": i.get("to", "0" * 16),
+        }
+        dict_formatted.append({key: value for key, value in operation.items() if value != 0})
+
+    return dict_formatted
+
+
+@cached_reader
+def read_transactions_from_csv(file_path: str, dtype: dict[str, str] | None = CSV_DTYPES) -> list[dict[str, Any]]:
     """
     Reads transactions from a CSV file specified by the `file_path` argument.
 
     Args:
         file_path (str): The path to the CSV file containing transactions. The file should be semicolon-separated.
+        dtype (dict[str, str] | None, optional): Explicit column types passed to pandas.
+            Defaults to CSV_DTYPES; None lets pandas infer the types.
 
     Returns:
         list[dict[str, Any]]: A list of dictionaries representing transactions.
@@ -17,78 +75,275 @@ def read_transactions_from_csv(file_path: str) -> list[dict[str, Any]]:
             Returns an empty list if the file cannot be opened or if the
             deserialized data is not a list.
     """
+    # pandas импортируется внутри функций чтения: импорт модуля (и запуск main для JSON-файла) его не загружает.
+    import pandas as pd
+
+    try:
+        df = pd.read_csv(file_path, delimiter=";", dtype=dtype)
+        return _format_csv_transactions(df.fillna(0).to_dict(orient="records"))
+
+    except FileNotFoundError:
+        return []
+
+
+def iter_transactions_from_csv(
+    file_path: str | IO[bytes], chunksize: int = CSV_CHUNK_SIZE, dtype: dict[str, str] | None = CSV_DTYPES
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Reads transactions from a CSV file chunk by chunk.
+
+    Only `chunksize` rows of the file are held in memory at a time, so large files
+    are processed with bounded memory.
+
+    Args:
+        file_path (str | IO[bytes]): The path to the CSV file containing transactions, or an open binary file.
+            The file should be semicolon-separated.
+        chunksize (int, optional): The number of rows per chunk. Defaults to CSV_CHUNK_SIZE.
+        dtype (dict[str, str] | None, optional): Explicit column types passed to pandas.
+            Defaults to CSV_DTYPES; None lets pandas infer the types.
+
+    Yields:
+        list[dict[str, Any]]: Transactions of the next chunk, normalised the same way
+            as by `read_transactions_from_csv`. Nothing is yielded if the file cannot be opened.
+    """
+    import pandas as pd
+
+    try:
+        with pd.read_csv(file_path, delimiter=";", dtype=dtype, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield _format_csv_transactions(chunk.fillna(0).to_dict(orient="records"))
+
+    except FileNotFoundError:
+        return
+
+
+def read_table_from_csv(file_path: str, dtype: dict[str, str] | None = CSV_DTYPES) -> TransactionTable:
+    """
+    Reads transactions from a CSV file straight into a columnar TransactionTable,
+    without building a dictionary per transaction.
+
+    Args:
+        file_path (str): The path to the CSV file containing transactions. The file should be semicolon-separated.
+        dtype (dict[str, str] | None, optional): Explicit column types passed to pandas. Defaults to CSV_DTYPES.
+
+    Returns:
+        TransactionTable: The transactions of the file; an empty table if the file cannot be opened.
+    """
+    import pandas as pd
+
+    try:
+        return TransactionTable.from_dataframe(pd.read_csv(file_path, delimiter=";", dtype=dtype))
+
+    except FileNotFoundError:
+        return TransactionTable.from_records([])
+
+
+def read_table_from_excel(file_path: str) -> TransactionTable:
+    """
+    Reads transactions from an Excel file straight into a columnar TransactionTable,
+    without building a dictionary per transaction.
+
+    Args:
+        file_path (str): The path to the Excel file containing transactions.
+
+    Returns:
+        TransactionTable: The transactions of the file; an empty table if the file cannot be opened.
+    """
+    import pandas as pd
+
     try:
-        df = pd.read_csv(file_path, delimiter=";")
-        transactions_dict = df.fillna(0).to_dict(orient="records")
-        dict_formatted = [
-            {
-                "id": int(i.get("id", "0")),
-                "state": i.get("state", "UNKNOWN"),
-                "date": i.get("date", "1900-01-01T00:00:00"),
-                "operationAmount": {
-                    "amount": int(i.get("amount", "0")),
-                    "currency": {"name": i.get("currency_name", "UNKNOWN"), "code": i.get("currency_code", "XXX")},
-                },
-                "description": i.get("description"),
-                "from": i.get("from", "0" * 16),
-                "to": i.get("to", "0" * 16),
-            }
-            for i in transactions_dict
-        ]
-
-        for operation in dict_formatted:
-            for key, value in list(operation.items()):
-                if value == 0:
-                    del operation[key]
-
-        return dict_formatted
+        return TransactionTable.from_dataframe(pd.read_excel(file_path))
 
     except FileNotFoundError:
+        return TransactionTable.from_records([])
+
+
+def _xlsx_first_sheet(archive: zipfile.ZipFile) -> str:
+    """Returns the path (inside the archive) of the first worksheet of the workbook."""
+    with archive.open("xl/workbook.xml") as workbook_file:
+        sheet = next(element for _, element in iterparse(workbook_file) if element.tag == _XLSX_MAIN + "sheet")
+    relationship_id = sheet.get(_XLSX_RELATIONSHIPS + "id")
+
+    with archive.open("xl/_rels/workbook.xml.rels") as rels_file:
+        for _, element in iterparse(rels_file):
+            if element.tag == _XLSX_PACKAGE_RELATIONSHIPS + "Relationship" and element.get("Id") == relationship_id:
+                target = element.get("Target", "")
+                return target.lstrip("/") if target.startswith("/") else posixpath.normpath("xl/" + target)
+    raise KeyError(f"Лист {relationship_id} не найден в книге.")
+
+
+def _xlsx_shared_strings(archive: zipfile.ZipFile) -> list[str]:
+    """Returns the shared string table of the workbook (empty if the workbook has none)."""
+    if "xl/sharedStrings.xml" not in archive.namelist():
         return []
 
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as strings_file:
+        for _, element in iterparse(strings_file):
+            if element.tag == _XLSX_MAIN + "si":
+                # Текст строки - это все элементы <t> (несколько при форматировании частей строки).
+                strings.append("".join(text.text or "" for text in element.iter(_XLSX_MAIN + "t")))
+                element.clear()
+    return strings
+
+
+def _xlsx_column_index(reference: str) -> int:
+    """Converts the column letters of a cell reference ('C12') to a zero-based column index (2)."""
+    index = 0
+    for char in reference:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - ord("A") + 1
+    return index - 1
+
+
+def _iter_xlsx_rows(sheet_file: IO[bytes], shared_strings: list[str]) -> Iterator[dict[int, Any]]:
+    """
+    Streams the rows of a worksheet as {column index: value}, without building the whole sheet.
+
+    Values are str (shared, inline and formula strings), int or float (numbers) or bool; empty cells are absent,
+    and rows missing from the sheet XML are yielded as empty dictionaries. Every parsed row is removed
+    from the XML tree right away, so memory does not grow with the sheet.
+    """
+    cell_tag, row_tag, value_tag = _XLSX_MAIN + "c", _XLSX_MAIN + "row", _XLSX_MAIN + "v"
+    text_tag = _XLSX_MAIN + "t"
+
+    sheet_data = None
+    row_number = 0
+    for event, element in iterparse(sheet_file, events=("start", "end")):
+        if event == "start":
+            if element.tag == _XLSX_MAIN + "sheetData":
+                sheet_data = element
+            continue
+        if element.tag != row_tag:
+            continue
+
+        row_number += 1
+        number = int(element.get("r") or row_number)
+        for _ in range(number - row_number):
+            yield {}
+        row_number = number
+
+        row: dict[int, Any] = {}
+        for position, cell in enumerate(element.iter(cell_tag)):
+            reference = cell.get("r")
+            column = _xlsx_column_index(reference) if reference else position
+            cell_type = cell.get("t", "n")
+            if cell_type == "inlineStr":
+                row[column] = "".join(text.text or "" for text in cell.iter(text_tag))
+                continue
+
+            value = cell.findtext(value_tag)
+            if value is None:
+                continue
+            if cell_type == "s":
+                row[column] = shared_strings[int(value)]
+            elif cell_type == "n":
+                row[column] = int(value) if value.lstrip("-").isdigit() else float(value)
+            elif cell_type == "b":
+                row[column] = value == "1"
+            else:
+                row[column] = value
+        # Разобранная строка удаляется из дерева, чтобы дерево не росло вместе с листом.
+        if sheet_data is not None:
+            sheet_data.remove(element)
+        yield row
+
+
+def _format_excel_transaction(values: dict[str, Any]) -> dict[str, Any]:
+    """
+    Builds a nested transaction from the values of EXCEL_COLUMNS in a worksheet row.
+
+    Empty cells (absent from `values`) count as 0, and top-level keys with a value of 0 are dropped,
+    like after `fillna(0)` in the former pandas-based reader.
+    """
+    operation = {
+        "id": int(values.get("id", 0)),
+        "state": values.get("state", 0),
+        "date": values.get("date", 0),
+        "operationAmount": {
+            "amount": int(values.get("amount", 0)),
+            "currency": {"name": values.get("currency_name", 0), "code": values.get("currency_code", 0)},
+        },
+        "description": values.get("description", 0),
+        "from": values.get("from", 0),
+        "to": values.get("to", 0),
+    }
+    return {key: value for key, value in operation.items() if value != 0}
+
+
+def iter_transactions_from_excel(
+    file_path: str | IO[bytes], chunksize: int = CSV_CHUNK_SIZE
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Reads transactions from the first sheet of an XLSX file chunk by chunk.
 
+    The sheet XML is streamed straight from the archive (no pandas, no workbook object): the header row
+    gives the positions of EXCEL_COLUMNS, other columns are skipped, and only one chunk of transactions
+    is held in memory at a time.
+
+    Args:
+        file_path (str | IO[bytes]): The path to the XLSX file or an open seekable binary file;
+            the first row of the sheet holds the column names.
+        chunksize (int, optional): The number of transactions per chunk. Defaults to CSV_CHUNK_SIZE.
+
+    Yields:
+        list[dict[str, Any]]: Transactions of the next chunk, normalised the same way
+            as by `read_transactions_from_excel`. Nothing is yielded if the file cannot be opened.
+    """
+    try:
+        archive = zipfile.ZipFile(file_path)
+    except FileNotFoundError:
+        return
+
+    with archive:
+        shared_strings = _xlsx_shared_strings(archive)
+        with archive.open(_xlsx_first_sheet(archive)) as sheet_file:
+            rows = _iter_xlsx_rows(sheet_file, shared_strings)
+            header = next(rows, {})
+            columns = [(index, name) for index, name in header.items() if name in EXCEL_COLUMNS]
+            # Значения столбцов, которых нет на листе (как у прежнего читателя на основе pandas).
+            missing: dict[str, Any] = {name: None for name in EXCEL_COLUMNS if name not in header.values()}
+            missing.update(
+                {
+                    name: default
+                    for name, default in (("id", 0), ("state", "UNKNOWN"), ("amount", 0))
+                    if name in missing
+                }
+            )
+
+            chunk: list[dict[str, Any]] = []
+            empty_rows = 0
+            for row in rows:
+                values = {name: row[index] for index, name in columns if row.get(index) not in (None, "")}
+                if not values:
+                    # Как и pandas, пустые строки внутри листа сохраняются, а пустые строки в конце листа - нет.
+                    empty_rows += 1
+                    continue
+                chunk.extend(_format_excel_transaction(missing) for _ in range(empty_rows))
+                empty_rows = 0
+                chunk.append(_format_excel_transaction({**missing, **values}))
+                if len(chunk) >= chunksize:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+
+@cached_reader
 def read_transactions_from_excel(file_path: str) -> list[dict[str, Any]]:
     """
     Reads transactions from an Excel file specified by the `file_path` argument.
 
     Args:
-        file_path (str): The path to the Excel file containing transactions.
-            The file should be in a format compatible with pandas' read_excel function.
+        file_path (str): The path to the XLSX file containing transactions.
+            The sheet is streamed by `iter_transactions_from_excel`.
 
     Returns:
         list[dict[str, Any]]: A list of dictionaries representing transactions.
             Each dictionary contains keys for the transaction's ID, state, date,
             operation amount, description, from account, and to account.
-            Returns an empty list if the file cannot be opened or if the
-            deserialized data is not a list.
+            Returns an empty list if the file cannot be opened.
             Note: Any keys with a value of 0 are removed from the final dictionary.
     """
-    try:
-        df = pd.read_excel(file_path)
-        transactions_dict = df.fillna(0).to_dict(orient="records")
-
-        dict_formatted = [
-            {
-                "id": int(i.get("id", "0")),
-                "state": i.get("state", "UNKNOWN"),
-                "date": i.get("date"),
-                "operationAmount": {
-                    "amount": int(i.get("amount", "0")),
-                    "currency": {"name": i.get("currency_name"), "code": i.get("currency_code")},
-                },
-                "description": i.get("description"),
-                "from": i.get("from"),
-                "to": i.get("to"),
-            }
-            for i in transactions_dict
-        ]
-
-        for operation in dict_formatted:
-            for key, value in list(operation.items()):
-                if value == 0:
-                    del operation[key]
-
-        return dict_formatted
-
-    except FileNotFoundError:
-        return []
+    return [operation for chunk in iter_transactions_from_excel(file_path) for operation in chunk]
@@ -0,0 +1,256 @@
+import codecs
+import gzip
+import importlib
+import io
+import os
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Literal, NamedTuple, overload
+
+if TYPE_CHECKING:
+    from src.table import TransactionTable
+
+__all__ = ("TransactionFormat", "FORMATS", "register_format", "detect_format", "open_transactions")
+
+# Сигнатуры (magic bytes) и расширения сжатых файлов.
+COMPRESSIONS: dict[str, tuple[bytes, tuple[str, ...]]] = {
+    "gzip": (b"\x1f\x8b", (".gz",)),
+    "zstd": (b"\x28\xb5\x2f\xfd", (".zst", ".zstd")),
+}
+
+# Число первых байтов (распакованного) файла, по которым определяется его формат.
+SNIFF_SIZE = 4096
+
+# Число транзакций, восстанавливаемых за раз из кэшированной таблицы при потоковом чтении.
+STREAM_CHUNK_SIZE = 10_000
+
+
+class TransactionFormat(NamedTuple):
+    """
+    A registered format of transaction files.
+
+    `reader` is the streaming reader as "module:function"; it is imported on first use, so registering
+    a format costs nothing at startup. The reader is called with a path (uncompressed files) or with an open
+    file (binary if `binary`, otherwise UTF-8 text) and yields transactions, or lists of transactions
+    if `chunked`. `sniff` recognises the format by the first SNIFF_SIZE bytes of the decompressed file;
+    `extensions` are used when no sniffer recognises it. A reader that needs to seek (`seekable`)
+    gets compressed files decompressed into memory.
+    """
+
+    name: str
+    extensions: tuple[str, ...]
+    reader: str
+    sniff: Callable[[bytes], bool] | None = None
+    binary: bool = True
+    chunked: bool = False
+    seekable: bool = False
+
+
+# Зарегистрированные форматы; при определении формата по содержимому они проверяются в порядке регистрации.
+FORMATS: dict[str, TransactionFormat] = {}
+
+_readers: dict[str, Callable[..., Iterator[Any]]] = {}
+
+
+def register_format(transaction_format: TransactionFormat) -> TransactionFormat:
+    """
+    Registers (or replaces) a format of transaction files for detect_format and open_transactions.
+
+    Example:
+        register_format(TransactionFormat("parquet", (".parquet",), "my_package.parquet:iter_transactions",
+                                          sniff=lambda head: head.startswith(b"PAR1"), chunked=True))
+    """
+    FORMATS[transaction_format.name] = transaction_format
+    _readers.pop(transaction_format.name, None)
+    return transaction_format
+
+
+def _significant(head: bytes) -> bytes:
+    """The first bytes of a text file without the UTF-8 BOM and the leading whitespace."""
+    return head.removeprefix(codecs.BOM_UTF8).lstrip()
+
+
+register_format(
+    TransactionFormat(
+        "xlsx",
+        (".xlsx",),
+        "src.read_from_file:iter_transactions_from_excel",
+        sniff=lambda head: head.startswith(b"PK\x03\x04"),
+        chunked=True,
+        seekable=True,
+    )
+)
+register_format(
+    TransactionFormat(
+        "json",
+        (".json",),
+        "src.utils:iter_transactions_from_json",
+        sniff=lambda head: _significant(head).startswith(b"["),
+        binary=False,
+    )
+)
+register_format(
+    TransactionFormat(
+        "ndjson",
+        (".jsonl", ".ndjson"),
+        "src.utils:iter_transactions_from_ndjson",
+        sniff=lambda head: _significant(head).startswith(b"{"),
+    )
+)
+register_format(
+    TransactionFormat(
+        "csv",
+        (".csv",),
+        "src.read_from_file:iter_transactions_from_csv",
+        # Заголовок CSV-файла с транзакциями: столбцы через ';', среди них 'id'.
+        sniff=lambda head: b"id" in _significant(head).split(b"\n", 1)[0].rstrip(b"\r").split(b";"),
+        chunked=True,
+    )
+)
+
+
+def _open_compressed(file_path: str, compression: str | None) -> io.BufferedIOBase:
+    """Opens `file_path` for reading as a binary stream, decompressing it on the fly."""
+    if compression is None:
+        return open(file_path, "rb")
+    if compression == "gzip":
+        return gzip.open(file_path, "rb")
+
+    try:
+        import zstandard  # type: ignore[import-not-found]
+    except ImportError as ex:
+        raise ImportError(f"Для чтения файла {file_path}, сжатого zstd, установите пакет zstandard.") from ex
+    zstd_file: io.BufferedIOBase = zstandard.open(file_path, "rb")
+    return zstd_file
+
+
+def detect_format(file_path: str) -> tuple[TransactionFormat, str | None]:
+    """
+    Detects the format and the compression of a transaction file.
+
+    The compression (gzip, zstd) is recognised by its magic bytes; the format is recognised by the first bytes
+    of the decompressed contents (e.g. 'PK' of an XLSX archive, '[' of a JSON array, '{' of JSON Lines,
+    a CSV header) and, failing that, by the file extension (with the compression extension removed:
+    'operations.json.gz' -> '.json').
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        tuple[TransactionFormat, str | None]: The format and the compression ('gzip', 'zstd' or None).
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the format is not recognised.
+    """
+    with open(file_path, "rb") as raw_file:
+        magic = raw_file.read(4)
+    compression = next((name for name, (signature, _) in COMPRESSIONS.items() if magic.startswith(signature)), None)
+
+    with _open_compressed(file_path, compression) as source_file:
+        head = source_file.read(SNIFF_SIZE)
+
+    name = file_path.lower()
+    for extension in COMPRESSIONS[compression][1] if compression else ():
+        name = name.removesuffix(extension)
+
+    for transaction_format in FORMATS.values():
+        if transaction_format.sniff is not None and transaction_format.sniff(head):
+            return transaction_format, compression
+
+    extension = os.path.splitext(name)[1]
+    for transaction_format in FORMATS.values():
+        if extension in transaction_format.extensions:
+            return transaction_format, compression
+
+    raise ValueError(f"Не удалось определить формат файла {file_path}.")
+
+
+def _reader(transaction_format: TransactionFormat) -> Callable[..., Iterator[Any]]:
+    """Imports (once) the streaming reader of a format."""
+    if transaction_format.name not in _readers:
+        module_name, _, function_name = transaction_format.reader.partition(":")
+        _readers[transaction_format.name] = getattr(importlib.import_module(module_name), function_name)
+    return _readers[transaction_format.name]
+
+
+def _iter_file(file_path: str, transaction_format: TransactionFormat, compression: str | None) -> Iterator[dict]:
+    """Parses the file with the reader of its format, yielding one transaction at a time."""
+    read = _reader(transaction_format)
+
+    if compression is None:
+        items = read(file_path)
+        yield from (operation for chunk in items for operation in chunk) if transaction_format.chunked else items
+        return
+
+    with _open_compressed(file_path, compression) as binary_file:
+        source: Any = binary_file
+        if transaction_format.seekable:
+            source = io.BytesIO(binary_file.read())
+        elif not transaction_format.binary:
+            source = io.TextIOWrapper(source, encoding="utf-8")
+        items = read(source)
+        yield from (operation for chunk in items for operation in chunk) if transaction_format.chunked else items
+
+
+def _cache_key(transaction_format: TransactionFormat, compression: str | None) -> str:
+    """The name under which the parse cache keeps the table of a file of this format and compression."""
+    return f"open_transactions.{transaction_format.name}" + (f".{compression}" if compression else "")
+
+
+def _stream(file_path: str, transaction_format: TransactionFormat, compression: str | None) -> Iterator[dict]:
+    """Yields the transactions of the file: from the parse cache if the file is cached, otherwise by parsing."""
+    import numpy as np
+
+    from src.parse_cache import load_cached_table
+
+    table = load_cached_table(file_path, _cache_key(transaction_format, compression))
+    if table is None:
+        yield from _iter_file(file_path, transaction_format, compression)
+        return
+
+    for start in range(0, len(table), STREAM_CHUNK_SIZE):
+        yield from table.take(np.arange(start, min(start + STREAM_CHUNK_SIZE, len(table)))).to_records()
+
+
+@overload
+def open_transactions(file_path: str, stream: Literal[True] = True) -> Iterator[dict[str, Any]]: ...
+
+
+@overload
+def open_transactions(file_path: str, stream: Literal[False]) -> "TransactionTable": ...
+
+
+@overload
+def open_transactions(file_path: str, stream: bool) -> "Iterator[dict[str, Any]] | TransactionTable": ...
+
+
+def open_transactions(file_path: str, stream: bool = True) -> "Iterator[dict[str, Any]] | TransactionTable":
+    """
+    Opens a transaction file of any registered format (see FORMATS), possibly gzip- or zstd-compressed.
+
+    The format is detected by detect_format. With `stream=True` the transactions are yielded lazily,
+    one at a time, by the streaming reader of the format. With `stream=False` they are returned
+    as a columnar TransactionTable, which is kept in the parse cache (src.parse_cache): later calls for
+    the unchanged file memory-map the table instead of parsing the file, and lazy iteration uses it too.
+
+    Args:
+        file_path (str): The path to the file.
+        stream (bool): True for a lazy iterator of transaction dictionaries, False for a TransactionTable.
+
+    Returns:
+        Iterator[dict[str, Any]] | TransactionTable: The transactions of the file.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the format of the file is not recognised.
+    """
+    transaction_format, compression = detect_format(file_path)
+    if stream:
+        return _stream(file_path, transaction_format, compression)
+
+    from src.parse_cache import cached_table
+
+    return cached_table(
+        file_path,
+        _cache_key(transaction_format, compression),
+        lambda path: _iter_file(path, transaction_format, compression),
+    )
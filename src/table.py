@@ -0,0 +1,460 @@
+import gc
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+
+from src.dates import date_epoch
+
+__all__ = ("TransactionTable",)
+
+# Строковые столбцы таблицы (вложенные ключи operationAmount.currency развёрнуты в currency_name/currency_code).
+STRING_COLUMNS = ("state", "date", "description", "from", "to", "currency_name", "currency_code")
+
+# Столбцы с небольшим числом различных значений хранятся словарным кодированием:
+# массив кодов int32 в `columns` и массив различных значений в `categories`.
+CATEGORY_COLUMNS = ("state", "description", "currency_name", "currency_code")
+
+# Поля, которые могут отсутствовать в транзакции: для каждого хранится булева маска присутствия.
+OPTIONAL_FIELDS = (
+    "id",
+    "state",
+    "date",
+    "operationAmount",
+    "amount",
+    "currency",
+    "currency_name",
+    "currency_code",
+    "description",
+    "from",
+    "to",
+)
+
+# Представление суммы в исходной транзакции: строка ("9824.07"), целое или вещественное число.
+AMOUNT_TEXT, AMOUNT_INT, AMOUNT_FLOAT = 0, 1, 2
+
+_TOP_LEVEL_KEYS = frozenset(("id", "state", "date", "operationAmount", "description", "from", "to"))
+_INT64_LIMIT = 2**53
+
+
+def _date_order(epochs: np.ndarray, descending: bool) -> np.ndarray:
+    """Stable ordering of date epochs (see TransactionTable.date_order)."""
+    if not descending:
+        return np.argsort(epochs, kind="stable")
+    return len(epochs) - 1 - np.argsort(epochs[::-1], kind="stable")[::-1]
+
+
+class TransactionTable:
+    """
+    Columnar storage of banking transactions: one NumPy array per field instead of a dictionary per row.
+
+    Columns:
+        id (int64), amount (float64), amount_kind (int8, see AMOUNT_TEXT/AMOUNT_INT/AMOUNT_FLOAT),
+        amount_text (str, the original text of string amounts) and the string columns STRING_COLUMNS.
+    The columns CATEGORY_COLUMNS are dictionary-encoded: `columns` holds int32 codes into `categories`,
+    so filters on them compare integers and text predicates are evaluated once per distinct value.
+    Missing fields are tracked by boolean masks in `present`, so `to_records` restores
+    the original dictionaries. Rows that do not fit the columns (unknown keys, unexpected value types)
+    are kept as is in `extras` ({row index: original dictionary}); their columns hold best-effort values.
+    """
+
+    def __init__(
+        self,
+        columns: dict[str, np.ndarray],
+        present: dict[str, np.ndarray],
+        categories: dict[str, np.ndarray],
+        extras: dict[int, dict[str, Any]] | None = None,
+    ) -> None:
+        self.columns = columns
+        self.present = present
+        self.categories = categories
+        self.extras = extras or {}
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for index in range(len(self)):
+            yield self.record(index)
+
+    def __repr__(self) -> str:
+        return f"TransactionTable(rows={len(self)}, nbytes={self.nbytes})"
+
+    @property
+    def nbytes(self) -> int:
+        """The total size of all column, mask and category arrays in bytes."""
+        arrays = [*self.columns.values(), *self.present.values(), *self.categories.values()]
+        return sum(array.nbytes for array in arrays)
+
+    def column(self, name: str) -> np.ndarray:
+        """Returns the decoded values of the column `name` (codes of CATEGORY_COLUMNS are replaced by values)."""
+        if name in self.categories:
+            decoded: np.ndarray = self.categories[name][self.columns[name]]
+            return decoded
+        return self.columns[name]
+
+    def value(self, name: str, index: int) -> Any:
+        """Returns the decoded value of the column `name` in the row `index`."""
+        if name in self.categories:
+            return self.categories[name][self.columns[name][index]]
+        return self.columns[name][index]
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict[str, Any]]) -> "TransactionTable":
+        """
+        Builds a table from transaction dictionaries shaped like the ones in operations.json.
+
+        Args:
+            records (Iterable[dict[str, Any]]): Transactions, e.g. a list or the output of a streaming reader.
+
+        Returns:
+            TransactionTable: The table holding all transactions in their original order.
+        """
+        ids: list[int] = []
+        amounts: list[float] = []
+        amount_kinds: list[int] = []
+        amount_texts: list[str] = []
+        strings: dict[str, list[str]] = {name: [] for name in STRING_COLUMNS if name not in CATEGORY_COLUMNS}
+        codes: dict[str, list[int]] = {name: [] for name in CATEGORY_COLUMNS}
+        values: dict[str, dict[str, int]] = {name: {} for name in CATEGORY_COLUMNS}
+        present: dict[str, list[bool]] = {name: [] for name in OPTIONAL_FIELDS}
+        extras: dict[int, dict[str, Any]] = {}
+
+        def put_string(name: str, container: dict[str, Any], key: str) -> bool:
+            """Appends a string field; returns False if the value is not a string."""
+            value = container.get(key)
+            text = value if isinstance(value, str) else ""
+            if name in codes:
+                codes[name].append(values[name].setdefault(text, len(values[name])))
+            else:
+                strings[name].append(text)
+            present[name].append(key in container)
+            return value is None and key not in container or isinstance(value, str)
+
+        for index, record in enumerate(records):
+            if not isinstance(record, dict):
+                raise TypeError("Значение должно быть словарем.")
+            regular = record.keys() <= _TOP_LEVEL_KEYS
+
+            transaction_id = record.get("id")
+            is_int = type(transaction_id) is int and abs(transaction_id) < _INT64_LIMIT
+            ids.append(transaction_id if is_int else 0)  # type: ignore[arg-type]
+            present["id"].append("id" in record)
+            regular = regular and ("id" not in record or is_int)
+
+            for name in ("state", "date", "description", "from", "to"):
+                regular = put_string(name, record, name) and regular
+
+            operation_amount = record.get("operationAmount", {})
+            if not isinstance(operation_amount, dict):
+                operation_amount, regular = {}, False
+            present["operationAmount"].append("operationAmount" in record)
+            regular = regular and operation_amount.keys() <= {"amount", "currency"}
+
+            amount = operation_amount.get("amount")
+            present["amount"].append("amount" in operation_amount)
+            if isinstance(amount, str):
+                try:
+                    amounts.append(float(amount))
+                except ValueError:
+                    amounts.append(np.nan)
+                amount_kinds.append(AMOUNT_TEXT)
+                amount_texts.append(amount)
+            elif type(amount) is int and abs(amount) < _INT64_LIMIT:
+                amounts.append(float(amount))
+                amount_kinds.append(AMOUNT_INT)
+                amount_texts.append("")
+            elif type(amount) is float:
+                amounts.append(amount)
+                amount_kinds.append(AMOUNT_FLOAT)
+                amount_texts.append("")
+            else:
+                amounts.append(np.nan)
+                amount_kinds.append(AMOUNT_TEXT)
+                amount_texts.append("")
+                regular = regular and "amount" not in operation_amount
+
+            currency = operation_amount.get("currency", {})
+            if not isinstance(currency, dict):
+                currency, regular = {}, False
+            present["currency"].append("currency" in operation_amount)
+            regular = regular and currency.keys() <= {"name", "code"}
+            regular = put_string("currency_name", currency, "name") and regular
+            regular = put_string("currency_code", currency, "code") and regular
+
+            if not regular:
+                extras[index] = record
+
+        columns: dict[str, np.ndarray] = {
+            "id": np.array(ids, dtype=np.int64),
+            "amount": np.array(amounts, dtype=np.float64),
+            "amount_kind": np.array(amount_kinds, dtype=np.int8),
+            "amount_text": np.array(amount_texts, dtype=str),
+        }
+        columns.update({name: np.array(column, dtype=str) for name, column in strings.items()})
+        columns.update({name: np.array(column, dtype=np.int32) for name, column in codes.items()})
+        return cls(
+            columns,
+            {name: np.array(mask, dtype=bool) for name, mask in present.items()},
+            {name: np.array(list(values[name]), dtype=str) for name in CATEGORY_COLUMNS},
+            extras,
+        )
+
+    @classmethod
+    def from_dataframe(cls, df: Any) -> "TransactionTable":
+        """
+        Builds a table directly from a flat pandas DataFrame read from a CSV or Excel file
+        (columns id, state, date, amount, currency_name, currency_code, from, to, description),
+        without creating a dictionary per row.
+
+        Empty cells become missing fields, like the zero-valued keys dropped by the file readers. The readers keep
+        empty currency cells as 0 rather than dropping them, so the rows with such cells are kept in `extras`.
+        """
+        size = len(df)
+        columns: dict[str, np.ndarray] = {}
+        present: dict[str, np.ndarray] = {}
+        categories: dict[str, np.ndarray] = {}
+
+        def numeric(name: str) -> tuple[np.ndarray, np.ndarray]:
+            if name not in df:
+                return np.zeros(size, dtype=np.float64), np.zeros(size, dtype=bool)
+            values = df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+            return np.nan_to_num(values), ~np.isnan(values)
+
+        ids, ids_present = numeric("id")
+        columns["id"] = ids.astype(np.int64)
+        present["id"] = ids_present & (columns["id"] != 0)
+
+        amounts, amounts_present = numeric("amount")
+        columns["amount"] = np.trunc(amounts)
+        columns["amount_kind"] = np.full(size, AMOUNT_INT, dtype=np.int8)
+        columns["amount_text"] = np.full(size, "", dtype=str)
+        present["amount"] = np.ones(size, dtype=bool)
+        present["operationAmount"] = np.ones(size, dtype=bool)
+        present["currency"] = np.ones(size, dtype=bool)
+
+        for name in STRING_COLUMNS:
+            if name in df:
+                values = df[name]
+                present[name] = values.notna().to_numpy(dtype=bool)
+                column = np.array(values.fillna("").astype(str).tolist(), dtype=str)
+            else:
+                present[name] = np.zeros(size, dtype=bool)
+                column = np.full(size, "", dtype=str)
+
+            if name in CATEGORY_COLUMNS:
+                categories[name], inverse = np.unique(column, return_inverse=True)
+                columns[name] = inverse.astype(np.int32).reshape(size)
+            else:
+                columns[name] = column
+
+        table = cls(columns, present, categories)
+        for index in np.flatnonzero(~(present["currency_name"] & present["currency_code"])).tolist():
+            record = table.record(index)
+            currency = record["operationAmount"]["currency"]
+            record["operationAmount"]["currency"] = {"name": currency.get("name", 0), "code": currency.get("code", 0)}
+            table.extras[index] = record
+        return table
+
+    def record(self, index: int) -> dict[str, Any]:
+        """Restores the transaction dictionary of the row `index`."""
+        if index in self.extras:
+            return self.extras[index]
+
+        columns, present = self.columns, self.present
+        record: dict[str, Any] = {}
+
+        if present["id"][index]:
+            record["id"] = int(columns["id"][index])
+        for name in ("state", "date"):
+            if present[name][index]:
+                record[name] = str(self.value(name, index))
+
+        if present["operationAmount"][index]:
+            operation_amount: dict[str, Any] = {}
+            if present["amount"][index]:
+                kind = columns["amount_kind"][index]
+                if kind == AMOUNT_TEXT:
+                    operation_amount["amount"] = str(columns["amount_text"][index])
+                elif kind == AMOUNT_INT:
+                    operation_amount["amount"] = int(columns["amount"][index])
+                else:
+                    operation_amount["amount"] = float(columns["amount"][index])
+            if present["currency"][index]:
+                currency = {}
+                for name, key in (("currency_name", "name"), ("currency_code", "code")):
+                    if present[name][index]:
+                        currency[key] = str(self.value(name, index))
+                operation_amount["currency"] = currency
+            record["operationAmount"] = operation_amount
+
+        for name in ("description", "from", "to"):
+            if present[name][index]:
+                record[name] = str(self.value(name, index))
+
+        return record
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """
+        Restores the list of transaction dictionaries.
+
+        Gives the same dictionaries as `record` for every row, but converts each column and mask to Python
+        objects in one call (`tolist`) instead of reading NumPy scalars row by row.
+        """
+        # Сборщик мусора приостанавливается: созданные словари не образуют циклов, а его проходы
+        # по растущему списку записей занимают большую часть времени.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._build_records()
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _build_records(self) -> list[dict[str, Any]]:
+        """Builds the dictionaries of to_records (see there)."""
+        ids, amounts, amount_kinds, amount_texts, states, dates, descriptions, sources, targets, names, codes = (
+            self.column(name).tolist()
+            for name in (
+                "id",
+                "amount",
+                "amount_kind",
+                "amount_text",
+                "state",
+                "date",
+                "description",
+                "from",
+                "to",
+                "currency_name",
+                "currency_code",
+            )
+        )
+        (
+            has_id,
+            has_state,
+            has_date,
+            has_operation_amount,
+            has_amount,
+            has_currency,
+            has_name,
+            has_code,
+            has_description,
+            has_source,
+            has_target,
+        ) = (self.present[name].tolist() for name in OPTIONAL_FIELDS)
+        extras = self.extras
+
+        records = []
+        for index in range(len(ids)):
+            if index in extras:
+                records.append(extras[index])
+                continue
+
+            record: dict[str, Any] = {}
+            if has_id[index]:
+                record["id"] = ids[index]
+            if has_state[index]:
+                record["state"] = states[index]
+            if has_date[index]:
+                record["date"] = dates[index]
+
+            if has_operation_amount[index]:
+                operation_amount: dict[str, Any] = {}
+                if has_amount[index]:
+                    kind = amount_kinds[index]
+                    if kind == AMOUNT_TEXT:
+                        operation_amount["amount"] = amount_texts[index]
+                    elif kind == AMOUNT_INT:
+                        operation_amount["amount"] = int(amounts[index])
+                    else:
+                        operation_amount["amount"] = amounts[index]
+                if has_currency[index]:
+                    currency = {}
+                    if has_name[index]:
+                        currency["name"] = names[index]
+                    if has_code[index]:
+                        currency["code"] = codes[index]
+                    operation_amount["currency"] = currency
+                record["operationAmount"] = operation_amount
+
+            if has_description[index]:
+                record["description"] = descriptions[index]
+            if has_source[index]:
+                record["from"] = sources[index]
+            if has_target[index]:
+                record["to"] = targets[index]
+            records.append(record)
+
+        return records
+
+    def take(self, indices: np.ndarray) -> "TransactionTable":
+        """Returns a new table made of the rows `indices` (in the given order)."""
+        indices = np.asarray(indices, dtype=np.intp)
+        extras = {}
+        if self.extras:
+            for new_index, old_index in enumerate(indices.tolist()):
+                if old_index in self.extras:
+                    extras[new_index] = self.extras[old_index]
+
+        return TransactionTable(
+            {name: column[indices] for name, column in self.columns.items()},
+            {name: mask[indices] for name, mask in self.present.items()},
+            self.categories,
+            extras,
+        )
+
+    def where(self, mask: np.ndarray) -> "TransactionTable":
+        """Returns a new table made of the rows where `mask` is True."""
+        return self.take(np.flatnonzero(mask))
+
+    def state_mask(self, state: str) -> np.ndarray:
+        """Rows whose 'state' equals `state` (a missing state counts as 'UNKNOWN')."""
+        matches: np.ndarray = self.present["state"] & (self.columns["state"] == self._code("state", state))
+        if state == "UNKNOWN":
+            matches |= ~self.present["state"]
+        return matches
+
+    def currency_mask(self, currency: str) -> np.ndarray:
+        """Rows whose operationAmount.currency.code equals `currency`."""
+        matches: np.ndarray = self.present["currency_code"] & (
+            self.columns["currency_code"] == self._code("currency_code", currency)
+        )
+        return matches
+
+    def description_mask(self, substring: str) -> np.ndarray:
+        """Rows whose description contains `substring`, case-insensitively (a missing description counts as '')."""
+        substring = substring.casefold()
+        descriptions = self.categories["description"]
+        distinct = np.fromiter(
+            (substring in str(description).casefold() for description in descriptions),
+            dtype=bool,
+            count=len(descriptions),
+        )
+        matches = distinct[self.columns["description"]]
+        # Отсутствующее описание считается пустой строкой, как в search_by_str для словарей.
+        return np.where(self.present["description"], matches, substring == "")
+
+    def _code(self, name: str, value: str) -> int:
+        """The code of `value` in the category column `name`, or -1 if the value does not occur."""
+        matches = np.flatnonzero(self.categories[name] == value)
+        return int(matches[0]) if matches.size else -1
+
+    def date_epochs(self) -> np.ndarray:
+        """
+        The parsed-epoch column: seconds since 1970-01-01 of every 'date' (see `src.dates.date_epoch`).
+
+        The column is computed once and carried over by `take`/`where`; unparsable or missing dates are -inf,
+        i.e. they are ordered as the earliest ones.
+        """
+        if "date_epoch" not in self.columns:
+            epochs = np.array([date_epoch(str(date)) for date in self.columns["date"]], dtype=np.float64)
+            epochs[np.isnan(epochs) | ~self.present["date"]] = -np.inf
+            self.columns["date_epoch"] = epochs
+        return self.columns["date_epoch"]
+
+    def date_order(self, descending: bool = True) -> np.ndarray:
+        """
+        Stable ordering of the rows by the parsed 'date' timestamps.
+
+        Rows with equal dates keep their relative order in both directions, like `sorted(..., reverse=True)`.
+        """
+        return _date_order(self.date_epochs(), descending)
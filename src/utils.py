@@ -1,20 +1,33 @@
 import json
-import logging
 import os
-from typing import Any
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import IO, Any, Iterable, Iterator, NamedTuple
 
-from src.external_api import get_exchange_rate
+import numpy as np
 
-logger = logging.getLogger("utils")
-logger.setLevel(logging.INFO)
+from src.external_api import get_exchange_rate, get_rates_table
+from src.logging_config import get_logger, silence_worker
+from src.parse_cache import cached_reader
+from src.table import TransactionTable
 
-log_file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs", "utils.log")
-file_handler = logging.FileHandler(log_file_path, mode="w")
-file_formatter = logging.Formatter("%(asctime)s %(filename)s %(levelname)s: %(message)s")
-file_handler.setFormatter(file_formatter)
-logger.addHandler(file_handler)
+logger = get_logger("utils")
 
+# Размер блока (в символах), которым файл читается при потоковом разборе JSON.
+JSON_READ_CHUNK_SIZE = 1 << 16
 
+# Ошибка разбора не дальше этого числа символов от конца буфера может означать обрезанный блоком элемент
+# (например, 'tru' или '\u00'); ошибка раньше - испорченный элемент, и чтение прекращается сразу.
+JSON_TRUNCATION_MARGIN = 8
+
+# Файлы NDJSON (JSON Lines) не меньше этого размера (в байтах) по умолчанию разбираются параллельно, по частям.
+NDJSON_PARALLEL_MIN_BYTES = 8 << 20
+
+# Размер буфера записи файла NDJSON (в байтах).
+NDJSON_WRITE_BUFFER_SIZE = 1 << 20
+
+
+@cached_reader
 def read_transactions_from_json(json_file_path: str) -> list[dict]:
     """
     Reads transactions from a JSON file specified by the `json_file_path` argument.
@@ -30,10 +43,10 @@ def read_transactions_from_json(json_file_path: str) -> list[dict]:
     Raises: json.JSONDecodeError
     """
     try:
-        logger.info(f"Попытка открытия файла {json_file_path} на чтение.")
+        logger.info("Попытка открытия файла %s на чтение.", json_file_path)
         with open(json_file_path, "r", encoding="utf-8") as json_file:
             try:
-                logger.info(f"Начало чтения файла {json_file_path} с транзакциями.")
+                logger.info("Начало чтения файла %s с транзакциями.", json_file_path)
                 json_data = json.load(json_file)
 
             except json.JSONDecodeError as ex:
@@ -41,10 +54,10 @@ def read_transactions_from_json(json_file_path: str) -> list[dict]:
                 return []
             else:
                 if type(json_data) is not list:
-                    logger.warning(f"Содержимое файла {json_file_path} не является списочным объектом.")
+                    logger.warning("Содержимое файла %s не является списочным объектом.", json_file_path)
                     return []
 
-                logger.info(f"Чтение файла {json_file_path} с транзакциями прошло успешно.")
+                logger.info("Чтение файла %s с транзакциями прошло успешно.", json_file_path)
                 return json_data
 
     except FileNotFoundError as ex:
@@ -52,6 +65,302 @@ def read_transactions_from_json(json_file_path: str) -> list[dict]:
         return []
 
 
+def iter_transactions_from_json(
+    json_file_path: str | IO[str], chunk_size: int = JSON_READ_CHUNK_SIZE
+) -> Iterator[dict]:
+    """
+    Lazily reads transactions from a JSON file specified by the `json_file_path` argument.
+
+    The top-level array is parsed incrementally, block by block, so memory usage is bounded
+    by the size of a single transaction rather than by the size of the file.
+
+    Args:
+        json_file_path (str | IO[str]): The path to the JSON file containing transactions,
+            or an open text file (e.g. a decompressed stream, see `src.readers.open_transactions`).
+        chunk_size (int, optional): The number of characters read from the file at once.
+
+    Yields:
+        dict: The transactions of the top-level array, one at a time.
+            Nothing is yielded if the file cannot be opened or if its top-level object is not a list;
+            if the file is malformed, iteration stops at the first broken element (the rest of the file is not read).
+            Errors are logged the same way as in `read_transactions_from_json`.
+    """
+    decoder = json.JSONDecoder()
+
+    try:
+        logger.info("Попытка открытия файла %s на чтение.", json_file_path)
+        # Открытый файл передаётся как есть и не закрывается здесь.
+        opened = (
+            open(json_file_path, "r", encoding="utf-8")
+            if isinstance(json_file_path, str)
+            else nullcontext(json_file_path)
+        )
+        with opened as json_file:
+            logger.info("Начало потокового чтения файла %s с транзакциями.", json_file_path)
+            buffer = ""
+            pos = 0
+            eof = False
+
+            def skip_whitespace() -> bool:
+                """Moves `pos` to the next significant character, reading more of the file if needed."""
+                nonlocal buffer, pos, eof
+                while True:
+                    while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                        pos += 1
+                    if pos < len(buffer) or eof:
+                        return pos < len(buffer)
+                    buffer, pos = json_file.read(chunk_size), 0
+                    eof = not buffer
+
+            if not skip_whitespace():
+                logger.error("Файл %s пуст.", json_file_path)
+                return
+
+            if buffer[pos] != "[":
+                logger.warning("Содержимое файла %s не является списочным объектом.", json_file_path)
+                return
+            pos += 1
+
+            expect_item = True
+            while True:
+                if not skip_whitespace():
+                    logger.error("Неожиданный конец файла %s.", json_file_path)
+                    return
+
+                if buffer[pos] == "]":
+                    break
+
+                if not expect_item:
+                    if buffer[pos] != ",":
+                        logger.error("Ошибка разбора файла %s: ожидалась ',' или ']'.", json_file_path)
+                        return
+                    pos += 1
+                    expect_item = True
+                    continue
+
+                while True:
+                    try:
+                        item, end = decoder.raw_decode(buffer, pos)
+                        # Значение, упирающееся в конец буфера, может быть обрезано (например, число).
+                        if end < len(buffer) or eof:
+                            break
+                    except json.JSONDecodeError as ex:
+                        # Незакрытая строка или ошибка у самого конца буфера - возможно, элемент обрезан блоком
+                        # и дочитывается; остальные ошибки не исправит чтение следующих блоков.
+                        truncated = ex.msg.startswith("Unterminated string") or (
+                            ex.pos >= len(buffer) - JSON_TRUNCATION_MARGIN
+                        )
+                        if eof or not truncated:
+                            logger.error(ex)
+                            return
+
+                    chunk = json_file.read(chunk_size)
+                    eof = not chunk
+                    buffer, pos = buffer[pos:] + chunk, 0
+
+                pos = end
+                expect_item = False
+                yield item
+
+            logger.info("Потоковое чтение файла %s с транзакциями прошло успешно.", json_file_path)
+
+    except FileNotFoundError as ex:
+        logger.error(ex)
+
+
+def read_table_from_json(json_file_path: str) -> TransactionTable:
+    """
+    Reads transactions from a JSON file into a columnar TransactionTable.
+
+    The file is streamed with `iter_transactions_from_json`, so the list of dictionaries
+    is never materialised as a whole.
+
+    Args:
+        json_file_path (str): The path to the JSON file containing transactions.
+
+    Returns:
+        TransactionTable: The transactions of the file; an empty table if the file cannot be read.
+    """
+    return TransactionTable.from_records(iter_transactions_from_json(json_file_path))
+
+
+class NdjsonError(NamedTuple):
+    """A skipped line of an NDJSON file: the byte offset of the line in the file and the reason."""
+
+    offset: int
+    message: str
+
+
+def ndjson_shards(ndjson_file_path: str, count: int) -> list[tuple[int, int]]:
+    """
+    Splits an NDJSON file into at most `count` byte ranges [start, end) made of whole lines,
+    e.g. one range per worker (see iter_transactions_from_ndjson).
+
+    Args:
+        ndjson_file_path (str): The path to the NDJSON file.
+        count (int): The wanted number of ranges.
+
+    Returns:
+        list[tuple[int, int]]: Adjacent ranges covering the whole file; every range starts at the beginning
+            of a line, so a line belongs to exactly one range.
+    """
+    size = os.path.getsize(ndjson_file_path)
+    bounds = [0]
+    with open(ndjson_file_path, "rb") as ndjson_file:
+        for shard in range(1, count):
+            position = size * shard // count
+            if position <= bounds[-1]:
+                continue
+            # Граница переносится на начало строки, следующей за байтом position - 1.
+            ndjson_file.seek(position - 1)
+            ndjson_file.readline()
+            boundary = ndjson_file.tell()
+            if boundary >= size:
+                break
+            if boundary > bounds[-1]:
+                bounds.append(boundary)
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end] or [(0, size)]
+
+
+def iter_transactions_from_ndjson(
+    ndjson_file_path: str | IO[bytes], start: int = 0, end: int | None = None, errors: list[NdjsonError] | None = None
+) -> Iterator[dict]:
+    """
+    Lazily reads transactions from an NDJSON (JSON Lines) file: one JSON object per line.
+
+    Only the lines starting in the byte range [start, end) are read, so a file can be processed by several
+    workers (see ndjson_shards) or, for an append-only log, from the offset where the previous run stopped.
+    Empty lines are ignored; a line that is not valid JSON or not an object is skipped and reported.
+
+    Args:
+        ndjson_file_path (str | IO[bytes]): The path to the NDJSON file or an open binary file.
+        start (int): The byte offset of the first line to read (the beginning of a line).
+        end (int | None): The byte offset where reading stops (None - the end of the file).
+        errors (list[NdjsonError] | None): A list receiving the skipped lines. If it is not given,
+            the skipped lines are logged instead.
+
+    Yields:
+        dict: The transactions of the file, in the order of the lines.
+            Nothing is yielded if the file cannot be opened.
+    """
+    opened = open(ndjson_file_path, "rb") if isinstance(ndjson_file_path, str) else nullcontext(ndjson_file_path)
+    try:
+        with opened as ndjson_file:
+            if start:
+                ndjson_file.seek(start)
+            offset = start
+            for line in ndjson_file:
+                if end is not None and offset >= end:
+                    break
+                line_offset = offset
+                offset += len(line)
+                if not line.strip():
+                    continue
+
+                try:
+                    item = json.loads(line)
+                except ValueError as ex:
+                    error = NdjsonError(line_offset, str(ex))
+                else:
+                    if isinstance(item, dict):
+                        yield item
+                        continue
+                    error = NdjsonError(line_offset, "Строка не является объектом JSON.")
+
+                if errors is None:
+                    logger.warning("Строка файла %s по смещению %d пропущена: %s", ndjson_file_path, *error)
+                else:
+                    errors.append(error)
+
+    except FileNotFoundError as ex:
+        logger.error(ex)
+
+
+def _read_ndjson_shard(shard: tuple[str, int, int]) -> tuple[list[dict], list[NdjsonError]]:
+    """Reads one byte range of an NDJSON file in a worker process; the skipped lines are returned, not logged."""
+    ndjson_file_path, start, end = shard
+    errors: list[NdjsonError] = []
+    return list(iter_transactions_from_ndjson(ndjson_file_path, start, end, errors)), errors
+
+
+def read_transactions_from_ndjson(
+    ndjson_file_path: str, workers: int | None = None, errors: list[NdjsonError] | None = None
+) -> list[dict]:
+    """
+    Reads all transactions from an NDJSON (JSON Lines) file, decoding its lines in parallel.
+
+    The file is split by ndjson_shards into byte ranges of whole lines, and every range is decoded
+    by a separate process (ProcessPoolExecutor); the transactions keep the order of the file.
+    By default the file is split between the available CPUs if it is at least NDJSON_PARALLEL_MIN_BYTES long,
+    smaller files are read in this process. Bad lines are skipped, logged and reported in `errors`.
+
+    Args:
+        ndjson_file_path (str): The path to the NDJSON file.
+        workers (int | None): The number of worker processes (1 - no parallelism; None - automatic).
+        errors (list[NdjsonError] | None): A list receiving the skipped lines.
+
+    Returns:
+        list[dict]: The transactions of the file; an empty list if the file cannot be opened.
+    """
+    try:
+        size = os.path.getsize(ndjson_file_path)
+    except OSError as ex:
+        logger.error(ex)
+        return []
+
+    if workers is None:
+        workers = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+        if size < NDJSON_PARALLEL_MIN_BYTES:
+            workers = 1
+    shards = ndjson_shards(ndjson_file_path, workers) if workers > 1 else [(0, size)]
+
+    logger.info("Чтение файла %s с транзакциями (частей: %d).", ndjson_file_path, len(shards))
+    skipped: list[NdjsonError] = []
+    if len(shards) == 1:
+        transactions = list(iter_transactions_from_ndjson(ndjson_file_path, errors=skipped))
+    else:
+        transactions = []
+        with ProcessPoolExecutor(len(shards), initializer=silence_worker) as pool:
+            for shard_transactions, shard_errors in pool.map(
+                _read_ndjson_shard, [(ndjson_file_path, start, end) for start, end in shards]
+            ):
+                transactions.extend(shard_transactions)
+                skipped.extend(shard_errors)
+
+    for error in skipped:
+        logger.warning("Строка файла %s по смещению %d пропущена: %s", ndjson_file_path, *error)
+    if errors is not None:
+        errors.extend(skipped)
+    logger.info(
+        "Из файла %s прочитано транзакций: %d, пропущено строк: %d.", ndjson_file_path, len(transactions), len(skipped)
+    )
+    return transactions
+
+
+def write_transactions_to_ndjson(
+    transactions: Iterable[dict[str, Any]], ndjson_file_path: str, append: bool = False
+) -> int:
+    """
+    Writes transactions to an NDJSON (JSON Lines) file, one JSON object per line, through a buffered writer.
+
+    Args:
+        transactions (Iterable[dict[str, Any]]): The transactions, e.g. filtered ones or a lazy iterator.
+        ndjson_file_path (str): The path to the file.
+        append (bool): Append to the file (an append-only log) instead of overwriting it.
+
+    Returns:
+        int: The number of written transactions.
+    """
+    count = 0
+    mode = "a" if append else "w"
+    with open(ndjson_file_path, mode, encoding="utf-8", buffering=NDJSON_WRITE_BUFFER_SIZE) as ndjson_file:
+        for count, transaction in enumerate(transactions, 1):
+            ndjson_file.write(json.dumps(transaction, ensure_ascii=False) + "\n")
+    logger.info("В файл %s записано транзакций: %d.", ndjson_file_path, count)
+    return count
+
+
 def get_transaction_amount(transaction: dict[str, Any]) -> float:
     """
     Расчёт рублевогоо эквивалента заданной транзакции с учётом конверсионной операции.
@@ -60,29 +369,88 @@ def get_transaction_amount(transaction: dict[str, Any]) -> float:
         transaction (dict[str, Any]): A dictionary representing a transaction.
 
     Returns:
-        float: The amount of the transaction. If the transaction is in USD, an exchange rate is
-        requested from the external API.
+        float: The amount of the transaction. If the transaction is not in RUB, it is converted
+        against the cached rate table (see `src.external_api.get_rates_table`), so the external API
+        is requested once per batch of transactions rather than once per transaction.
     """
     currency = transaction.get("operationAmount", {}).get("currency", {}).get("code", "")
     trn_amount = float(transaction.get("operationAmount", {}).get("amount", ""))
     rub_amount = ""
 
     if currency == "RUB":
-        logger.info(f"Объём рублевой транзакции (id: {transaction.get('id')}).")
+        logger.info("Объём рублевой транзакции (id: %s).", transaction.get("id"))
         rub_amount = str(trn_amount)
     else:
-        logger.info(f"Попытка расчёта рублевого эквивалента {currency}-транзакции (id: {transaction.get('id')}).")
+        logger.info("Попытка расчёта рублевого эквивалента %s-транзакции (id: %s).", currency, transaction.get("id"))
         status, rub_amount = get_exchange_rate(trn_amount, currency)
 
         if status:
             logger.info(
-                "Обменная операция успешно рассчитана, "
-                "рублевый эквивалент транзакции составляет " + str(rub_amount) + " руб."
+                "Обменная операция успешно рассчитана, рублевый эквивалент транзакции составляет %s руб.", rub_amount
             )
 
     return float(rub_amount)
 
 
+def get_transaction_amounts(transactions: Iterable[dict[str, Any]]) -> np.ndarray:
+    """
+    Расчёт рублевых эквивалентов для всего списка транзакций за один проход.
+
+    Транзакции группируются по коду валюты, курс каждой валюты определяется один раз
+    (по кэшированной таблице курсов, см. `src.external_api.get_rates_table`),
+    после чего все суммы пересчитываются векторно средствами NumPy.
+
+    Args:
+        transactions (Iterable[dict[str, Any]]): Transactions to calculate RUB equivalents for.
+
+    Returns:
+        np.ndarray: An array of float64 aligned with the input: the RUB equivalent of every transaction.
+            Non-RUB amounts are rounded to 2 decimal places, like in `get_transaction_amount`.
+            The element is NaN if the transaction has no amount, its amount is not a number
+            or its currency rate is unavailable.
+    """
+    codes = []
+    amounts = []
+    for transaction in transactions:
+        operation_amount = transaction.get("operationAmount") or {}
+        codes.append((operation_amount.get("currency") or {}).get("code", ""))
+        # Нечисловая сумма даёт NaN только в своей строке, а не ошибку для всего списка.
+        try:
+            amounts.append(float(operation_amount.get("amount", "nan")))
+        except (TypeError, ValueError):
+            amounts.append(np.nan)
+
+    amount_array = np.array(amounts, dtype=np.float64)
+    if not amount_array.size:
+        return amount_array
+
+    distinct_codes, code_indices = np.unique(np.array(codes, dtype=str), return_inverse=True)
+    distinct_rates = np.ones(len(distinct_codes), dtype=np.float64)
+
+    foreign_codes = [code for code in distinct_codes if code != "RUB"]
+    if foreign_codes:
+        status, rates = get_rates_table("RUB")
+        if not status or isinstance(rates, str):
+            logger.error("Не удалось получить таблицу курсов валют: %s.", rates)
+            rates = {}
+
+        for i, code in enumerate(distinct_codes):
+            if code == "RUB":
+                continue
+            rate = rates.get(code)
+            if not rate:
+                logger.warning("Курс валюты '%s' недоступен, рублевый эквивалент не рассчитан.", code)
+                rate = np.nan
+            distinct_rates[i] = rate
+
+    rub_amounts = amount_array / distinct_rates[code_indices]
+    is_foreign = distinct_codes[code_indices] != "RUB"
+    rub_amounts[is_foreign] = np.round(rub_amounts[is_foreign], 2)
+
+    logger.info("Рассчитаны рублевые эквиваленты %s транзакций в %s валютах.", amount_array.size, len(distinct_codes))
+    return rub_amounts
+
+
 if __name__ == "__main__":
     transactions = read_transactions_from_json(
         os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "operations.json")
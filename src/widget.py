@@ -1,7 +1,45 @@
+import os
 import re
-from datetime import datetime
+from functools import lru_cache
+from typing import Any, NamedTuple, Protocol, Sequence
 
-from src.masks import get_mask_account, get_mask_card_number
+import numpy as np
+
+from src.dates import format_date, parse_date
+from src.masks import ACCOUNT_NUMBER_LENGTH, CARD_NUMBER_LENGTH, MaskingEngine, masking_engine
+
+# Размер кэша масок mask_account_card (MASK_CACHE_SIZE в .env или окружении): в выгрузках одни и те же
+# карты и счета повторяются тысячи раз, поэтому маскируется только каждое различное значение.
+# Кэш создаётся при первом маскировании, когда настройки из .env уже загружены; это значение - размер по умолчанию.
+MASK_CACHE_SIZE = 65536
+
+# Коды ошибок mask_account_card_batch (по одному на строку входного столбца).
+MASK_OK = 0
+MASK_NO_PREFIX = 1
+MASK_CARD_NON_DIGIT = 2
+MASK_CARD_LENGTH = 3
+MASK_ACCOUNT_NON_DIGIT = 4
+MASK_ACCOUNT_LENGTH = 5
+
+# Сообщения, соответствующие кодам ошибок (те же, что в исключениях mask_account_card).
+MASK_ERROR_MESSAGES = {
+    MASK_NO_PREFIX: (
+        "Номер карты должен начинаться с наименования платежной системы,"
+        " а номер счёта должен начинаться со слова 'Счет'."
+    ),
+    MASK_CARD_NON_DIGIT: "Номер карты должен состоять только из цифр.",
+    MASK_CARD_LENGTH: "Номер карты должен состоять из 16 цифр.",
+    MASK_ACCOUNT_NON_DIGIT: "Номер счета должен состоять только из цифр.",
+    MASK_ACCOUNT_LENGTH: "Номер счета должен состоять из 20 цифр.",
+}
+
+# Число строк, обрабатываемых mask_account_card_batch за один шаг (ограничивает размер матриц символов).
+MASK_BATCH_SIZE = 20_000
+
+# Начало области символов для частного использования Unicode: из них составляется пробный номер в _mask_template.
+_PROBE_BASE = 0xE000
+
+_ACCOUNT_PREFIX = np.array([ord(char) for char in "Счет"], dtype=np.uint32)
 
 
 def mask_account_card(card_or_acc_number: str) -> str:
@@ -13,8 +51,21 @@ def mask_account_card(card_or_acc_number: str) -> str:
     Visa Platinum 7000 79** **** 6361
     или Счет **4305
     соответственно.
+
+    Маски кэшируются (LRU, см. set_mask_cache_size и mask_cache_info) с ключом, включающим число видимых
+    цифр masking_engine, поэтому после masking_engine.reload() устаревшие маски не используются.
     """
+    # Первое обращение к visible_digits загружает .env, поэтому кэш создаётся после этого.
+    visible_digits = masking_engine.visible_digits
+    return (_cached_mask_account_card or _mask_cache())(card_or_acc_number, visible_digits)
 
+
+def _mask_account_card(card_or_acc_number: str, visible_digits: int) -> str:
+    """
+    Masks a card or an account without the cache, showing `visible_digits` last digits
+    (mask_account_card passes the current masking_engine.visible_digits, so it is a part of the cache key).
+    """
+    engine = MaskingEngine(visible_digits)
     # определение позиции первой цифры во входном аргументе card_or_acc_number
     first_digit_pos = 0
 
@@ -36,16 +87,169 @@ def mask_account_card(card_or_acc_number: str) -> str:
     if card_or_acc_number[: first_digit_pos - 1] == "Счет":
         if nondigits:
             raise ValueError("Номер счета должен состоять только из цифр.")
-        return card_or_acc_number[:first_digit_pos] + get_mask_account(card_or_acc_number[first_digit_pos:])
+        return card_or_acc_number[:first_digit_pos] + engine.mask_account(card_or_acc_number[first_digit_pos:])
     else:
         if nondigits:
             raise ValueError("Номер карты должен состоять только из цифр.")
-        return card_or_acc_number[:first_digit_pos] + get_mask_card_number(card_or_acc_number[first_digit_pos:])
+        return card_or_acc_number[:first_digit_pos] + engine.mask_card(card_or_acc_number[first_digit_pos:])
+
+
+class MaskCacheInfo(NamedTuple):
+    """The statistics of the mask cache of mask_account_card (see mask_cache_info)."""
+
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+
+class _MaskCache(Protocol):
+    """_mask_account_card wrapped by functools.lru_cache."""
+
+    def __call__(self, card_or_acc_number: str, visible_digits: int) -> str: ...
+
+    def cache_info(self) -> Any: ...
+
+    def cache_clear(self) -> None: ...
+
+
+_cached_mask_account_card: _MaskCache | None = None
+
+
+def _mask_cache() -> _MaskCache:
+    """Returns the mask cache of mask_account_card, creating it with MASK_CACHE_SIZE from .env on first use."""
+    if _cached_mask_account_card is None:
+        masking_engine.visible_digits  # загрузка .env
+        set_mask_cache_size(int(os.getenv("MASK_CACHE_SIZE", str(MASK_CACHE_SIZE))))
+    return _cached_mask_account_card  # type: ignore[return-value]
+
+
+def set_mask_cache_size(maxsize: int | None) -> None:
+    """
+    Replaces the mask cache of mask_account_card with an empty one of `maxsize` entries
+    (None - unbounded, 0 - no caching).
+    """
+    global _cached_mask_account_card
+    _cached_mask_account_card = lru_cache(maxsize=maxsize)(_mask_account_card)
+
+
+def mask_cache_info() -> MaskCacheInfo:
+    """Returns the statistics of the mask cache of mask_account_card: hits, misses, maxsize, currsize."""
+    return MaskCacheInfo(*_mask_cache().cache_info())
+
+
+def mask_cache_clear() -> None:
+    """Empties the mask cache of mask_account_card and resets its statistics."""
+    _mask_cache().cache_clear()
+
+
+def _digit_matrix(codes: np.ndarray) -> np.ndarray:
+    """Marks the characters of a code point matrix for which str.isdigit() is True (ASCII and Unicode digits)."""
+    is_digit = (codes >= ord("0")) & (codes <= ord("9"))
+    other = np.unique(codes[codes > 127])
+    unicode_digits = [code for code in other.tolist() if chr(code).isdigit()]
+    if unicode_digits:
+        is_digit |= np.isin(codes, unicode_digits)
+    return is_digit
+
+
+def _mask_template(length: int, account: bool) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Describes the mask of a valid `length`-digit card (or account) number position by position: for every
+    character of the mask, the index of the number character shown there (-1 for the constant '*' and ' ')
+    and the code point of the mask character.
+
+    The template is obtained by masking a probe number of distinct placeholder characters with masking_engine,
+    so it always follows the engine settings (BANK_CARD_LAST_VISIBLE_DIGITS).
+    """
+    probe = "".join(chr(_PROBE_BASE + index) for index in range(length))
+    mask = masking_engine.format_account(probe) if account else masking_engine.format_card(probe)
+    codes = np.array([ord(char) for char in mask], dtype=np.int64)
+    source = np.where((codes >= _PROBE_BASE) & (codes < _PROBE_BASE + length), codes - _PROBE_BASE, -1)
+    return source, codes
+
+
+def _mask_chunk(values: np.ndarray) -> tuple[list[str], np.ndarray]:
+    """Masks one chunk of mask_account_card_batch; `values` is a 1-D array of str ('<U')."""
+    rows = len(values)
+    width = max(values.dtype.itemsize // 4, 1)
+    codes = np.ascontiguousarray(values, dtype=f"<U{width}").view(np.uint32).reshape(rows, width)
+    lengths = np.char.str_len(values)
+    positions = np.arange(width)
+
+    # Префикс (наименование платёжной системы или 'Счет') отделяется от номера по первой цифре строки.
+    is_digit = _digit_matrix(codes)
+    first_digit = is_digit.argmax(axis=1)
+    errors = np.where(is_digit.any(axis=1) & (first_digit > 0), MASK_OK, MASK_NO_PREFIX).astype(np.int8)
+
+    in_number = (positions >= first_digit[:, None]) & (positions < lengths[:, None])
+    has_non_digit = (in_number & ~is_digit).any(axis=1)
+    number_length = lengths - first_digit
+    is_account = (first_digit == len(_ACCOUNT_PREFIX) + 1) & (codes[:, : len(_ACCOUNT_PREFIX)] == _ACCOUNT_PREFIX).all(
+        axis=1
+    )
+
+    ok = errors == MASK_OK
+    errors[ok & is_account & (number_length != ACCOUNT_NUMBER_LENGTH)] = MASK_ACCOUNT_LENGTH
+    errors[ok & ~is_account & (number_length != CARD_NUMBER_LENGTH)] = MASK_CARD_LENGTH
+    errors[ok & is_account & has_non_digit] = MASK_ACCOUNT_NON_DIGIT
+    errors[ok & ~is_account & has_non_digit] = MASK_CARD_NON_DIGIT
+
+    # Номера сдвигаются к началу строк матрицы, префиксы обрезаются по первой цифре: строки не перебираются.
+    shifted = np.minimum(first_digit[:, None] + positions, width - 1)
+    number_codes = np.take_along_axis(codes, shifted, axis=1)
+    number_codes[first_digit[:, None] + positions >= lengths[:, None]] = 0
+    prefixes = np.where(positions < first_digit[:, None], codes, 0).view(f"<U{width}").ravel()
+
+    # Маски собираются по шаблону позиций сразу для всех корректных номеров карт, затем счетов.
+    masks = np.full(rows, "", dtype=object)
+    for account, length in ((False, CARD_NUMBER_LENGTH), (True, ACCOUNT_NUMBER_LENGTH)):
+        rows_to_mask = np.flatnonzero((errors == MASK_OK) & (is_account == account))
+        if rows_to_mask.size:
+            source, constant = _mask_template(length, account)
+            mask_codes = np.where(source >= 0, number_codes[rows_to_mask][:, np.maximum(source, 0)], constant)
+            masked = np.ascontiguousarray(mask_codes, dtype=np.uint32).view(f"<U{len(source)}").ravel()
+            masks[rows_to_mask] = np.char.add(prefixes[rows_to_mask], masked)
+
+    return masks.tolist(), errors
+
+
+def mask_account_card_batch(values: Sequence[str] | np.ndarray) -> tuple[list[str], np.ndarray]:
+    """
+    Masks a whole column of cards and accounts (e.g. all 'from' or 'to' values), like mask_account_card.
+
+    The payment system name (or 'Счет') is split from the number, and the numbers are validated,
+    in one vectorised pass over the code points of the strings; the masks of the valid numbers are assembled
+    the same way, from a position template built by `masking_engine`. Instead of raising on the first bad row,
+    every row gets an error code.
+
+    Parameters:
+    values (Sequence[str] | np.ndarray): The strings to mask, e.g. "Visa Platinum 7000792289606361"
+                                         or "Счет 73654108430135874305"; a list or a NumPy string array.
+
+    Returns:
+    tuple[list[str], np.ndarray]: The masked strings ('' for rows with an error) and an int8 array of error codes:
+        MASK_OK (0) or one of MASK_NO_PREFIX, MASK_CARD_NON_DIGIT, MASK_CARD_LENGTH, MASK_ACCOUNT_NON_DIGIT,
+        MASK_ACCOUNT_LENGTH (see MASK_ERROR_MESSAGES for the messages mask_account_card would raise).
+    """
+    array = np.asarray(values, dtype=str)
+    if array.ndim != 1:
+        array = array.ravel()
+
+    masks: list[str] = []
+    errors = []
+    for start in range(0, len(array), MASK_BATCH_SIZE):
+        chunk_masks, chunk_errors = _mask_chunk(array[start : start + MASK_BATCH_SIZE])
+        masks.extend(chunk_masks)
+        errors.append(chunk_errors)
+
+    return masks, np.concatenate(errors) if errors else np.zeros(0, dtype=np.int8)
 
 
 def format_str_date(raw_date_str: str) -> str:
     """
     Converts a date string in ISO 8601 format to a string in the format "dd.mm.yyyy".
+    Parsing goes through the memoised `src.dates.parse_date`, shared with `sort_by_date`.
 
     Parameters:
     raw_date_str (str): A date string in ISO 8601 format (e.g., "2022-01-01T12:00:00.000000").
@@ -59,17 +263,10 @@ def format_str_date(raw_date_str: str) -> str:
     if not raw_date_str:
         return ""
 
-    date_formats = [
-        "%Y-%m-%dT%H:%M:%S.%f",
-        "%Y-%m-%dT%H:%M:%SZ",
-    ]
-    date_obj = None
-    for date_format in date_formats:
-        try:
-            date_obj = datetime.strptime(raw_date_str, date_format)
-        except ValueError:
-            continue
+    date_obj = parse_date(raw_date_str)
 
     if date_obj is None:
-        raise ValueError(f"Ошибка: строка даты-времени '{raw_date_str}' не соответствует ни одному из допустимых форматов.")
-    return date_obj.strftime("%d.%m.%Y")
+        raise ValueError(
+            f"Ошибка: строка даты-времени '{raw_date_str}' не соответствует ни одному из допустимых форматов."
+        )
+    return format_date(date_obj)
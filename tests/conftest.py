@@ -110,3 +110,11 @@ def get_df() -> pd.DataFrame:
     }
 
     return pd.DataFrame(data)
+
+
+@pytest.fixture(autouse=True)
+def parse_cache_dir(tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Points the parse cache of the file readers to a temporary folder, so tests never use the project's cache."""
+    cache_path = str(tmp_path_factory.mktemp("parse_cache"))
+    monkeypatch.setenv("TRANSACTIONS_CACHE_DIR", cache_path)
+    return cache_path
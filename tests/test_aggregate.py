@@ -0,0 +1,146 @@
+import math
+import os
+from collections import defaultdict
+from typing import Any, Hashable
+
+import pytest
+
+from src.aggregate import GROUP_KEYS, Aggregation, AmountStats, aggregate, aggregate_files
+from src.utils import iter_transactions_from_json, read_transactions_from_json, write_transactions_to_ndjson
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+OPERATIONS_PATH = os.path.join(DATA_PATH, "operations.json")
+
+
+def _expected(transactions: list[dict[str, Any]], by: str) -> dict[Hashable, dict[str, float]]:
+    """Computes the statistics of the amounts of every group directly, from lists of amounts."""
+    counts: dict[Hashable, int] = defaultdict(int)
+    amounts: dict[Hashable, list[float]] = defaultdict(list)
+    for transaction in transactions:
+        key = GROUP_KEYS[by](transaction)
+        counts[key] += 1
+        amount = (transaction.get("operationAmount") or {}).get("amount")
+        if amount is not None:
+            amounts[key].append(float(amount))
+    return {
+        key: {
+            "count": count,
+            "sum": sum(amounts[key]),
+            "min": min(amounts[key], default=math.nan),
+            "max": max(amounts[key], default=math.nan),
+            "mean": sum(amounts[key]) / len(amounts[key]) if amounts[key] else math.nan,
+        }
+        for key, count in counts.items()
+    }
+
+
+def _assert_same(result: dict[Hashable, dict[str, float]], expected: dict[Hashable, dict[str, float]]) -> None:
+    """Compares the statistics of the groups (floating-point sums of amounts in another order are approximate)."""
+    assert result.keys() == expected.keys()
+    for key, stats in result.items():
+        assert stats == pytest.approx(expected[key], nan_ok=True), key
+
+
+@pytest.mark.parametrize("by", ["description", "state", "currency", "month", "from_account", "to_account"])
+def test_aggregate(by: str) -> None:
+    """
+    Checks the statistics of every group key against a direct computation; the file is streamed.
+
+    Parameters:
+        by: The group key.
+    """
+    transactions = read_transactions_from_json(OPERATIONS_PATH)
+    result = aggregate(iter_transactions_from_json(OPERATIONS_PATH), by=by).result()
+
+    _assert_same(result, _expected(transactions, by))
+    assert sum(stats["count"] for stats in result.values()) == len(transactions)
+
+
+def test_aggregate_keys() -> None:
+    """Checks the values of the group keys and tuple keys of several keys."""
+    transaction = {
+        "date": "2019-08-26T10:50:58.294041",
+        "state": "EXECUTED",
+        "operationAmount": {"amount": "31957.58", "currency": {"name": "руб.", "code": "RUB"}},
+        "from": "Maestro 1596837868705199",
+        "to": "Счет 64686473678894779589",
+    }
+
+    assert Aggregation(("month", "currency", "from_account", "to_account")).key(transaction) == (
+        "2019-08",
+        "RUB",
+        "Maestro",
+        "Счет",
+    )
+    assert Aggregation("state").key({}) == "UNKNOWN"
+    assert Aggregation(("description", "month", "currency", "from_account")).key({}) == (None, None, None, None)
+    assert Aggregation(lambda transaction: len(transaction)).key(transaction) == 5
+
+
+def test_aggregate_merge() -> None:
+    """Checks that merging the aggregations of two parts equals the aggregation of all transactions."""
+    transactions = read_transactions_from_json(OPERATIONS_PATH)
+    middle = len(transactions) // 2
+
+    merged = aggregate(transactions[:middle], by=("currency", "state")).merge(
+        aggregate(transactions[middle:], by=("currency", "state"))
+    )
+    whole = aggregate(transactions, by=("currency", "state"))
+
+    _assert_same(merged.result(), whole.result())
+    with pytest.raises(ValueError):
+        merged.merge(aggregate(transactions, by="currency"))
+
+
+def test_aggregate_rub() -> None:
+    """Checks the RUB equivalents: amount / rate rounded to 2 places; amounts without a rate are only counted."""
+    transactions = [
+        {"description": "a", "operationAmount": {"amount": "100", "currency": {"code": "RUB"}}},
+        {"description": "a", "operationAmount": {"amount": "10", "currency": {"code": "USD"}}},
+        {"description": "a", "operationAmount": {"amount": "10", "currency": {"code": "XYZ"}}},
+        {"description": "a", "operationAmount": {"amount": "not a number", "currency": {"code": "RUB"}}},
+    ]
+
+    result = Aggregation(rub=True, rates={"USD": 0.011}).update(transactions)["a"]
+
+    assert result.as_dict() == pytest.approx(
+        {"count": 4, "sum": 1009.09, "min": 100.0, "max": 909.09, "mean": 504.545}
+    )
+    assert result.amount_count == 2
+
+
+def test_amount_stats_empty() -> None:
+    """Checks the statistics of a group without amounts."""
+    stats = AmountStats()
+    stats.add(None)
+
+    assert stats.as_dict() == pytest.approx(
+        {"count": 1, "sum": 0.0, "min": math.nan, "max": math.nan, "mean": math.nan}, nan_ok=True
+    )
+
+
+def test_aggregate_unknown_key() -> None:
+    """Checks that an unknown key name is rejected."""
+    with pytest.raises(ValueError):
+        Aggregation(("state", "colour"))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_aggregate_files(tmp_path: Any, workers: int) -> None:
+    """
+    Checks that aggregating several files equals aggregating all their transactions.
+
+    Parameters:
+        workers: The number of worker processes.
+    """
+    transactions = read_transactions_from_json(OPERATIONS_PATH)
+    parts = [transactions[:30], transactions[30:70], transactions[70:]]
+    file_paths = []
+    for number, part in enumerate(parts):
+        file_path = str(tmp_path / f"part{number}.jsonl")
+        write_transactions_to_ndjson(part, file_path)
+        file_paths.append(file_path)
+
+    result = aggregate_files(file_paths, by="month", workers=workers)
+
+    _assert_same(result.result(), aggregate(transactions, by="month").result())
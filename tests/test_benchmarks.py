@@ -0,0 +1,138 @@
+import json
+import os
+from typing import Any
+
+from benchmarks.run_benchmarks import compare_results, main, measure_import_time, run_benchmarks
+from benchmarks.synthetic import generate_operations, write_operations_json, write_transactions_csv
+from src.read_from_file import read_transactions_from_csv
+from src.table import TransactionTable
+from src.utils import read_transactions_from_json
+
+
+def test_generate_operations_shape() -> None:
+    """
+    Checks that the synthetic transactions have the shape of data/operations.json and depend only on the seed.
+    """
+    operations = list(generate_operations(500, seed=1))
+
+    assert len(operations) == 500
+    assert operations == list(generate_operations(500, seed=1))
+    assert operations != list(generate_operations(500, seed=2))
+    for operation in operations:
+        if not operation:
+            continue
+        assert operation["state"] in ("EXECUTED", "CANCELED", "PENDING")
+        assert operation["operationAmount"]["currency"]["code"] in ("RUB", "USD")
+        assert ("from" in operation) == (operation["description"] != "Открытие вклада")
+
+
+def test_write_synthetic_files(tmp_path: Any) -> None:
+    """
+    Checks that the generated JSON and CSV files are read back by the readers of the application.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    json_path = write_operations_json(os.path.join(tmp_path, "operations.json"), 300, seed=3)
+    csv_path = write_transactions_csv(os.path.join(tmp_path, "transactions.csv"), 300, seed=3)
+
+    assert read_transactions_from_json(json_path) == list(generate_operations(300, seed=3))
+
+    transactions = read_transactions_from_csv(csv_path)
+    assert len(transactions) == 300
+    assert transactions[0]["date"].endswith("Z")
+    assert TransactionTable.from_records(transactions).to_records() == transactions
+
+
+def test_run_benchmarks(tmp_path: Any) -> None:
+    """
+    Checks that the benchmarks produce a machine-readable report for every selected benchmark and size.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    report = run_benchmarks(sizes=(50, 100), repeat=1, data_dir=str(tmp_path), only=["sort_by_date*", "filter_*"])
+
+    names = {result["name"] for result in report["results"]}
+    assert names == {
+        "sort_by_date",
+        "sort_by_date[table]",
+        "filter_by_state",
+        "filter_by_state[table]",
+        "filter_by_currency",
+        "filter_by_currency[table]",
+    }
+    assert [result["rows"] for result in report["results"]].count(100) == 6
+    for result in report["results"]:
+        assert result["seconds"] > 0
+        assert result["peak_bytes"] >= 0
+    json.dumps(report)
+
+
+def test_compare_results() -> None:
+    """
+    Checks that only benchmarks slower than the threshold are reported as regressions.
+    """
+    baseline = {"results": [{"name": "a", "rows": 10, "seconds": 1.0}, {"name": "b", "rows": 10, "seconds": 1.0}]}
+    current = {
+        "results": [
+            {"name": "a", "rows": 10, "seconds": 1.1},
+            {"name": "b", "rows": 10, "seconds": 1.5},
+            {"name": "c", "rows": 10, "seconds": 9.0},
+        ]
+    }
+
+    regressions = compare_results(baseline, current, threshold=1.2)
+
+    assert [(regression["name"], regression["ratio"]) for regression in regressions] == [("b", 1.5)]
+
+
+def test_main_writes_results(tmp_path: Any) -> None:
+    """
+    Checks that the command line entry point writes the report and fails on a regression.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    out_path = os.path.join(tmp_path, "results.json")
+    args = ["--sizes", "50", "--repeat", "1", "--only", "filter_by_state", "--data-dir", str(tmp_path)]
+
+    assert main([*args, "--out", out_path]) == 0
+    with open(out_path, encoding="utf-8") as results_file:
+        report = json.load(results_file)
+    assert [result["name"] for result in report["results"]] == ["filter_by_state"]
+
+    report["results"][0]["seconds"] = 1e-12
+    with open(out_path, "w", encoding="utf-8") as results_file:
+        json.dump(report, results_file)
+    assert main([*args, "--out", os.path.join(tmp_path, "new.json"), "--compare", out_path]) == 1
+
+
+def test_main_startup_budget_ignores_only(tmp_path: Any) -> None:
+    """
+    Checks that --startup-budget measures the import of src.main even if --only does not select it.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    out_path = os.path.join(tmp_path, "results.json")
+    args = ["--sizes", "50", "--repeat", "1", "--only", "filter_by_state", "--data-dir", str(tmp_path)]
+
+    assert main([*args, "--out", out_path, "--startup-budget", "0"]) == 1
+    with open(out_path, encoding="utf-8") as results_file:
+        report = json.load(results_file)
+    assert [result["name"] for result in report["results"]] == ["import src.main", "filter_by_state"]
+
+
+def test_startup_loads_no_heavy_dependencies() -> None:
+    """
+    Checks that importing src.main (the CLI start) loads none of numpy, pandas, requests and dotenv,
+    and that importing the CSV reader module does not load pandas.
+    """
+    main_result = measure_import_time("src.main", repeat=1)
+    reader_result = measure_import_time("src.read_from_file", repeat=1)
+
+    assert main_result["group"] == "startup"
+    assert main_result["seconds"] > 0
+    assert main_result["loaded"] == []
+    assert "pandas" not in reader_result["loaded"]
@@ -0,0 +1,62 @@
+import math
+from datetime import datetime
+
+import pytest
+
+from src.dates import date_epoch, format_date, parse_date
+
+
+@pytest.mark.parametrize(
+    "raw_date_str, expected",
+    [
+        ("2019-08-26T10:50:58.294041", datetime(2019, 8, 26, 10, 50, 58, 294041)),
+        ("2023-09-05T11:30:32Z", datetime(2023, 9, 5, 11, 30, 32)),
+        ("2020-02-29T23:59:59.999999", datetime(2020, 2, 29, 23, 59, 59, 999999)),
+        ("2018-06-30T02:08:58.4", datetime(2018, 6, 30, 2, 8, 58, 400000)),
+        ("2019-13-03T18:35:29.512364", None),
+        ("2018-09-32T21:27:25.241689", None),
+        ("2018-10-14T24:21:33.419441", None),
+        ("2018-10-14 08:21:33.419441", None),
+        ("2018-1a-14T08:21:33.419441", None),
+        ("20190703", None),
+        ("bad date", None),
+        ("", None),
+    ],
+)
+def test_parse_date(raw_date_str: str, expected: datetime | None) -> None:
+    """
+    Checks that parse_date accepts exactly the strings accepted by strptime with the two known formats.
+
+    Parameters:
+        raw_date_str (str): The date string to parse.
+        expected (datetime | None): The expected parsed date or None for an invalid string.
+    """
+    assert parse_date(raw_date_str) == expected
+
+
+def test_parse_date_cache() -> None:
+    """
+    Checks that repeated timestamps are served from the memo cache.
+    """
+    parse_date.cache_clear()
+    for _ in range(3):
+        parse_date("2019-08-26T10:50:58.294041")
+
+    cache_info = parse_date.cache_info()
+    assert (cache_info.hits, cache_info.misses) == (2, 1)
+
+
+def test_date_epoch() -> None:
+    """
+    Checks that epochs order dates of both formats by real time and are NaN for invalid strings.
+    """
+    assert date_epoch("1970-01-02T00:00:00Z") == 86400.0
+    assert date_epoch("2023-09-05T11:30:32.000001") > date_epoch("2023-09-05T11:30:32Z")
+    assert math.isnan(date_epoch("bad date"))
+
+
+def test_format_date() -> None:
+    """
+    Checks the 'dd.mm.yyyy' display format.
+    """
+    assert format_date(datetime(2019, 8, 6, 10, 50, 58)) == "06.08.2019"
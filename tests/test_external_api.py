@@ -1,12 +1,48 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
 from unittest import mock
 from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
 
+import pytest
 import requests
 
-from src.external_api import get_exchange_rate
+from src import external_api
+from src.external_api import clear_rates_cache, get_exchange_rate, get_exchange_rates_many, get_rates_table
+
+
+@pytest.fixture(autouse=True)
+def empty_rates_cache(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Every test starts with an empty in-process rate cache and without an on-disk snapshot."""
+    monkeypatch.delenv("EXCHANGE_RATES_SNAPSHOT", raising=False)
+    monkeypatch.delenv("EXCHANGE_RATES_TTL", raising=False)
+    monkeypatch.delenv("EXCHANGE_RATES_FAILURE_TTL", raising=False)
+    clear_rates_cache()
+    yield
+    clear_rates_cache()
+
+
+@pytest.fixture
+def mock_get() -> Iterator[mock.Mock]:
+    """Replaces the shared HTTP session of src.external_api with a mock and returns the mock of its get method."""
+    with patch("src.external_api._get_session") as mock_get_session:
+        yield mock_get_session.return_value.get
+
+
+def rates_response() -> dict:
+    return {
+        "success": True,
+        "timestamp": 1722061984,
+        "base": "RUB",
+        "date": "2024-07-27",
+        "rates": {"USD": 0.011631, "EUR": 0.010714, "RUB": 1},
+    }
 
 
-@patch("src.external_api.requests.get")
 def test_get_exchange_rate(mock_get: mock.Mock) -> None:
     """
     Tests get_exchange_rate function with a successful response.
@@ -16,23 +52,17 @@ def test_get_exchange_rate(mock_get: mock.Mock) -> None:
     being the converted amount.
 
     Parameters:
-        mock_get (unittest.mock.Mock): A mock object for the requests.get function.
+        mock_get (unittest.mock.Mock): The get method of the mocked HTTP session.
 
     Returns:
         None
     """
     mock_get.return_value.status_code = 200
-    mock_get.return_value.json.return_value = {
-        "success": True,
-        "query": {"from": "USD", "to": "RUB", "amount": 25},
-        "info": {"timestamp": 1722061984, "rate": 85.972867},
-        "date": "2024-07-27",
-        "result": "2149.321675",
-    }
-    assert get_exchange_rate(25, "USD") == (True, "2149.32")
+    mock_get.return_value.json.return_value = rates_response()
+    assert get_exchange_rate(25, "USD") == (True, "2149.43")
+    assert "/latest?base=RUB" in mock_get.call_args.args[0]
 
 
-@patch("src.external_api.requests.get")
 def test_get_exchange_rate_denied_access(mock_get: mock.Mock) -> None:
     """
     Tests get_exchange_rate function with a denied access response.
@@ -42,7 +72,7 @@ def test_get_exchange_rate_denied_access(mock_get: mock.Mock) -> None:
     being the error message.
 
     Parameters:
-        mock_get (unittest.mock.Mock): A mock object for the requests.get function.
+        mock_get (unittest.mock.Mock): The get method of the mocked HTTP session.
 
     Returns: None
     """
@@ -53,7 +83,7 @@ def test_get_exchange_rate_denied_access(mock_get: mock.Mock) -> None:
     assert result == (False, "Unauthorized")
 
 
-def test_get_exchange_rate_request_error() -> None:
+def test_get_exchange_rate_request_error(mock_get: mock.Mock) -> None:
     """
     Tests get_exchange_rate function when the request to the external API fails.
 
@@ -61,9 +91,218 @@ def test_get_exchange_rate_request_error() -> None:
     It checks that the function returns a tuple with the first element being False and the second element
     being the error message.
 
-    Parameters: None
+    Parameters:
+        mock_get (unittest.mock.Mock): The get method of the mocked HTTP session.
+
     Returns: None
     """
-    with mock.patch("requests.get", side_effect=requests.exceptions.RequestException("Something went wrong")):
-        result = get_exchange_rate(25, "USD")
+    mock_get.side_effect = requests.exceptions.RequestException("Something went wrong")
+    result = get_exchange_rate(25, "USD")
     assert result == (False, "Something went wrong")
+
+
+def test_get_rates_table_failure_cached(mock_get: mock.Mock, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Tests that a failed request is not repeated for every conversion until EXCHANGE_RATES_FAILURE_TTL expires.
+
+    Parameters:
+        mock_get (unittest.mock.Mock): The get method of the mocked HTTP session.
+        monkeypatch (pytest.MonkeyPatch): Sets a zero EXCHANGE_RATES_FAILURE_TTL.
+
+    Returns: None
+    """
+    mock_get.return_value.status_code = 503
+    mock_get.return_value.reason = "Service Unavailable"
+
+    results = [get_exchange_rate(amount, currency) for amount in (1, 25) for currency in ("USD", "EUR")]
+
+    assert results == [(False, "Service Unavailable")] * 4
+    assert mock_get.call_count == 1
+
+    monkeypatch.setenv("EXCHANGE_RATES_FAILURE_TTL", "0")
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = rates_response()
+
+    assert get_exchange_rate(25, "USD") == (True, "2149.43")
+    assert mock_get.call_count == 2
+
+
+def test_get_exchange_rate_single_request_for_many_conversions(mock_get: mock.Mock) -> None:
+    """
+    Tests that converting many amounts in different currencies costs a single request to the external API.
+
+    Parameters:
+        mock_get (unittest.mock.Mock): The get method of the mocked HTTP session.
+
+    Returns: None
+    """
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = rates_response()
+
+    results = [get_exchange_rate(amount, currency) for amount in (1, 25, 100) for currency in ("USD", "EUR")]
+
+    assert all(status for status, _ in results)
+    assert get_exchange_rate(100, "EUR") == (True, "9333.58")
+    assert mock_get.call_count == 1
+
+
+def test_get_rates_table_expired_ttl(mock_get: mock.Mock, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Tests that the rate table is requested again once its time-to-live has expired.
+
+    Parameters:
+        mock_get (unittest.mock.Mock): The get method of the mocked HTTP session.
+        monkeypatch (pytest.MonkeyPatch): Sets a zero EXCHANGE_RATES_TTL.
+
+    Returns: None
+    """
+    monkeypatch.setenv("EXCHANGE_RATES_TTL", "0")
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = rates_response()
+
+    get_rates_table()
+    get_rates_table()
+
+    assert mock_get.call_count == 2
+
+
+def test_get_rates_table_snapshot(mock_get: mock.Mock, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    Tests that a fresh on-disk snapshot is written after a request and reused instead of the network.
+
+    Parameters:
+        mock_get (unittest.mock.Mock): The get method of the mocked HTTP session.
+        monkeypatch (pytest.MonkeyPatch): Points EXCHANGE_RATES_SNAPSHOT to a temporary file.
+        tmp_path (Path): A temporary directory for the snapshot file.
+
+    Returns: None
+    """
+    snapshot_path = tmp_path / "rates.json"
+    monkeypatch.setenv("EXCHANGE_RATES_SNAPSHOT", str(snapshot_path))
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = rates_response()
+
+    assert get_rates_table()[0]
+    assert json.loads(snapshot_path.read_text(encoding="utf-8"))["RUB"]["rates"]["USD"] == 0.011631
+
+    clear_rates_cache()
+    snapshot_path.write_text(
+        json.dumps({"RUB": {"timestamp": time.time(), "rates": {"USD": 0.01, "RUB": 1}}}), encoding="utf-8"
+    )
+
+    assert get_exchange_rate(25, "USD") == (True, "2500.0")
+    assert mock_get.call_count == 1
+
+
+def test_convert_amount_unknown_currency() -> None:
+    """
+    Tests convert_amount function when the rate table has no rate for the requested currency.
+
+    Parameters: None
+    Returns: None
+    """
+    assert external_api.convert_amount(25, "XXX", {"RUB": 1.0}) == (False, "Курс валюты XXX не найден.")
+
+
+class StubRatesHandler(BaseHTTPRequestHandler):
+    """
+    A stub of the exchange rates API: answers `/latest?base=...` with a fixed rate table.
+
+    The first `failures_left` requests of the server are answered with 503 Service Unavailable.
+    """
+
+    rates = {"RUB": {"USD": 0.01, "EUR": 0.008, "RUB": 1.0}, "USD": {"RUB": 100.0, "EUR": 0.8, "USD": 1.0}}
+
+    def do_GET(self) -> None:
+        server = self.server
+        with server.lock:  # type: ignore[attr-defined]
+            server.requests.append(self.path)  # type: ignore[attr-defined]
+            failure = server.failures_left > 0  # type: ignore[attr-defined]
+            if failure:
+                server.failures_left -= 1  # type: ignore[attr-defined]
+
+        if failure:
+            self.send_response(503, "Service Unavailable")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        base_currency = parse_qs(urlparse(self.path).query).get("base", ["RUB"])[0]
+        body = json.dumps({"success": True, "base": base_currency, "rates": self.rates.get(base_currency, {})})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def stub_api(monkeypatch: pytest.MonkeyPatch) -> Iterator[ThreadingHTTPServer]:
+    """Starts the stub exchange rates API on a free local port and points API_URL to it."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubRatesHandler)
+    server.lock = threading.Lock()  # type: ignore[attr-defined]
+    server.requests = []  # type: ignore[attr-defined]
+    server.failures_left = 0  # type: ignore[attr-defined]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("API_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_exchange_rates_many(stub_api: ThreadingHTTPServer) -> None:
+    """
+    Tests get_exchange_rates_many function against the stub API.
+
+    It checks that results are returned in the input order and that every distinct target currency
+    costs exactly one request.
+
+    Parameters:
+        stub_api (ThreadingHTTPServer): The running stub exchange rates API.
+
+    Returns: None
+    """
+    conversions = [(25, "USD", "RUB"), (10, "EUR", "RUB"), (5, "RUB", "USD"), (100, "USD", "RUB"), (8, "EUR", "USD")]
+
+    assert get_exchange_rates_many(conversions) == [
+        (True, "2500.0"),
+        (True, "1250.0"),
+        (True, "0.05"),
+        (True, "10000.0"),
+        (True, "10.0"),
+    ]
+    assert sorted(stub_api.requests) == ["/latest?base=RUB", "/latest?base=USD"]  # type: ignore[attr-defined]
+
+
+def test_get_exchange_rates_many_retry(stub_api: ThreadingHTTPServer) -> None:
+    """
+    Tests that a request answered with 503 is retried over the pooled session.
+
+    Parameters:
+        stub_api (ThreadingHTTPServer): The running stub exchange rates API.
+
+    Returns: None
+    """
+    stub_api.failures_left = 1  # type: ignore[attr-defined]
+
+    assert get_exchange_rates_many([(25, "USD", "RUB")]) == [(True, "2500.0")]
+    assert len(stub_api.requests) == 2  # type: ignore[attr-defined]
+
+
+def test_get_exchange_rates_many_unknown_base(stub_api: ThreadingHTTPServer) -> None:
+    """
+    Tests get_exchange_rates_many function when the stub API has no rates for the target currency.
+
+    Parameters:
+        stub_api (ThreadingHTTPServer): The running stub exchange rates API.
+
+    Returns: None
+    """
+    assert get_exchange_rates_many([(25, "USD", "GBP"), (25, "USD", "RUB")]) == [
+        (False, "Курс валюты USD не найден."),
+        (True, "2500.0"),
+    ]
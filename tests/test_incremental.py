@@ -0,0 +1,170 @@
+import json
+import os
+from typing import Any
+
+import pytest
+
+from src.incremental import read_appended
+from src.main import main
+from src.read_from_file import read_transactions_from_csv
+from src.utils import read_transactions_from_json, write_transactions_to_ndjson
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+OPERATIONS_PATH = os.path.join(DATA_PATH, "operations.json")
+CSV_PATH = os.path.join(DATA_PATH, "transactions.csv")
+
+
+def _report(argv: list[str], out_path: str) -> str:
+    """Runs the batch mode and returns the written report."""
+    assert main([*argv, "--out", out_path]) == 0
+    with open(out_path, encoding="utf-8") as report_file:
+        return report_file.read()
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        ["--state", "EXECUTED", "--sort", "desc"],
+        ["--state", "EXECUTED", "--sort", "asc", "--format", "text"],
+        ["--currency", "RUB", "--search", "перевод"],
+    ],
+)
+def test_incremental_ndjson(tmp_path: Any, options: list[str]) -> None:
+    """
+    Checks that the incremental report of a growing NDJSON file equals the full report after every append,
+    and that only the appended transactions are read.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+        options: The filters, the order and the format of the report.
+    """
+    transactions = read_transactions_from_json(OPERATIONS_PATH)
+    transactions = [transaction for transaction in transactions if "date" in transaction]
+    source = os.path.join(tmp_path, "operations.jsonl")
+    argv = ["--source", source, "--workers", "1", "--format", "jsonl", *options]
+    incremental = os.path.join(tmp_path, "incremental.out")
+
+    for start, end in ((0, 40), (40, 41), (41, 41), (41, len(transactions))):
+        write_transactions_to_ndjson(transactions[start:end], source, append=start > 0)
+        report = _report([*argv, "--incremental"], incremental)
+        assert report == _report(argv, os.path.join(tmp_path, "full.out"))
+
+    with open(incremental + ".checkpoint.json", encoding="utf-8") as checkpoint_file:
+        position = json.load(checkpoint_file)["position"]
+    assert position["offset"] == os.path.getsize(source)
+    assert position["rows"] == len(transactions)
+    assert (position["last_id"], position["last_date"]) == (transactions[-1]["id"], transactions[-1]["date"])
+
+
+def test_read_appended_csv(tmp_path: Any) -> None:
+    """
+    Checks that the rows appended to a CSV file are read from the saved offset, a line that is still being
+    written is left for the next read, and a rewritten file is read from the beginning.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    with open(CSV_PATH, "rb") as csv_file:
+        lines = csv_file.read().splitlines(keepends=True)
+    source = os.path.join(tmp_path, "transactions.csv")
+    with open(source, "wb") as csv_file:
+        csv_file.writelines(lines[:11])
+
+    first, full, position = read_appended(source, None)
+    assert full and len(first) == 10
+
+    with open(source, "ab") as csv_file:
+        csv_file.writelines(lines[11:20])
+        csv_file.write(lines[20][:10])
+    appended, full, position = read_appended(source, position)
+    assert not full and len(appended) == 9
+    assert position["rows"] == 19 and position["last_id"] == appended[-1]["id"]
+
+    with open(source, "ab") as csv_file:
+        csv_file.write(lines[20][10:])
+    appended, full, position = read_appended(source, position)
+    assert not full and len(appended) == 1
+
+    with open(source, "wb") as csv_file:
+        csv_file.writelines([lines[0], *lines[5:21]])
+    rewritten, full, _ = read_appended(source, position)
+    assert full and len(rewritten) == 16
+
+
+def test_incremental_csv_without_trailing_newline(tmp_path: Any) -> None:
+    """
+    Checks that the last row of the repo's CSV file, which has no trailing newline, is read: the incremental report
+    equals the full one before and after rows are appended, and a continued last row rebuilds the report.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    with open(CSV_PATH, "rb") as csv_file:
+        data = csv_file.read()
+    assert not data.endswith(b"\n")
+    lines = data.splitlines(keepends=True)
+    source = os.path.join(tmp_path, "transactions.csv")
+    argv = ["--source", source, "--state", "EXECUTED", "--sort", "desc", "--workers", "1", "--format", "jsonl"]
+    incremental = os.path.join(tmp_path, "incremental.out")
+
+    with open(source, "wb") as csv_file:
+        csv_file.write(data)
+    assert len(read_appended(source, None)[0]) == len(read_transactions_from_csv(CSV_PATH))
+
+    for appended, runs in ((b"", 1), (b"\n" + b"".join(lines[1:11]), 1), (lines[11][:20], 2), (lines[11][20:], 1)):
+        with open(source, "ab") as csv_file:
+            csv_file.write(appended)
+        # Строка, дописываемая в момент чтения, попадает в отчёт при следующем запуске.
+        for _ in range(runs):
+            report = _report([*argv, "--incremental"], incremental)
+        assert report == _report(argv, os.path.join(tmp_path, "full.out"))
+
+
+def test_incremental_json_array(tmp_path: Any) -> None:
+    """
+    Checks that for a JSON array, which is rewritten on every append, only the transactions after the previously
+    read rows are new, and that a change of the previously read rows rebuilds the report.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    transactions = read_transactions_from_json(OPERATIONS_PATH)
+    source = os.path.join(tmp_path, "operations.json")
+    argv = ["--source", source, "--state", "EXECUTED", "--workers", "1", "--format", "jsonl"]
+    incremental = os.path.join(tmp_path, "incremental.out")
+
+    for transactions_in_file in (transactions[:30], transactions[:60], transactions[1:60]):
+        with open(source, "w", encoding="utf-8") as json_file:
+            json.dump(transactions_in_file, json_file, ensure_ascii=False)
+        assert _report([*argv, "--incremental"], incremental) == _report(argv, os.path.join(tmp_path, "full.out"))
+
+    _, full, _ = read_appended(source, None)
+    assert full
+
+
+def test_incremental_rebuilds_report(tmp_path: Any, capsys: Any) -> None:
+    """
+    Checks that the report is built from scratch when the criteria change or the report was modified,
+    and that --incremental needs a report file.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+        capsys: The pytest fixture capturing the standard output.
+    """
+    source = os.path.join(tmp_path, "operations.jsonl")
+    write_transactions_to_ndjson(read_transactions_from_json(OPERATIONS_PATH), source)
+    incremental = os.path.join(tmp_path, "incremental.out")
+    argv = ["--source", source, "--incremental", "--format", "jsonl"]
+
+    executed = _report([*argv, "--state", "EXECUTED"], incremental)
+    canceled = _report([*argv, "--state", "CANCELED"], incremental)
+    assert canceled != executed
+    assert canceled == _report(["--source", source, "--state", "CANCELED", "--format", "jsonl"], f"{incremental}.2")
+
+    with open(incremental, "a", encoding="utf-8") as report_file:
+        report_file.write("{}\n")
+    assert _report([*argv, "--state", "CANCELED"], incremental) == canceled
+
+    with pytest.raises(SystemExit):
+        main(argv)
+    assert "--incremental" in capsys.readouterr().err
@@ -0,0 +1,103 @@
+import logging
+import os
+import subprocess
+import sys
+from typing import Any
+
+import pytest
+
+from src import logging_config
+from src.logging_config import configure_logging, flush_logs, get_logger
+
+ROOT_PATH = os.path.dirname(os.path.dirname(__file__))
+
+
+def test_import_has_no_side_effects() -> None:
+    """
+    Checks that importing the modules that log opens no log files and starts no threads.
+    """
+    code = (
+        "import threading\n"
+        "import src.masks, src.utils\n"
+        "from src import logging_config\n"
+        "assert logging_config._listener is None\n"
+        "assert not logging_config._router._targets\n"
+        "assert threading.active_count() == 1\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT_PATH, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+
+
+def test_get_logger_writes_to_file(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Checks that records are written by the background thread into the file of their logger.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+        monkeypatch (pytest.MonkeyPatch): The pytest fixture used to redirect the logs folder.
+    """
+    monkeypatch.setattr(logging_config, "LOGS_PATH", str(tmp_path))
+    first = get_logger("test_logging_config.first", "first.log")
+    second = get_logger("test_logging_config.second")
+
+    first.info("Запись %d.", 1)
+    second.warning("Запись %s.", "два")
+    first.debug("Не записывается.")
+    flush_logs()
+
+    with open(os.path.join(tmp_path, "first.log"), encoding="utf-8") as log_file:
+        assert log_file.read().endswith("test_logging_config.py INFO: Запись 1.\n")
+    with open(os.path.join(tmp_path, "test_logging_config.second.log"), encoding="utf-8") as log_file:
+        assert log_file.read().endswith("test_logging_config.py WARNING: Запись два.\n")
+
+
+def test_buffered_file_handler(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Checks that records reach the file in batches: when the buffer is full or on an error record.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+        monkeypatch (pytest.MonkeyPatch): The pytest fixture used to shrink the buffer.
+    """
+    monkeypatch.setattr(logging_config, "LOG_BUFFER_CAPACITY", 3)
+    file_path = os.path.join(tmp_path, "buffered.log")
+    handler = logging_config._BufferedFileHandler(file_path)
+
+    def record(level: int) -> logging.LogRecord:
+        return logging.LogRecord("test", level, __file__, 1, "Запись", None, None)
+
+    handler.handle(record(logging.INFO))
+    handler.handle(record(logging.INFO))
+    assert not os.path.exists(file_path)
+
+    handler.handle(record(logging.INFO))
+    handler.handle(record(logging.ERROR))
+    with open(file_path, encoding="utf-8") as log_file:
+        assert len(log_file.readlines()) == 4
+
+    handler.handle(record(logging.INFO))
+    handler.close()
+    with open(file_path, encoding="utf-8") as log_file:
+        assert len(log_file.readlines()) == 5
+
+
+def test_log_levels(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Checks the per-module levels: from LOG_LEVELS, INFO by default, and set by configure_logging.
+
+    Parameters:
+        monkeypatch (pytest.MonkeyPatch): The pytest fixture used to set LOG_LEVELS.
+    """
+    monkeypatch.setenv("LOG_LEVELS", "test_logging_config.debug=debug, test_logging_config.error=ERROR")
+
+    assert get_logger("test_logging_config.debug").level == logging.DEBUG
+    assert get_logger("test_logging_config.error").level == logging.ERROR
+    assert get_logger("test_logging_config.default").level == logging.INFO
+
+    configure_logging({"test_logging_config.debug": "warning", "test_logging_config.error": logging.INFO})
+    assert logging.getLogger("test_logging_config.debug").level == logging.WARNING
+    assert logging.getLogger("test_logging_config.error").level == logging.INFO
+
+    configure_logging()
+    assert logging.getLogger("test_logging_config.debug").level == logging.DEBUG
@@ -0,0 +1,146 @@
+import json
+import os
+import re
+from typing import Any
+
+from src.main import jsonl_line, main, text_line
+from src.query import TransactionQuery
+from src.read_from_file import read_transactions_from_csv
+from src.utils import read_transactions_from_json
+from src.widget import mask_account_card
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+OPERATIONS_PATH = os.path.join(DATA_PATH, "operations.json")
+CSV_PATH = os.path.join(DATA_PATH, "transactions.csv")
+
+
+def _without_requisites(transaction: dict[str, Any]) -> dict[str, Any]:
+    """The transaction without the masked fields 'from' and 'to'."""
+    return {key: value for key, value in transaction.items() if key not in ("from", "to")}
+
+
+def test_batch_jsonl_report(tmp_path: Any) -> None:
+    """
+    Checks that the batch mode writes, one JSON object per line, exactly the transactions selected
+    by the same TransactionQuery as the interactive mode.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    out_path = os.path.join(tmp_path, "report.jsonl")
+    argv = ["--source", CSV_PATH, "--state", "executed", "--currency", "rub", "--search", "перевод"]
+
+    assert main([*argv, "--sort", "desc", "--out", out_path]) == 0
+
+    expected = (TransactionQuery().state("EXECUTED").currency("RUB").text("перевод").order_by_date(desc=True)).run(
+        read_transactions_from_csv(CSV_PATH)
+    )
+    with open(out_path, encoding="utf-8") as report_file:
+        text = report_file.read()
+    report = [json.loads(line) for line in text.splitlines()]
+    assert expected
+    assert [_without_requisites(transaction) for transaction in report] == json.loads(
+        json.dumps([_without_requisites(transaction) for transaction in expected])
+    )
+
+    # Номера карт (16 цифр) и счетов (20 цифр) в отчёт не попадают, реквизиты маскируются как в mask_account_card.
+    assert not re.search(r"\d{16}|\d{20}", text)
+    for transaction, source in zip(report, expected):
+        assert transaction["to"] == mask_account_card(source["to"])
+        assert ("from" in transaction) == ("from" in source)
+        if "from" in source:
+            assert transaction["from"] == mask_account_card(source["from"])
+
+
+def test_jsonl_line_masks_requisites() -> None:
+    """Checks that the jsonl line masks valid requisites and hides all digits of the ones mask_account_card rejects."""
+    line = jsonl_line(
+        {"id": 1, "from": "Visa Classic 6831982476737658", "to": "Счет 12345678901234abc567890", "description": "x"}
+    )
+
+    assert json.loads(line) == {
+        "id": 1,
+        "from": "Visa Classic 6831 98** **** 7658",
+        "to": "Счет **************abc******",
+        "description": "x",
+    }
+
+
+def test_text_line_masks_requisites() -> None:
+    """Checks that the text line hides all digits of the requisites mask_account_card rejects instead of failing."""
+    line = text_line(
+        {
+            "date": "2019-08-26T10:50:58.294041",
+            "description": "x",
+            "operationAmount": {"amount": "1.00", "currency": {"name": "руб."}},
+            "from": "Visa Classic 6831982476737658",
+            "to": "Счет 12345678901234abc567890",
+        }
+    )
+
+    assert line.splitlines()[1] == "Visa Classic 6831 98** **** 7658 -> Счет **************abc******"
+
+
+def test_batch_text_report(tmp_path: Any, capsys: Any) -> None:
+    """
+    Checks that the text report (here written to the standard output) renders the transactions
+    like the interactive mode, with masked cards and accounts.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+        capsys: The pytest fixture capturing the standard output.
+    """
+    assert main(["--source", OPERATIONS_PATH, "--state", "CANCELED", "--format", "text"]) == 0
+
+    expected = TransactionQuery().state("CANCELED").run(read_transactions_from_json(OPERATIONS_PATH))
+    blocks = capsys.readouterr().out.split("\n\n")
+    assert len(blocks) == len(expected) + 1
+    assert "Сумма:" in blocks[0]
+    assert "**" in blocks[0]
+
+
+def test_batch_limit(tmp_path: Any) -> None:
+    """
+    Checks that --limit writes only the newest transactions of the full report.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    argv = ["--source", OPERATIONS_PATH, "--state", "EXECUTED", "--sort", "desc", "--format", "jsonl"]
+    reports = []
+    for options in ([], ["--limit", "5"]):
+        out_path = os.path.join(tmp_path, f"report{len(options)}.jsonl")
+        assert main([*argv, *options, "--out", out_path]) == 0
+        with open(out_path, encoding="utf-8") as report_file:
+            reports.append(report_file.readlines())
+
+    assert len(reports[1]) == 5
+    assert reports[1] == reports[0][:5]
+
+
+def test_batch_missing_source(tmp_path: Any, capsys: Any) -> None:
+    """
+    Checks that a missing source file is reported on the standard error with exit code 1.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+        capsys: The pytest fixture capturing the standard output.
+    """
+    assert main(["--source", os.path.join(tmp_path, "missing.csv")]) == 1
+    assert "не найден" in capsys.readouterr().err
+
+
+def test_batch_unsupported_source(tmp_path: Any, capsys: Any) -> None:
+    """
+    Checks that a file of an unknown format is reported on the standard error with exit code 1.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+        capsys: The pytest fixture capturing the standard output.
+    """
+    file_path = os.path.join(tmp_path, "transactions.txt")
+    with open(file_path, "w", encoding="utf-8") as text_file:
+        text_file.write("не транзакции")
+
+    assert main(["--source", file_path]) == 1
+    assert "Не удалось определить формат" in capsys.readouterr().err
@@ -1,6 +1,8 @@
+from unittest.mock import MagicMock, patch
+
 import pytest
 
-from src.masks import get_mask_account, get_mask_card_number
+from src.masks import MaskingEngine, get_mask_account, get_mask_card_number
 
 
 # ---- get_mask_card_number ------
@@ -143,3 +145,86 @@ def test_get_mask_account(account_number: str, expected_mask: str) -> None:
           It asserts whether the `get_mask_account` function returns the expected masked account number.
     """
     assert get_mask_account(account_number) == expected_mask
+
+
+# ----- MaskingEngine ------
+@pytest.mark.parametrize(
+    "visible_digits, card_mask, account_mask",
+    [
+        (4, "7000 79** **** 6361", "**4305"),
+        (2, "70 00 79 ** ** ** 61", "**05"),
+    ],
+)
+def test_masking_engine(visible_digits: int, card_mask: str, account_mask: str) -> None:
+    """
+    Checks that the engine masks cards and accounts with the given number of visible digits.
+
+    Parameters:
+    visible_digits (int): The number of visible last digits.
+    card_mask (str): The expected mask of the card number 7000792289606361.
+    account_mask (str): The expected mask of the account number 73654108430135874305.
+    """
+    engine = MaskingEngine(visible_digits)
+
+    assert engine.mask_card("7000792289606361") == card_mask
+    assert engine.mask_account("73654108430135874305") == account_mask
+
+
+@patch("dotenv.load_dotenv")
+def test_masking_engine_reload(mock_load_dotenv: MagicMock, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Checks that BANK_CARD_LAST_VISIBLE_DIGITS is read once, on first use, and again only by reload().
+
+    Parameters:
+    mock_load_dotenv (MagicMock): A mock object for the load_dotenv function.
+    monkeypatch (pytest.MonkeyPatch): The pytest fixture for environment variables.
+    """
+    monkeypatch.setenv("BANK_CARD_LAST_VISIBLE_DIGITS", "4")
+    engine = MaskingEngine()
+    assert mock_load_dotenv.call_count == 0
+    assert engine.visible_digits == 4
+
+    monkeypatch.setenv("BANK_CARD_LAST_VISIBLE_DIGITS", "2")
+    engine.mask_many(["7000792289606361"] * 3)
+    assert engine.mask_account("73654108430135874305") == "**4305"
+    assert mock_load_dotenv.call_count == 1
+
+    engine.reload()
+    assert engine.visible_digits == 2
+    assert engine.mask_account("73654108430135874305") == "**05"
+    assert mock_load_dotenv.call_count == 2
+
+
+def test_masking_engine_mask_many() -> None:
+    """
+    Checks that mask_many gives the same masks as the per-number functions.
+    """
+    engine = MaskingEngine(4)
+    cards = ["1234567890123456", "", "7000792289606361"]
+    accounts = ["43210810000000012345", "", "73654108430135874305"]
+
+    assert engine.mask_many(cards) == [get_mask_card_number(card) for card in cards]
+    assert engine.mask_many(accounts, account=True) == [get_mask_account(account) for account in accounts]
+
+
+@pytest.mark.parametrize(
+    "numbers, account, message",
+    [
+        (["7000792289606361", "1234abcd56789012"], False, "Номер карты должен состоять только из цифр."),
+        (["700079228960636"], False, "Номер карты должен состоять из 16 цифр."),
+        (["73654108430135874305", "7365410843013587430a"], True, "Номер счета должен состоять только из цифр."),
+        (["7365410843013587430"], True, "Номер счета должен состоять из 20 цифр."),
+    ],
+)
+def test_masking_engine_mask_many_errors(numbers: list[str], account: bool, message: str) -> None:
+    """
+    Checks that mask_many raises the same ValueError as the per-number functions for an invalid number.
+
+    Parameters:
+    numbers (list[str]): The numbers to mask, the last one is invalid.
+    account (bool): True - account numbers, False - card numbers.
+    message (str): The expected error message.
+    """
+    with pytest.raises(ValueError) as exc_info:
+        MaskingEngine(4).mask_many(numbers, account=account)
+    assert str(exc_info.value) == message
@@ -0,0 +1,95 @@
+import json
+import os
+from typing import Any
+
+import pytest
+
+from src.main import main
+from src.parallel import iter_pipeline, run_pipeline, table_shards
+from src.query import TransactionQuery
+from src.table import TransactionTable
+from src.utils import read_transactions_from_json
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+OPERATIONS_PATH = os.path.join(DATA_PATH, "operations.json")
+CSV_PATH = os.path.join(DATA_PATH, "transactions.csv")
+
+
+def _json_line(transaction: dict[str, Any]) -> str:
+    """Renders a transaction as a JSON line (a module-level function, so it can be sent to the workers)."""
+    return json.dumps(transaction, ensure_ascii=False)
+
+
+@pytest.mark.parametrize("rows, count", [(0, 4), (1, 4), (10, 3), (10, 10), (10, 40), (1000, 7)])
+def test_table_shards(rows: int, count: int) -> None:
+    """
+    Checks that the shards are adjacent, non-empty, of almost equal size and cover all rows.
+
+    Parameters:
+        rows: The number of rows.
+        count: The wanted number of shards.
+    """
+    shards = table_shards(rows, count)
+
+    assert [row for start, end in shards for row in range(start, end)] == list(range(rows))
+    assert len(shards) <= max(count, 1)
+    if shards:
+        sizes = [end - start for start, end in shards]
+        assert min(sizes) >= 1 and max(sizes) - min(sizes) <= 1
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        TransactionQuery(),
+        TransactionQuery().state("EXECUTED").order_by_date(desc=True),
+        TransactionQuery().state("EXECUTED").currency("RUB").text("перевод").order_by_date(desc=False),
+        TransactionQuery().state("CANCELED").currency("USD"),
+    ],
+)
+def test_run_pipeline(query: TransactionQuery) -> None:
+    """
+    Checks that the rows filtered and rendered by several processes are the ones of the sequential run,
+    in the same order, for queries with and without ordering by date.
+
+    Parameters:
+        query: The query.
+    """
+    table = TransactionTable.from_records(read_transactions_from_json(OPERATIONS_PATH) * 5)
+    expected = [_json_line(transaction) for transaction in query.run(table).to_records()]
+
+    assert run_pipeline(table, query, _json_line, workers=1) == expected
+    assert run_pipeline(table, query, _json_line, workers=3) == expected
+    assert list(iter_pipeline(table, query, _json_line, workers=2)) == expected
+
+
+def test_run_pipeline_missing_date() -> None:
+    """
+    Checks that ordering a result with a transaction without 'date' raises KeyError in both modes.
+    """
+    table = TransactionTable.from_records(read_transactions_from_json(OPERATIONS_PATH))
+    query = TransactionQuery().order_by_date()
+
+    with pytest.raises(KeyError) as sequential_error:
+        run_pipeline(table, query, _json_line, workers=1)
+    with pytest.raises(KeyError) as parallel_error:
+        run_pipeline(table, query, _json_line, workers=2)
+    assert str(parallel_error.value) == str(sequential_error.value)
+
+
+def test_batch_workers(tmp_path: Any) -> None:
+    """
+    Checks that the batch mode writes the same report with one and with several worker processes.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    argv = ["--source", CSV_PATH, "--state", "EXECUTED", "--sort", "asc", "--format", "text"]
+    reports = []
+    for workers in ("1", "3"):
+        out_path = os.path.join(tmp_path, f"report{workers}.txt")
+        assert main([*argv, "--out", out_path, "--workers", workers]) == 0
+        with open(out_path, encoding="utf-8") as report_file:
+            reports.append(report_file.read())
+
+    assert reports[0] and reports[0] == reports[1]
@@ -0,0 +1,103 @@
+import os
+import shutil
+from typing import Any
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import write_operations_json, write_transactions_csv
+from src.parse_cache import cached_reader, load_cached_table
+from src.read_from_file import read_transactions_from_csv
+from src.utils import read_transactions_from_json
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+@pytest.mark.parametrize(
+    "read, file_name",
+    [(read_transactions_from_json, "operations.json"), (read_transactions_from_csv, "transactions.csv")],
+)
+def test_cached_read_is_identical(read: Any, file_name: str, tmp_path: Any) -> None:
+    """
+    Checks that the second read of an unchanged file comes from the memory-mapped cache
+    and gives exactly the transactions of the first (parsed) read.
+
+    Parameters:
+        read: The reader under test.
+        file_name: The file in the data folder.
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    file_path = shutil.copy(os.path.join(DATA_PATH, file_name), tmp_path)
+    parsed = read(file_path)
+
+    table = load_cached_table(file_path, read.__name__)
+    assert table is not None
+    assert isinstance(table.columns["date"], np.memmap)
+
+    cached = read(file_path)
+    assert cached == parsed
+    assert [list(operation) for operation in cached] == [list(operation) for operation in parsed]
+
+
+def test_cache_invalidated_by_changes(tmp_path: Any) -> None:
+    """
+    Checks that a cache entry is used after a `touch` of an unchanged file, and is not used
+    once the contents of the file change.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    file_path = write_transactions_csv(os.path.join(tmp_path, "transactions.csv"), 200, seed=1)
+    first = read_transactions_from_csv(file_path)
+
+    os.utime(file_path, ns=(0, 10**18))
+    assert load_cached_table(file_path, "read_transactions_from_csv") is not None
+
+    write_transactions_csv(file_path, 200, seed=2)
+    os.utime(file_path, ns=(0, 10**18))
+    assert load_cached_table(file_path, "read_transactions_from_csv") is None
+    second = read_transactions_from_csv(file_path)
+    assert second != first
+    assert read_transactions_from_csv(file_path) == second
+
+
+def test_irregular_rows_in_sidecar(tmp_path: Any) -> None:
+    """
+    Checks that rows not fitting the columns (empty records, unknown keys, null values)
+    are restored from the JSON sidecar at their positions.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    file_path = write_operations_json(os.path.join(tmp_path, "operations.json"), 50, seed=4)
+    records = read_transactions_from_json(file_path)
+    records[3] = {"id": 1, "comment": "нет", "description": None}
+
+    @cached_reader
+    def read_irregular(path: str) -> list[dict[str, Any]]:
+        return [dict(record) for record in records]
+
+    assert read_irregular(file_path) == records
+    table = load_cached_table(file_path, "read_irregular")
+    assert table is not None and 3 in table.extras
+    assert read_irregular(file_path) == records
+
+
+def test_cache_disabled(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Checks that an empty TRANSACTIONS_CACHE_DIR disables the cache, and that calls with extra arguments
+    bypass it.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+        monkeypatch: The pytest fixture for changing the environment.
+    """
+    file_path = shutil.copy(os.path.join(DATA_PATH, "transactions.csv"), tmp_path)
+    read_transactions_from_csv(file_path, dtype=None)
+    assert load_cached_table(file_path, "read_transactions_from_csv") is None
+
+    monkeypatch.setenv("TRANSACTIONS_CACHE_DIR", "")
+    with patch("src.parse_cache.store_table") as mock_store_table:
+        read_transactions_from_csv(file_path)
+    mock_store_table.assert_not_called()
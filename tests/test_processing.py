@@ -1,6 +1,11 @@
+from collections import Counter
+
 import pytest
 
-from src.processing import analyze_categories, search_by_str, sort_by_date
+from src import processing
+from src.aggregate import aggregate
+from src.processing import DescriptionIndex, analyze_categories, page_by_date, search_by_str, sort_by_date, top_by_date
+from src.table import TransactionTable
 
 
 @pytest.fixture(scope="module")
@@ -40,6 +45,91 @@ def test_sort_by_date_no_key_date(test_sort_by_date_fixt_no_key_date: list[dict]
     assert exc_info.value.args[0][:36] == "Ключ 'date' отсутствует в транзакции"
 
 
+@pytest.mark.parametrize("is_sort_order", [True, False])
+def test_sort_by_date_mixed_formats(is_sort_order: bool) -> None:
+    """
+    Checks that sort_by_date orders transactions by real timestamps (not lexically) for both date formats,
+    treating unparsable dates as the earliest ones.
+    """
+    data = [
+        {"id": 1, "date": "2023-09-05T11:30:32.000001"},
+        {"id": 2, "date": "2023-09-05T11:30:32Z"},
+        {"id": 3, "date": "bad date"},
+        {"id": 4, "date": "2023-09-05T11:30:33Z"},
+        {"id": 5, "date": "2018-09-12T21:27:25.241689"},
+    ]
+    expected_ids = [4, 1, 2, 5, 3]
+
+    result_ids = [item["id"] for item in sort_by_date(data, is_sort_order)]
+    assert result_ids == (expected_ids if is_sort_order else expected_ids[::-1])
+
+
+def _dated_transactions() -> list[dict]:
+    """Transactions with repeated dates, both date formats and unparsable dates."""
+    dates = [
+        "2023-09-05T11:30:32.000001",
+        "2023-09-05T11:30:32Z",
+        "bad date",
+        "2019-07-03T18:35:29.512364",
+        "2018-09-12T21:27:25.241689",
+    ]
+    return [{"id": index, "date": dates[index * 7 % len(dates)]} for index in range(23)]
+
+
+@pytest.mark.parametrize("desc", [True, False])
+@pytest.mark.parametrize("k", [0, 1, 2, 5, 9, 23, 30])
+def test_top_by_date(desc: bool, k: int) -> None:
+    """
+    Checks that top_by_date returns the first k transactions of sort_by_date, including the order of equal dates,
+    for a list, a generator and a TransactionTable.
+    """
+    data = _dated_transactions()
+    expected = sort_by_date(data, desc)[:k]
+
+    assert top_by_date(data, k, desc) == expected
+    assert top_by_date(iter(data), k, desc) == expected
+    assert top_by_date(TransactionTable.from_records(data), k, desc).to_records() == expected
+
+
+@pytest.mark.parametrize("desc", [True, False])
+@pytest.mark.parametrize("page_size", [1, 3, 5, 23, 40])
+def test_page_by_date(desc: bool, page_size: int) -> None:
+    """
+    Checks that the pages following each other by cursor make up the result of sort_by_date,
+    and that the last page has no cursor.
+    """
+    data = _dated_transactions()
+    table = TransactionTable.from_records(data)
+    expected = sort_by_date(data, desc)
+
+    pages = list(processing.iter_pages_by_date(data, page_size, desc))
+    assert [item for page in pages for item in page] == expected
+    assert all(len(page) == page_size for page in pages[:-1])
+
+    table_pages = list(processing.iter_pages_by_date(table, page_size, desc))
+    assert [item for page in table_pages for item in page.to_records()] == expected
+
+    page = page_by_date(data, page_size, desc=desc)
+    table_page = page_by_date(table, page_size, desc=desc)
+    assert page.cursor == table_page.cursor
+    assert (page.cursor is None) == (page_size >= len(data))
+    if page.cursor is not None:
+        assert page_by_date(data, page_size, page.cursor, desc).items == expected[page_size : 2 * page_size]
+
+
+def test_page_by_date_errors(test_sort_by_date_fixt_no_key_date: list[dict]) -> None:
+    """
+    Checks that paging raises KeyError for a transaction without 'date' and ValueError for an empty page.
+    """
+    with pytest.raises(KeyError):
+        top_by_date(test_sort_by_date_fixt_no_key_date, 1)
+    with pytest.raises(KeyError):
+        page_by_date(TransactionTable.from_records(test_sort_by_date_fixt_no_key_date), 1)
+    with pytest.raises(ValueError):
+        page_by_date(_dated_transactions(), 0)
+    assert list(processing.iter_pages_by_date([], 10)) == []
+
+
 @pytest.mark.parametrize(
     "search_str, transaction_index, number_of_transactions",
     [
@@ -120,6 +210,60 @@ def test_search_by_str_no_description() -> None:
     assert search_by_str(data, "Перевод организации") == []
 
 
+@pytest.mark.parametrize(
+    "search_str",
+    [
+        "Перевод",
+        "Переводить",
+        "Перевести",
+        "перев",
+        "карта",
+        "открыть",
+        "открывать",
+        "Орг",
+        "со счета",
+        "ОТКРЫТИЕ",
+        "в",
+        "вкл",
+    ],
+)
+def test_description_index(transactions: list[dict], search_str: str) -> None:
+    """
+    Test that DescriptionIndex finds exactly the transactions found by search_by_str,
+    both for a list of dictionaries and for a TransactionTable.
+
+    Parameters:
+    transactions (list): A list of dictionaries representing transactions.
+    search_str (str): A string to search for in the transaction descriptions.
+
+    Returns:
+    None. The function asserts the correctness of the DescriptionIndex class.
+    """
+    expected = search_by_str(transactions, search_str)
+
+    assert DescriptionIndex(transactions).search(search_str) == expected
+    table_index = DescriptionIndex(TransactionTable.from_records(transactions))
+    assert table_index.search(search_str).to_records() == expected  # type: ignore[union-attr]
+
+
+def test_description_index_reuse(transactions: list[dict]) -> None:
+    """
+    Test that DescriptionIndex deduplicates descriptions and memoises query results.
+
+    Parameters:
+    transactions (list): A list of dictionaries representing transactions.
+
+    Returns:
+    None. The function asserts the correctness of the DescriptionIndex class.
+    """
+    index = DescriptionIndex(transactions)
+
+    assert len(index) == 5
+    assert index.rows("Перевод") == [0, 1, 2, 3, 4]
+    assert index.rows("Переводить") is index.rows("Переводи")
+    assert index.search("Недопустимое слово в описании транзакции") == []
+
+
 def test_analyze_categories(transactions: list[dict]) -> None:
     """Tests normal work of analyze_categories function."""
     categories_list = [
@@ -157,3 +301,83 @@ def test_analyze_categories_no_descriptions() -> None:
         "Перевод организации": 0,
         "Перевод с карты на карту": 0,
     }
+
+
+# Правила с пересекающимися ключевыми словами: 'карт' входит в 'с карты на карту', 'счет' - в 'со счета на счет'.
+CATEGORY_RULES: dict[str, list[str]] = {
+    "Вклады": ["Открыть", "вклад"],
+    "Карта на карту": ["с карты на карту"],
+    "Карты": ["карта"],
+    "Счета": ["счет", "со счета на счет"],
+    "Организации": ["организации", "Орг"],
+}
+
+
+def test_category_classifier(transactions: list[dict]) -> None:
+    """
+    Test that every transaction gets the first category one of whose keywords search_by_str finds,
+    both for a list of dictionaries and for a TransactionTable.
+
+    Parameters:
+    transactions (list): A list of dictionaries representing transactions.
+
+    Returns:
+    None. The function asserts the correctness of the CategoryClassifier class.
+    """
+    matching = {
+        category: [id(transaction) for keyword in keywords for transaction in search_by_str(transactions, keyword)]
+        for category, keywords in CATEGORY_RULES.items()
+    }
+    expected = [
+        next((category for category, found in matching.items() if id(transaction) in found), None)
+        for transaction in transactions
+    ]
+    classifier = processing.CategoryClassifier(CATEGORY_RULES)
+
+    result = classifier.apply(transactions)
+
+    assert result.labels == expected
+    assert result.counts == {category: expected.count(category) for category in CATEGORY_RULES}
+    assert classifier.apply(TransactionTable.from_records(transactions)) == result
+    assert classifier.apply(iter(transactions)) == result
+    by_category = aggregate(transactions, by=classifier.label)
+    assert {category: by_category[category].count for category in by_category} == Counter(expected)
+
+
+@pytest.mark.parametrize(
+    "description, category",
+    [
+        ("Перевод с карты на карту", "Карта на карту"),
+        ("ПЕРЕВОД С КАРТЫ НА СЧЕТ", "Карты"),
+        ("Перевод со счета на счет", "Счета"),
+        ("Открытие вклада", "Вклады"),
+        ("Перевод организации", "Организации"),
+        ("Оплата услуг", None),
+        ("", None),
+    ],
+)
+def test_category_classifier_classify(description: str, category: str | None) -> None:
+    """
+    Test the category of single descriptions: the first matching rule wins.
+
+    Parameters:
+    description (str): The description of a transaction.
+    category (str | None): The expected category.
+    """
+    assert processing.CategoryClassifier(CATEGORY_RULES).classify(description) == category
+
+
+def test_category_classifier_categories_list() -> None:
+    """
+    Test a classifier built from a list of categories (the keyword is the category itself),
+    an empty keyword that matches every description and a transaction without a description.
+    """
+    classifier = processing.CategoryClassifier(["Перевод организации", "Открытие вклада", "в"])
+    result = classifier.apply(
+        [{"description": "Перевод организации"}, {"description": "Открытие вклада"}, {"description": "Оплата"}, {}]
+    )
+
+    assert len(classifier) == 3
+    assert result.labels == ["Перевод организации", "Открытие вклада", "в", "в"]
+    assert result.counts == {"Перевод организации": 1, "Открытие вклада": 1, "в": 2}
+    assert processing.CategoryClassifier({"Переводы": "Перевод"}).apply([]).counts == {"Переводы": 0}
@@ -0,0 +1,114 @@
+import os
+from typing import Any
+
+import pytest
+
+from src.generators import filter_by_currency
+from src.processing import filter_by_state, search_by_str, sort_by_date
+from src.query import TransactionQuery
+from src.table import TransactionTable
+from src.utils import iter_transactions_from_json, read_transactions_from_json
+
+OPERATIONS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "operations.json")
+
+
+def chained_filters(
+    transactions: list[dict[str, Any]],
+    state: str,
+    is_sort_order: bool | None,
+    currency: str | None,
+    search: str | None,
+) -> list[dict[str, Any]]:
+    """Applies the filter chain of main() step by step, as it was done before TransactionQuery."""
+    result = filter_by_state(transactions, state)
+    if is_sort_order is not None:
+        result = sort_by_date(result, is_sort_order)
+    if currency is not None:
+        result = list(filter_by_currency(result, currency))
+    if search is not None:
+        result = search_by_str(result, search)
+    return result
+
+
+@pytest.mark.parametrize(
+    "state, is_sort_order, currency, search",
+    [
+        ("EXECUTED", None, None, None),
+        ("EXECUTED", True, "RUB", "перевод"),
+        ("EXECUTED", False, "USD", None),
+        ("CANCELED", True, None, "открыть"),
+        ("PENDING", True, "RUB", None),
+        ("EXECUTED", None, "RUB", "со счета"),
+    ],
+)
+def test_transaction_query(state: str, is_sort_order: bool | None, currency: str | None, search: str | None) -> None:
+    """
+    Checks that TransactionQuery returns the same transactions as the chain of filter functions,
+    for a list, for a streaming reader and for a TransactionTable.
+
+    Parameters:
+        state (str): The state to filter by.
+        is_sort_order (bool | None): The date order (None - no ordering).
+        currency (str | None): The currency code to filter by (None - any currency).
+        search (str | None): The string to search for in descriptions (None - no search).
+    """
+    transactions = read_transactions_from_json(OPERATIONS_PATH)
+    expected = chained_filters(transactions, state, is_sort_order, currency, search)
+
+    query = TransactionQuery().state(state)
+    if is_sort_order is not None:
+        query.order_by_date(desc=is_sort_order)
+    if currency is not None:
+        query.currency(currency)
+    if search is not None:
+        query.text(search)
+
+    assert query.run(transactions) == expected
+    assert query(iter_transactions_from_json(OPERATIONS_PATH)) == expected
+    assert query.run(TransactionTable.from_records(transactions)).to_records() == expected
+
+
+def test_transaction_query_without_predicates(transactions: list[dict[str, Any]]) -> None:
+    """
+    Checks that an empty query returns all transactions in the source order.
+
+    Parameters:
+        transactions (list[dict[str, Any]]): A list of dictionaries representing transactions.
+    """
+    assert TransactionQuery().run(iter(transactions)) == transactions
+
+
+def test_transaction_query_no_key_date() -> None:
+    """
+    Checks that ordering by date raises KeyError only if a matching transaction has no date.
+    """
+    data = [{"id": 1, "state": "EXECUTED", "date": "2019-07-03T18:35:29.512364"}, {"id": 2, "state": "CANCELED"}]
+
+    assert TransactionQuery().state("EXECUTED").order_by_date().run(data) == data[:1]
+    with pytest.raises(KeyError):
+        TransactionQuery().state("CANCELED").order_by_date().run(data)
+
+
+@pytest.mark.parametrize("is_sort_order", [None, True, False])
+@pytest.mark.parametrize("limit", [0, 3, 1000])
+def test_transaction_query_limit(is_sort_order: bool | None, limit: int) -> None:
+    """
+    Checks that a limited query returns the first transactions of the unlimited one, for a list,
+    a streaming reader and a TransactionTable.
+
+    Parameters:
+        is_sort_order (bool | None): The date order (None - no ordering).
+        limit (int): The number of transactions.
+    """
+    transactions = read_transactions_from_json(OPERATIONS_PATH)
+    query = TransactionQuery().state("EXECUTED")
+    if is_sort_order is not None:
+        query.order_by_date(desc=is_sort_order)
+    expected = query.run(transactions)[:limit]
+
+    query.limit(limit)
+    assert query.run(transactions) == expected
+    assert query(iter_transactions_from_json(OPERATIONS_PATH)) == expected
+    assert query.run(TransactionTable.from_records(transactions)).to_records() == expected
+    with pytest.raises(ValueError):
+        query.limit(-1)
@@ -1,11 +1,15 @@
+import os
+from typing import Any
 from unittest.mock import MagicMock, patch
 
 import pandas as pd
+import pytest
 
-from src.read_from_file import read_transactions_from_csv, read_transactions_from_excel
+from src import read_from_file
+from src.read_from_file import iter_transactions_from_excel, read_transactions_from_csv, read_transactions_from_excel
 
 
-@patch("src.read_from_file.pd.read_csv")
+@patch("pandas.read_csv")
 def test_read_transactions_from_csv(mock_read_csv: MagicMock, get_df: pd.DataFrame) -> None:
     """
     This function tests the read_transactions_from_csv function by mocking the pd.read_csv function.
@@ -38,7 +42,7 @@ def test_read_transactions_from_csv(mock_read_csv: MagicMock, get_df: pd.DataFra
             "to": "Счет 23294994494356835683",
         },
     ]
-    mock_read_csv.assert_called_once_with("existing.csv", delimiter=";")
+    mock_read_csv.assert_called_once_with("existing.csv", delimiter=";", dtype=read_from_file.CSV_DTYPES)
 
 
 def test_read_transactions_from_csv_not_exist() -> None:
@@ -54,21 +58,52 @@ def test_read_transactions_from_csv_not_exist() -> None:
     assert read_transactions_from_csv("not_existing.csv") == []
 
 
-@patch("src.read_from_file.pd.read_excel")
-def test_read_transactions_from_excel(mock_read_excel: MagicMock, get_df: pd.DataFrame) -> None:
+@pytest.mark.parametrize("chunksize", [50, 333, 10_000])
+def test_iter_transactions_from_csv(chunksize: int) -> None:
     """
-    This function tests the read_transactions_from_excel function by mocking the pd.read_excel function.
+    Test the generator `iter_transactions_from_csv` on the project's transactions.csv file.
+
+    It checks that chunks are not larger than `chunksize` and that together they contain
+    exactly the transactions returned by `read_transactions_from_csv`.
+
+    Parameters:
+    chunksize (int): The number of rows per chunk.
+
+    Returns:
+    None. The function asserts the behavior of iter_transactions_from_csv function.
+    """
+    file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "transactions.csv")
+    chunks = list(read_from_file.iter_transactions_from_csv(file_path, chunksize=chunksize))
+
+    assert all(len(chunk) <= chunksize for chunk in chunks)
+    assert [operation for chunk in chunks for operation in chunk] == read_transactions_from_csv(file_path)
+
+
+def test_iter_transactions_from_csv_not_exist() -> None:
+    """
+    Test the generator `iter_transactions_from_csv` when it is given a non-existing CSV-file.
+
+    Parameters: None
+    Returns: None
+    """
+    assert list(read_from_file.iter_transactions_from_csv("not_existing.csv")) == []
+
+
+def test_read_transactions_from_excel(tmp_path: Any, get_df: pd.DataFrame) -> None:
+    """
+    This function tests the read_transactions_from_excel function on an XLSX file written from a DataFrame.
     It asserts that the function returns the expected list of transactions when given an existing Excel file.
 
     Parameters:
-    mock_read_excel (MagicMock): A mock object for pd.read_excel function.
+    tmp_path: The pytest fixture with a temporary folder.
     get_df (pd.DataFrame): A pandas DataFrame containing the expected transactions.
 
     Returns:
     None. The function asserts the behavior of read_transactions_from_excel function.
     """
-    mock_read_excel.return_value = get_df
-    assert read_transactions_from_excel("existing.xlsx")[:2] == [
+    file_path = os.path.join(tmp_path, "existing.xlsx")
+    get_df.to_excel(file_path, index=False)
+    assert read_transactions_from_excel(file_path)[:2] == [
         {
             "id": 650703,
             "state": "EXECUTED",
@@ -87,7 +122,6 @@ def test_read_transactions_from_excel(mock_read_excel: MagicMock, get_df: pd.Dat
             "to": "Счет 23294994494356835683",
         },
     ]
-    mock_read_excel.assert_called_once_with("existing.xlsx")
 
 
 def test_read_transactions_from_excel_not_exist() -> None:
@@ -101,3 +135,101 @@ def test_read_transactions_from_excel_not_exist() -> None:
     Returns: None
     """
     assert read_transactions_from_excel("not_existing.xlsx") == []
+
+
+def _read_excel_with_pandas(file_path: str) -> list[dict[str, Any]]:
+    """The former pandas-based read_transactions_from_excel, the reference for the streaming reader."""
+    records = []
+    for i in pd.read_excel(file_path).fillna(0).to_dict(orient="records"):
+        operation = {
+            "id": int(i.get("id", "0")),
+            "state": i.get("state", "UNKNOWN"),
+            "date": i.get("date"),
+            "operationAmount": {
+                "amount": int(i.get("amount", "0")),
+                "currency": {"name": i.get("currency_name"), "code": i.get("currency_code")},
+            },
+            "description": i.get("description"),
+            "from": i.get("from"),
+            "to": i.get("to"),
+        }
+        records.append({key: value for key, value in operation.items() if value != 0})
+    return records
+
+
+@pytest.mark.parametrize("chunksize", [7, 10_000])
+def test_iter_transactions_from_excel(chunksize: int) -> None:
+    """
+    Test the generator `iter_transactions_from_excel` on the project's transactions_excel.xlsx file
+    (shared strings, an empty row inside the sheet).
+
+    It checks that chunks are not larger than `chunksize` and that together they contain exactly
+    the transactions of the former pandas-based reader.
+
+    Parameters:
+    chunksize (int): The number of transactions per chunk.
+
+    Returns:
+    None. The function asserts the behavior of iter_transactions_from_excel function.
+    """
+    file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "transactions_excel.xlsx")
+    chunks = list(iter_transactions_from_excel(file_path, chunksize=chunksize))
+
+    assert all(len(chunk) <= chunksize for chunk in chunks)
+    assert [operation for chunk in chunks for operation in chunk] == _read_excel_with_pandas(file_path)
+
+
+def test_iter_transactions_from_excel_columns(tmp_path: Any) -> None:
+    """
+    Test that the streaming reader finds the columns by the header, ignores unknown columns
+    and drops empty rows at the end of the sheet, like pandas.
+
+    Parameters:
+    tmp_path: The pytest fixture with a temporary folder.
+
+    Returns:
+    None. The function asserts the behavior of iter_transactions_from_excel function.
+    """
+    file_path = os.path.join(tmp_path, "transactions.xlsx")
+    df = pd.DataFrame(
+        {
+            "comment": ["a", "b", None],
+            "to": ["Счет 1", None, None],
+            "amount": [10.0, 2.5, None],
+            "id": [1, None, None],
+            "currency_code": ["RUB", "USD", None],
+        }
+    )
+    df.to_excel(file_path, index=False)
+
+    assert list(iter_transactions_from_excel(file_path)) == [
+        [
+            {
+                "id": 1,
+                "state": "UNKNOWN",
+                "date": None,
+                "operationAmount": {"amount": 10, "currency": {"name": None, "code": "RUB"}},
+                "description": None,
+                "from": None,
+                "to": "Счет 1",
+            },
+            {
+                "state": "UNKNOWN",
+                "date": None,
+                "operationAmount": {"amount": 2, "currency": {"name": None, "code": "USD"}},
+                "description": None,
+                "from": None,
+            },
+        ]
+    ]
+    assert read_transactions_from_excel(file_path) == _read_excel_with_pandas(file_path)
+
+
+def test_iter_transactions_from_excel_not_exist() -> None:
+    """
+    Test the generator `iter_transactions_from_excel` when it is given a non-existing Excel file.
+
+    Parameters: None
+    Returns: None
+    """
+    assert list(iter_transactions_from_excel("not_existing.xlsx")) == []
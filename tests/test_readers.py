@@ -0,0 +1,136 @@
+import gzip
+import os
+import shutil
+from typing import Any, Iterator
+
+import pytest
+
+from src.read_from_file import read_transactions_from_csv, read_transactions_from_excel
+from src.readers import FORMATS, TransactionFormat, detect_format, open_transactions, register_format
+from src.table import TransactionTable
+from src.utils import read_transactions_from_json
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+DATA_FILES = [
+    ("operations.json", "json", read_transactions_from_json),
+    ("transactions.csv", "csv", read_transactions_from_csv),
+    ("transactions_excel.xlsx", "xlsx", read_transactions_from_excel),
+]
+
+
+def _gzip(file_path: str, target_path: str) -> str:
+    """Writes a gzip-compressed copy of `file_path` to `target_path`."""
+    with open(file_path, "rb") as source_file, gzip.open(target_path, "wb") as target_file:
+        shutil.copyfileobj(source_file, target_file)
+    return target_path
+
+
+@pytest.mark.parametrize("file_name, format_name, read", DATA_FILES)
+def test_open_transactions(file_name: str, format_name: str, read: Any, tmp_path: Any) -> None:
+    """
+    Checks that the format is detected and that the lazy iterator, the table (parsed and then cached)
+    and the stream of a gzip-compressed copy without a telling extension all give the transactions of the reader.
+
+    Parameters:
+        file_name: The file in the data folder.
+        format_name: The expected format.
+        read: The list reader of the format.
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    file_path = os.path.join(DATA_PATH, file_name)
+    expected = read(file_path)
+
+    assert detect_format(file_path) == (FORMATS[format_name], None)
+    stream = open_transactions(file_path)
+    assert isinstance(stream, Iterator)
+    assert list(stream) == expected
+
+    for _ in range(2):
+        table = open_transactions(file_path, stream=False)
+        assert isinstance(table, TransactionTable)
+        assert table.to_records() == expected
+    assert list(open_transactions(file_path)) == expected
+
+    compressed_path = _gzip(file_path, os.path.join(tmp_path, "upload.gz"))
+    assert detect_format(compressed_path) == (FORMATS[format_name], "gzip")
+    assert list(open_transactions(compressed_path)) == expected
+
+
+def test_detect_format_by_extension(tmp_path: Any) -> None:
+    """
+    Checks that a file not recognised by its contents is detected by its extension
+    (with the compression extension removed), and that an unknown file is rejected.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    text_path = os.path.join(tmp_path, "export.txt")
+    with open(text_path, "w", encoding="utf-8") as text_file:
+        text_file.write("date,amount\n")
+    with pytest.raises(ValueError):
+        detect_format(text_path)
+
+    csv_path = _gzip(text_path, os.path.join(tmp_path, "export.csv.gz"))
+    assert detect_format(csv_path) == (FORMATS["csv"], "gzip")
+    with pytest.raises(FileNotFoundError):
+        detect_format(os.path.join(tmp_path, "missing.json"))
+
+
+def iter_pipe_separated(file_path: str) -> Iterator[dict[str, Any]]:
+    """A reader of a test format: 'TRN|<id>|<state>' lines."""
+    with open(file_path, encoding="utf-8") as lines:
+        for line in lines:
+            _, transaction_id, state = line.strip().split("|")
+            yield {"id": int(transaction_id), "state": state}
+
+
+def test_register_format(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Checks that a new format plugs into detect_format and open_transactions by registration alone.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+        monkeypatch: The pytest fixture used to restore the registry.
+    """
+    monkeypatch.setattr("src.readers.FORMATS", dict(FORMATS))
+    transaction_format = register_format(
+        TransactionFormat(
+            "pipe", (".pipe",), f"{__name__}:iter_pipe_separated", sniff=lambda head: head.startswith(b"TRN|")
+        )
+    )
+    file_path = os.path.join(tmp_path, "transactions.dat")
+    with open(file_path, "w", encoding="utf-8") as pipe_file:
+        pipe_file.write("TRN|1|EXECUTED\nTRN|2|CANCELED\n")
+
+    assert detect_format(file_path) == (transaction_format, None)
+    assert list(open_transactions(file_path)) == [{"id": 1, "state": "EXECUTED"}, {"id": 2, "state": "CANCELED"}]
+
+
+def test_open_ndjson(tmp_path: Any) -> None:
+    """
+    Checks that JSON Lines files are detected by their contents (even gzip-compressed, without an extension)
+    and by their extension, and read by the NDJSON reader.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    from src.utils import write_transactions_to_ndjson
+
+    expected = read_transactions_from_json(os.path.join(DATA_PATH, "operations.json"))
+    file_path = os.path.join(tmp_path, "export.jsonl")
+    write_transactions_to_ndjson(expected, file_path)
+
+    assert detect_format(file_path) == (FORMATS["ndjson"], None)
+    assert list(open_transactions(file_path)) == expected
+    table = open_transactions(file_path, stream=False)
+    assert isinstance(table, TransactionTable)
+    assert table.to_records() == expected
+
+    compressed_path = _gzip(file_path, os.path.join(tmp_path, "upload.gz"))
+    assert detect_format(compressed_path) == (FORMATS["ndjson"], "gzip")
+    assert list(open_transactions(compressed_path)) == expected
+
+    empty_path = os.path.join(tmp_path, "empty.ndjson")
+    open(empty_path, "w").close()
+    assert detect_format(empty_path) == (FORMATS["ndjson"], None)
@@ -0,0 +1,183 @@
+import os
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from src import read_from_file
+from src.generators import filter_by_currency
+from src.processing import filter_by_state, search_by_str, sort_by_date
+from src.read_from_file import read_table_from_csv, read_table_from_excel, read_transactions_from_csv
+from src.table import TransactionTable
+from src.utils import read_table_from_json, read_transactions_from_json
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+def test_from_records_round_trip(transactions: list[dict[str, Any]]) -> None:
+    """
+    Checks that a table built from transaction dictionaries restores exactly the same dictionaries,
+    including transactions with missing keys.
+
+    Parameters:
+        transactions (list[dict[str, Any]]): A list of dictionaries representing transactions.
+    """
+    table = TransactionTable.from_records(transactions)
+
+    assert len(table) == len(transactions)
+    assert table.to_records() == transactions
+    assert not table.extras
+
+
+def test_from_records_irregular_rows() -> None:
+    """
+    Checks that rows which do not fit the columns are kept as is and survive filtering.
+    """
+    data = [
+        {"id": 1, "state": "EXECUTED", "operationAmount": {"amount": 0, "currency": {"name": 0, "code": 0}}},
+        {"id": 2, "state": "EXECUTED", "comment": "unknown key"},
+        {"id": 3, "state": "CANCELED", "date": "2019-07-03T18:35:29.512364"},
+    ]
+    table = TransactionTable.from_records(data)
+
+    assert table.to_records() == data
+    assert sorted(table.extras) == [0, 1]
+    assert filter_by_state(table).to_records() == data[:2]
+
+
+def test_from_records_not_a_dict() -> None:
+    """
+    Checks that building a table from non-dictionary items raises TypeError.
+    """
+    with pytest.raises(TypeError):
+        TransactionTable.from_records(["not a transaction"])  # type: ignore[list-item]
+
+
+def test_from_dataframe(get_df: pd.DataFrame) -> None:
+    """
+    Checks that a table built from a flat DataFrame restores the transactions produced by the CSV reader.
+
+    Parameters:
+        get_df (pd.DataFrame): A pandas DataFrame containing flat transactions.
+    """
+    table = TransactionTable.from_dataframe(get_df)
+
+    assert table.to_records() == [
+        {
+            "id": 650703,
+            "state": "EXECUTED",
+            "date": "2023-09-05T11:30:32Z",
+            "operationAmount": {"amount": 16210, "currency": {"name": "Sol", "code": "PEN"}},
+            "description": "Перевод организации",
+            "from": "Счет 58803664561298323391",
+            "to": "Счет 39745660563456619397",
+        },
+        {
+            "id": 5380041,
+            "state": "CANCELED",
+            "date": "2021-02-01T11:54:58Z",
+            "operationAmount": {"amount": 23789, "currency": {"name": "Peso", "code": "UYU"}},
+            "description": "Открытие вклада",
+            "to": "Счет 23294994494356835683",
+        },
+    ]
+
+
+@pytest.mark.parametrize("state", ["EXECUTED", "CANCELED", "PENDING", "UNKNOWN"])
+def test_filter_by_state_table(state: str) -> None:
+    """
+    Checks that filter_by_state gives the same transactions for a table and for a list of dictionaries.
+
+    Parameters:
+        state (str): The state to filter by.
+    """
+    file_path = os.path.join(DATA_PATH, "operations.json")
+    table, transactions = read_table_from_json(file_path), read_transactions_from_json(file_path)
+
+    assert filter_by_state(table, state).to_records() == filter_by_state(transactions, state)
+
+
+@pytest.mark.parametrize("is_sort_order", [True, False])
+def test_sort_by_date_table(is_sort_order: bool) -> None:
+    """
+    Checks that sort_by_date orders a table exactly like a list of dictionaries, keeping equal dates stable.
+
+    Parameters:
+        is_sort_order (bool): True - descending order, False - ascending order.
+    """
+    transactions = filter_by_state(read_transactions_from_json(os.path.join(DATA_PATH, "operations.json")))
+    transactions += transactions[:5]
+    table = TransactionTable.from_records(transactions)
+
+    assert sort_by_date(table, is_sort_order).to_records() == sort_by_date(transactions, is_sort_order)
+
+
+def test_sort_by_date_table_no_key_date() -> None:
+    """
+    Checks that sort_by_date raises KeyError for a table with a transaction without a date.
+    """
+    table = TransactionTable.from_records([{"id": 1, "date": "2019-07-03T18:35:29.512364"}, {"id": 2}])
+
+    with pytest.raises(KeyError) as exc_info:
+        sort_by_date(table)
+    assert exc_info.value.args[0][:36] == "Ключ 'date' отсутствует в транзакции"
+
+
+@pytest.mark.parametrize("currency", ["USD", "RUB"])
+def test_filter_by_currency_table(transactions: list[dict[str, Any]], currency: str) -> None:
+    """
+    Checks that filter_by_currency gives the same transactions for a table and for a list of dictionaries.
+
+    Parameters:
+        transactions (list[dict[str, Any]]): A list of dictionaries representing transactions.
+        currency (str): The currency code to filter by.
+    """
+    expected = list(filter_by_currency(transactions, currency))
+
+    assert expected
+    assert list(filter_by_currency(TransactionTable.from_records(transactions), currency)) == expected
+
+
+@pytest.mark.parametrize("search_str", ["Перевод", "Переводить", "открыть", "со счета", "карта", "Несуществующее"])
+def test_search_by_str_table(search_str: str) -> None:
+    """
+    Checks that search_by_str gives the same transactions for a table and for a list of dictionaries.
+
+    Parameters:
+        search_str (str): The string to search for in the operation descriptions.
+    """
+    file_path = os.path.join(DATA_PATH, "transactions.csv")
+    table, transactions = read_table_from_csv(file_path), read_transactions_from_csv(file_path)
+
+    assert search_by_str(table, search_str).to_records() == search_by_str(transactions, search_str)
+
+
+def test_read_table_empty_cells(tmp_path: Any) -> None:
+    """
+    Checks that the table readers restore the same transactions as the dictionary readers, including the rows
+    of the repo's files with empty cells and a row with all cells empty.
+
+    Parameters:
+        tmp_path: The pytest fixture with a temporary folder.
+    """
+    csv_path = os.path.join(DATA_PATH, "transactions.csv")
+    excel_path = os.path.join(DATA_PATH, "transactions_excel.xlsx")
+    with open(csv_path, encoding="utf-8") as csv_file:
+        lines = csv_file.read().splitlines()
+    empty_path = os.path.join(tmp_path, "empty.csv")
+    with open(empty_path, "w", encoding="utf-8") as csv_file:
+        csv_file.write("\n".join([lines[0], lines[1], ";" * lines[0].count(";"), lines[2], ";EXECUTED;;;;;;;"]))
+
+    for file_path in (csv_path, empty_path):
+        transactions = read_transactions_from_csv(file_path)
+        assert {"name": 0, "code": 0} in [transaction["operationAmount"]["currency"] for transaction in transactions]
+        assert read_table_from_csv(file_path).to_records() == transactions
+    assert read_table_from_excel(excel_path).to_records() == read_from_file.read_transactions_from_excel(excel_path)
+
+
+def test_read_table_no_such_file() -> None:
+    """
+    Checks that the table readers return an empty table for a non-existing file.
+    """
+    assert len(read_table_from_json("not_existing.json")) == 0
+    assert len(read_table_from_csv("not_existing.csv")) == 0
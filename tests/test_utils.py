@@ -1,9 +1,16 @@
+import io
 import json
+import os
 import tempfile
+from pathlib import Path
 from typing import Any
 from unittest.mock import MagicMock, patch
 
-from src.utils import get_transaction_amount, read_transactions_from_json
+import numpy as np
+import pytest
+
+from src import utils
+from src.utils import get_transaction_amount, get_transaction_amounts, read_transactions_from_json
 
 
 @patch("src.utils.json.load")
@@ -105,6 +112,185 @@ def test_read_transactions_from_json_not_a_list() -> None:
     assert read_transactions_from_json(file_path) == []
 
 
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_iter_transactions_from_json(chunk_size: int) -> None:
+    """
+    Test the generator `iter_transactions_from_json` on the project's operations.json file.
+
+    It checks that the streamed transactions are identical to the ones returned by `read_transactions_from_json`
+    regardless of how the file is split into blocks.
+
+    Parameters:
+        chunk_size (int): The number of characters read from the file at once.
+
+    Returns: None
+    """
+    file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "operations.json")
+    assert list(utils.iter_transactions_from_json(file_path, chunk_size)) == read_transactions_from_json(file_path)
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        ("", []),
+        ("   ", []),
+        ("[]", []),
+        ('{"id": 1}', []),
+        ('[{"id": 1}, {"id": 2}]', [{"id": 1}, {"id": 2}]),
+        (' [ 1 , 22 , "3" ] ', [1, 22, "3"]),
+        ('[{"id": 1}, {"id": 2', [{"id": 1}]),
+        ('[{"id": 1} {"id": 2}]', [{"id": 1}]),
+        ('[{"id": 1},', [{"id": 1}]),
+    ],
+)
+def test_iter_transactions_from_json_edge_cases(tmp_path: Path, content: str, expected: list) -> None:
+    """
+    Test the generator `iter_transactions_from_json` on empty, non-list and malformed JSON-files.
+
+    Transactions preceding a malformed element are yielded, nothing is yielded for a non-list root object.
+
+    Parameters:
+        tmp_path (Path): A temporary directory for the JSON-file.
+        content (str): The content of the JSON-file.
+        expected (list): The expected yielded items.
+
+    Returns: None
+    """
+    file_path = tmp_path / "operations.json"
+    file_path.write_text(content, encoding="utf-8")
+    assert list(utils.iter_transactions_from_json(str(file_path), chunk_size=3)) == expected
+
+
+@pytest.mark.parametrize(
+    "broken", ['{"id": 2, "state": tru e}', '{"id": 2 "state": "EXECUTED"}', '{"id": 2, "x": "\\q"}']
+)
+def test_iter_transactions_from_json_stops_at_broken_element(broken: str) -> None:
+    """
+    Test that a broken element in the middle of a large file stops the iteration at once,
+    instead of reading the rest of the file in search of its end.
+
+    Parameters:
+        broken (str): A malformed element followed by many valid ones.
+
+    Returns: None
+    """
+    tail = ", ".join(json.dumps({"id": index, "description": "Перевод организации"}) for index in range(20_000))
+    source = io.StringIO(f'[{{"id": 1}}, {broken}, {tail}]')
+
+    assert list(utils.iter_transactions_from_json(source, chunk_size=64)) == [{"id": 1}]
+    assert source.tell() <= 256
+
+
+def test_iter_transactions_from_json_no_such_file() -> None:
+    """
+    Test the generator `iter_transactions_from_json` when it is given a non-existing JSON-file.
+
+    Parameters: None
+    Returns: None
+    """
+    assert list(utils.iter_transactions_from_json("i_am_not_exist.json")) == []
+
+
+def test_ndjson_round_trip(tmp_path: Path) -> None:
+    """
+    Test that transactions written by `write_transactions_to_ndjson` are read back unchanged,
+    and that appending adds lines to the end of the file.
+
+    Parameters:
+        tmp_path (Path): A temporary directory for the NDJSON-file.
+
+    Returns: None
+    """
+    file_path = str(tmp_path / "operations.jsonl")
+    transactions = read_transactions_from_json(
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "operations.json")
+    )
+
+    assert utils.write_transactions_to_ndjson(transactions[:10], file_path) == 10
+    assert (
+        utils.write_transactions_to_ndjson(iter(transactions[10:]), file_path, append=True) == len(transactions) - 10
+    )
+    assert utils.read_transactions_from_ndjson(file_path) == transactions
+    assert list(utils.iter_transactions_from_ndjson(file_path)) == transactions
+    with open(file_path, encoding="utf-8") as ndjson_file:
+        assert "Перевод организации" in ndjson_file.read()
+
+
+def test_ndjson_bad_lines(tmp_path: Path) -> None:
+    """
+    Test that empty lines are ignored and that invalid and non-object lines are skipped and reported
+    with their byte offsets.
+
+    Parameters:
+        tmp_path (Path): A temporary directory for the NDJSON-file.
+
+    Returns: None
+    """
+    file_path = tmp_path / "operations.jsonl"
+    lines = [b'{"id": 1}\n', b"\n", b'{"id": 2\n', b"[1, 2]\n", b'\xef{"id": 3}\n', b'{"id": 4}']
+    file_path.write_bytes(b"".join(lines))
+    offsets = [sum(map(len, lines[:index])) for index in range(len(lines))]
+
+    errors: list[utils.NdjsonError] = []
+    assert utils.read_transactions_from_ndjson(str(file_path), errors=errors) == [{"id": 1}, {"id": 4}]
+    assert [error.offset for error in errors] == [offsets[2], offsets[3], offsets[4]]
+    assert errors[1].message == "Строка не является объектом JSON."
+
+    assert list(utils.iter_transactions_from_ndjson(str(file_path), start=offsets[2])) == [{"id": 4}]
+    assert list(utils.iter_transactions_from_ndjson(str(file_path), end=offsets[2])) == [{"id": 1}]
+    assert utils.read_transactions_from_ndjson(str(tmp_path / "i_am_not_exist.jsonl")) == []
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 7, 200])
+def test_ndjson_shards(tmp_path: Path, count: int) -> None:
+    """
+    Test that the shards of an NDJSON-file are adjacent, cover the file and together yield every line once.
+
+    Parameters:
+        tmp_path (Path): A temporary directory for the NDJSON-file.
+        count (int): The wanted number of shards.
+
+    Returns: None
+    """
+    file_path = str(tmp_path / "operations.jsonl")
+    transactions = [{"id": index, "description": "x" * (index % 13)} for index in range(50)]
+    utils.write_transactions_to_ndjson(transactions, file_path)
+
+    shards = utils.ndjson_shards(file_path, count)
+
+    assert 1 <= len(shards) <= count
+    assert shards[0][0] == 0 and shards[-1][1] == os.path.getsize(file_path)
+    assert all(left[1] == right[0] for left, right in zip(shards, shards[1:]))
+    assert [item for start, end in shards for item in utils.iter_transactions_from_ndjson(file_path, start, end)] == (
+        transactions
+    )
+
+
+def test_read_transactions_from_ndjson_parallel(tmp_path: Path) -> None:
+    """
+    Test that decoding an NDJSON-file by several worker processes gives the transactions and errors
+    of the sequential reading, in the same order.
+
+    Parameters:
+        tmp_path (Path): A temporary directory for the NDJSON-file.
+
+    Returns: None
+    """
+    file_path = str(tmp_path / "operations.jsonl")
+    utils.write_transactions_to_ndjson(({"id": index} for index in range(1000)), file_path)
+    with open(file_path, "a", encoding="utf-8") as ndjson_file:
+        ndjson_file.write("not json\n")
+    utils.write_transactions_to_ndjson(({"id": index} for index in range(1000, 1100)), file_path, append=True)
+
+    sequential_errors: list[utils.NdjsonError] = []
+    parallel_errors: list[utils.NdjsonError] = []
+    sequential = utils.read_transactions_from_ndjson(file_path, workers=1, errors=sequential_errors)
+
+    assert utils.read_transactions_from_ndjson(file_path, workers=3, errors=parallel_errors) == sequential
+    assert [item["id"] for item in sequential] == list(range(1100))
+    assert parallel_errors == sequential_errors and len(sequential_errors) == 1
+
+
 def test_get_transaction_amount(transactions: list[dict[str, Any]]) -> None:
     """
     Test the function `get_transaction_amount`.
@@ -158,6 +344,92 @@ def test_get_transaction_amount_non_rub_transactions(mock_get_exchange_rate: Mag
     assert result == 2149.32
 
 
+@patch("src.utils.get_rates_table")
+def test_get_transaction_amounts(mock_get_rates_table: MagicMock, transactions: list[dict[str, Any]]) -> None:
+    """
+    Test the function `get_transaction_amounts` over a list of RUB and USD transactions.
+
+    It checks that the result is aligned with the input, RUB amounts are kept as is,
+    USD amounts are converted with a single rate table lookup, and a transaction
+    without a currency code gets NaN.
+
+    Parameters:
+        mock_get_rates_table (MagicMock): A mock object for the `get_rates_table` function.
+        fixture transactions (list) from conftest.py: A list of dictionaries representing transactions.
+
+    Returns: None
+    """
+    mock_get_rates_table.return_value = (True, {"USD": 0.01, "RUB": 1.0})
+
+    result = get_transaction_amounts(transactions)
+
+    assert result.shape == (len(transactions),)
+    assert result[0] == 982407.0
+    assert result[1] == 7911493.0
+    assert result[2] == 43318.34
+    assert np.isnan(result[5])
+    mock_get_rates_table.assert_called_once_with("RUB")
+
+
+@patch("src.utils.get_rates_table")
+def test_get_transaction_amounts_rates_unavailable(mock_get_rates_table: MagicMock) -> None:
+    """
+    Test the function `get_transaction_amounts` when the rate table cannot be requested.
+
+    Parameters:
+        mock_get_rates_table (MagicMock): A mock object for the `get_rates_table` function.
+
+    Returns: None
+    """
+    mock_get_rates_table.return_value = (False, "Unauthorized")
+    data = [
+        {"id": 1, "operationAmount": {"amount": "25", "currency": {"name": "USD", "code": "USD"}}},
+        {"id": 2, "operationAmount": {"amount": "100.5", "currency": {"name": "руб.", "code": "RUB"}}},
+    ]
+
+    result = get_transaction_amounts(data)
+
+    assert np.isnan(result[0])
+    assert result[1] == 100.5
+
+
+@patch("src.utils.get_rates_table")
+def test_get_transaction_amounts_non_numeric(mock_get_rates_table: MagicMock) -> None:
+    """
+    Test the function `get_transaction_amounts` over a batch mixing valid and non-numeric amounts:
+    only the rows with unusable amounts get NaN.
+
+    Parameters:
+        mock_get_rates_table (MagicMock): A mock object for the `get_rates_table` function.
+
+    Returns: None
+    """
+    mock_get_rates_table.return_value = (True, {"USD": 0.01})
+    data = [
+        {"id": 1, "operationAmount": {"amount": "100.5", "currency": {"code": "RUB"}}},
+        {"id": 2, "operationAmount": {"amount": "not a number", "currency": {"code": "RUB"}}},
+        {"id": 3, "operationAmount": {"amount": "25", "currency": {"code": "USD"}}},
+        {"id": 4, "operationAmount": {"amount": None, "currency": {"code": "USD"}}},
+        {"id": 5, "operationAmount": {"amount": ["1"], "currency": {"code": "RUB"}}},
+        {"id": 6, "operationAmount": {"amount": 7, "currency": {"code": "RUB"}}},
+    ]
+
+    result = get_transaction_amounts(data)
+
+    assert result[[0, 2, 5]].tolist() == [100.5, 2500.0, 7.0]
+    assert np.isnan(result[[1, 3, 4]]).all()
+
+
+def test_get_transaction_amounts_empty_list() -> None:
+    """
+    Test the function `get_transaction_amounts` with an empty list of transactions.
+
+    Parameters: None
+    Returns: None
+    """
+    assert get_transaction_amounts([]).size == 0
+
+
 # @pytest.mark.parametrize("return_status, return_result", [(False, "Unauthorized"), (False, "Something went wrong")])
 # @patch("src.utils.get_exchange_rate")
 # def test_get_transaction_amount_non_ruble_transactions_unsuccessful(
@@ -1,6 +1,11 @@
+from typing import Iterator
+
+import numpy as np
 import pytest
 
-from src.widget import format_str_date, mask_account_card
+from src import widget
+from src.masks import masking_engine
+from src.widget import format_str_date, mask_account_card, mask_account_card_batch, mask_cache_info
 
 
 # --- mask_account_card ---
@@ -118,6 +123,133 @@ def test_mask_account_card_non_digital_symbols_acc() -> None:
     assert str(exc_info.value) == "Номер счета должен состоять только из цифр."
 
 
+# --- mask cache ---
+@pytest.fixture
+def empty_mask_cache() -> Iterator[None]:
+    """
+    Fixture that gives every test an empty mask cache of the default size and restores it afterwards.
+    """
+    widget.set_mask_cache_size(1024)
+    yield
+    widget.set_mask_cache_size(1024)
+
+
+def test_mask_account_card_cache(empty_mask_cache: None) -> None:
+    """
+    Test that repeated accounts are masked once and then served from the cache.
+
+    Args:
+        empty_mask_cache (None): The fixture with an empty mask cache.
+    """
+    values = ["Счет 73654108430135874305", "Visa Platinum 7000792289606361"] * 50
+
+    assert [mask_account_card(value) for value in values] == ["Счет **4305", "Visa Platinum 7000 79** **** 6361"] * 50
+    info = mask_cache_info()
+    assert isinstance(info, widget.MaskCacheInfo)
+    assert (info.misses, info.hits, info.currsize) == (2, 98, 2)
+
+    widget.mask_cache_clear()
+    assert mask_cache_info().currsize == 0
+
+
+def test_mask_account_card_cache_visible_digits(empty_mask_cache: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that a cached mask is not reused after the number of visible digits changes.
+
+    Args:
+        empty_mask_cache (None): The fixture with an empty mask cache.
+        monkeypatch (pytest.MonkeyPatch): The pytest fixture used to change the masking engine settings.
+    """
+    assert mask_account_card("Счет 73654108430135874305") == "Счет **4305"
+
+    monkeypatch.setattr(masking_engine, "visible_digits", 2)
+    assert mask_account_card("Счет 73654108430135874305") == "Счет **05"
+    assert mask_cache_info().misses == 2
+
+
+def test_mask_account_card_uncached_visible_digits() -> None:
+    """
+    Test that the uncached masking shows the given number of visible digits, whatever masking_engine is set to.
+    """
+    assert widget._mask_account_card("Счет 73654108430135874305", 2) == "Счет **05"
+    assert widget._mask_account_card("Visa Platinum 7000792289606361", 2) == "Visa Platinum 70 00 79 ** ** ** 61"
+
+
+def test_mask_account_card_cache_size(empty_mask_cache: None) -> None:
+    """
+    Test that the cache keeps at most the configured number of masks and does not keep errors.
+
+    Args:
+        empty_mask_cache (None): The fixture with an empty mask cache.
+    """
+    widget.set_mask_cache_size(2)
+    for account in ("Счет 73654108430135874305", "Счет 12345678901234567890", "Счет 43210810000000012345"):
+        mask_account_card(account)
+    with pytest.raises(ValueError):
+        mask_account_card("Счет 1234")
+
+    info = mask_cache_info()
+    assert (info.maxsize, info.currsize, info.misses) == (2, 2, 4)
+
+
+# --- mask_account_card_batch ---
+MASK_BATCH_VALUES = [
+    ("Visa Platinum 7000792289606361", widget.MASK_OK),
+    ("Счет 73654108430135874305", widget.MASK_OK),
+    ("МИР 1234567812345678", widget.MASK_OK),
+    ("12345678901234567890", widget.MASK_NO_PREFIX),
+    ("", widget.MASK_NO_PREFIX),
+    ("Visa 12a4567812345678", widget.MASK_CARD_NON_DIGIT),
+    ("Visa 1234567812345678 ", widget.MASK_CARD_NON_DIGIT),
+    ("Visa 123", widget.MASK_CARD_LENGTH),
+    ("Счет 7365410843013587430x", widget.MASK_ACCOUNT_NON_DIGIT),
+    ("Счет 1234", widget.MASK_ACCOUNT_LENGTH),
+    ("Счетх 73654108430135874305", widget.MASK_CARD_LENGTH),
+]
+
+
+@pytest.mark.parametrize("as_array", [False, True])
+def test_mask_account_card_batch(as_array: bool) -> None:
+    """
+    Test that `mask_account_card_batch` masks a column exactly like `mask_account_card` row by row,
+    and reports an error code with the message `mask_account_card` raises instead of raising.
+
+    Args:
+        as_array (bool): Pass the column as a NumPy string array instead of a list.
+    """
+    values = [value for value, _ in MASK_BATCH_VALUES]
+    masks, errors = mask_account_card_batch(np.array(values) if as_array else values)
+
+    assert errors.tolist() == [error for _, error in MASK_BATCH_VALUES]
+    for value, mask, error in zip(values, masks, errors):
+        if error == widget.MASK_OK:
+            assert mask == mask_account_card(value)
+        else:
+            assert mask == ""
+            with pytest.raises(ValueError) as exc_info:
+                mask_account_card(value)
+            assert str(exc_info.value) == widget.MASK_ERROR_MESSAGES[error]
+
+
+def test_mask_account_card_batch_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that `mask_account_card_batch` gives the same result when the column is split into several chunks,
+    and an empty column gives empty results.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): The pytest fixture used to shrink the chunk size.
+    """
+    values = [value for value, _ in MASK_BATCH_VALUES] * 3
+    expected_masks, expected_errors = mask_account_card_batch(values)
+
+    monkeypatch.setattr("src.widget.MASK_BATCH_SIZE", 4)
+    masks, errors = mask_account_card_batch(values)
+
+    assert masks == expected_masks
+    assert errors.tolist() == expected_errors.tolist()
+    assert mask_account_card_batch([])[0] == []
+
+
 # --- format_str_date ---
 @pytest.mark.parametrize(
     "raw_date_str, expected",